@@ -0,0 +1,121 @@
+"""
+Group-by / filter queries over the rollup cube (src/cube.py).
+
+Each request is answered from the smallest precomputed rollup that still has
+every dimension it groups or filters by, so a national or per-state answer
+never touches district rows. Within a rollup, equality filters use
+precomputed value -> positions maps and date ranges a datetime64 array; only
+the selected rows are grouped.
+"""
+import numpy as np
+import pandas as pd
+
+from backend.indexes import QueryError, lookup_key, normalized_keys
+from backend.payloads import records_json
+from src import cube, schema, store
+
+
+def read_cube():
+    """Cube tables from the store, or built from the monthly tables if the
+    pipeline has not produced them yet (legacy CSV outputs)."""
+    try:
+        return {name: store.read_table(name) for name in cube.TABLES}
+    except FileNotFoundError:
+        tables = cube.build(*(store.read_table(name) for name in (
+            "enrol_monthly", "demo_monthly", "bio_monthly", "demand_forecast_actions")))
+        return {name: schema.apply(frame, name) for name, frame in tables.items()}
+
+
+class Rollup:
+    def __init__(self, dims, frame):
+        self.dims = dims
+        self.frame = frame.reset_index(drop=True)
+        self.n = len(frame)
+        self.positions = {}
+        for dim in dims:
+            if dim != "date":
+                keys = normalized_keys(self.frame, dim)
+                self.positions[dim] = keys.groupby(keys, sort=False).indices
+        self.dates = None
+        if "date" in dims:
+            self.dates = pd.to_datetime(self.frame["date"]).to_numpy(dtype="datetime64[ns]")
+
+
+class AggregateIndex:
+    MAX_GROUPS = 100_000
+
+    def __init__(self, tables, lfi_rule=None):
+        # Smallest first, so the first rollup that covers a query is the cheapest
+        self.rollups = sorted((Rollup(dims, tables[cube.table_name(dims)]) for dims in cube.ROLLUPS),
+                              key=lambda r: r.n)
+        self.lfi_rule = lfi_rule
+
+    def pick(self, needed):
+        for rollup in self.rollups:
+            if needed <= set(rollup.dims):
+                return rollup
+        raise QueryError(f"No rollup covers {', '.join(sorted(needed))}")
+
+    def query(self, group_by=None, metrics=None, filters=None, date_from=None, date_to=None):
+        """Return (JSON bytes of the answer rows, name of the rollup used)."""
+        group_by = split(group_by)
+        filters = {dim: split(value) for dim, value in (filters or {}).items() if value}
+        by_age = "age_group" in group_by or "age_group" in filters
+        by_date = "date" in group_by
+        # By default, leave out what is undefined for the grouping: ratios per
+        # age group, and forecast sums across months
+        metrics = split(metrics) or [*cube.measures_of(group_by), *([] if by_age else cube.DERIVED)]
+
+        unknown = [d for d in group_by if d not in cube.DIMENSIONS]
+        if unknown:
+            raise QueryError(f"Unknown dimension(s): {', '.join(unknown)}")
+        unknown = [m for m in metrics if m not in cube.MEASURES + cube.DERIVED]
+        if unknown:
+            raise QueryError(f"Unknown metric(s): {', '.join(unknown)}")
+        if "forecast" in metrics and not by_date:
+            raise QueryError("forecast: next-month forecasts only add up within a month; add date to group_by")
+        derived = [m for m in metrics if m in cube.DERIVED]
+        if derived and by_age:
+            raise QueryError(f"{', '.join(derived)}: defined over all age groups; drop age_group from group_by and filters")
+
+        needed = set(group_by) | set(filters)
+        if date_from or date_to:
+            needed.add("date")
+        rollup = self.pick(needed)
+
+        mask = np.ones(rollup.n, dtype=bool)
+        for dim, values in filters.items():
+            keep = np.zeros(rollup.n, dtype=bool)
+            if dim == "date":
+                months = pd.to_datetime(values).to_period("M")
+                keep = pd.PeriodIndex(rollup.dates, freq="M").isin(months)
+            else:
+                for value in values:
+                    keep[rollup.positions[dim].get(lookup_key(value, dim), [])] = True
+            mask &= keep
+        if date_from:
+            mask &= rollup.dates >= np.datetime64(pd.Timestamp(date_from))
+        if date_to:
+            mask &= rollup.dates <= np.datetime64(pd.Timestamp(date_to) + pd.offsets.MonthEnd(0))
+
+        selected = rollup.frame.iloc[np.flatnonzero(mask)]
+        # Ratios need the counts they are derived from
+        inputs = ["enrolments", *cube.PRESSURES.values()] if derived else []
+        measures = list(dict.fromkeys([m for m in metrics if m in cube.MEASURES] + inputs))
+        if group_by:
+            answer = selected.groupby(group_by, as_index=False, sort=True, observed=True)[measures].sum()
+            if len(answer) > self.MAX_GROUPS:
+                raise QueryError(f"Answer has {len(answer)} groups; add filters or group by less")
+        else:
+            answer = selected[measures].sum().to_frame().T
+        if derived:
+            answer = cube.derive(answer, derived, self.lfi_rule)
+        return records_json(answer[group_by + metrics]), cube.table_name(rollup.dims)
+
+
+def split(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip() for v in value if v.strip()]
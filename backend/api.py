@@ -1,10 +1,49 @@
-from fastapi import FastAPI
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+from pydantic import BaseModel
+
+# Pipeline modules (columnar store) live in src/ at the repository root
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from backend.config import LOW_MEMORY, RELOAD_INTERVAL, SHARED_SNAPSHOTS, STATES_GEOJSON
+from backend.payloads import dumps
+from backend.indexes import QueryError, StaleCursor
+from backend.dataset import SOURCE_TABLES, load_snapshot
+from backend.snapshots import SnapshotManager
+from backend.shared import shared_loader
+from backend.metrics import Metrics, MetricsMiddleware
+from backend.centres import CentreIndex, CentreSearchIndex
+from backend.geometry import GeometryLayer
+from backend.exports import export
+
+
+# Dataset snapshots: loaded now, then hot-reloaded when the pipeline writes new outputs.
+# In shared mode workers attach to one memory-mapped copy instead of building their own.
+SNAPSHOTS = SnapshotManager(
+    shared_loader(load_snapshot) if SHARED_SNAPSHOTS else load_snapshot,
+    SOURCE_TABLES, interval=RELOAD_INTERVAL
+)
+SNAPSHOTS.refresh()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    SNAPSHOTS.start()
+    yield
+    await SNAPSHOTS.stop()
 
 
 # Create app
-app = FastAPI(title="UIDAI Admin Analytics API")
+app = FastAPI(title="UIDAI Admin Analytics API", lifespan=lifespan)
 
 # Allow React frontend to access API
 app.add_middleware(
@@ -15,272 +54,233 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load analytics data (read-only)
-DATA_PATH = r"C:\Users\deeps\Documents\aadhar-analytics\output\admin_decision_dashboard.csv"
-
-df = pd.read_csv(DATA_PATH)
+# Request metrics for /metrics
+METRICS = Metrics(SNAPSHOTS)
+app.add_middleware(MetricsMiddleware, metrics=METRICS)
 
 # -----------------------------
 # 1️⃣ KPI SUMMARY ENDPOINT
 # -----------------------------
 @app.get("/summary")
-def get_summary():
-    try:
-        if df.empty:
-            return {"error": "Data not loaded"}
-
-        return {
-            "high_lifecycle_friction_pct": round(
-                (df["Lifecycle_Friction"].astype(str).str.strip() == "High").mean() * 100, 2
-            ),
-            "high_update_dependency_pct": round(
-                (df["udr_level"].astype(str).str.strip() == "High Dependency").mean() * 100, 2
-            ),
-            "high_demand_forecast_pct": round(
-                (df["Next_Month_Demand"].astype(str).str.strip() == "High Demand").mean() * 100, 2
-            )
-        }
-
-    except Exception as e:
-        return {
-            "error": "Summary calculation failed",
-            "details": str(e),
-            "available_columns": df.columns.tolist()
-        }
+def get_summary(request: Request):
+    return SNAPSHOTS.current.summary.response(request)
 
 # -----------------------------
 # 2️⃣ ALL DISTRICT DATA
 # -----------------------------
 @app.get("/districts")
-def get_districts():
-    try:
-        if df.empty:
-            return []
-
-        safe_df = df.copy()
+def get_districts(
+    request: Request,
+    columns: Optional[str] = None,
+    state: Optional[str] = None,
+    friction_level: Optional[str] = None,
+    udr_level: Optional[str] = None,
+    demand_level: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    latest: bool = False,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    q: Optional[str] = None,
+):
+    """
+    Without query parameters: every row (cached payload).
+    With any of them: one page {"items", "next_cursor", "total"}, where
+    `columns` is a comma-separated projection, filters accept comma-separated
+    values, `sort` is a column name (prefix "-" for descending) and
+    `next_cursor` is passed back as `cursor` to fetch the following page.
+    `q` keeps rows whose state or district name contains it. A cursor from
+    an older data version gets a 409; start again without it.
+    """
+    snapshot = SNAPSHOTS.current
+    if not request.query_params:
+        return snapshot.districts.response(request)
 
-        # Convert dates to string (JSON-safe)
-        for col in safe_df.columns:
-            if "date" in col.lower():
-                safe_df[col] = safe_df[col].astype(str)
-
-        # Replace NaN with None (JSON-safe)
-        safe_df = safe_df.where(pd.notnull(safe_df), None)
-
-        # Convert to list of dicts
-        return safe_df.to_dict(orient="records")
-
-    except Exception as e:
-        return {
-            "error": "Failed to load districts",
-            "details": str(e),
-            "columns": df.columns.tolist()
-        }
+    try:
+        items, next_cursor, total = snapshot.query_index.query(
+            columns=columns,
+            filters={
+                "state": state,
+                "friction_level": friction_level,
+                "udr_level": udr_level,
+                "demand_level": demand_level,
+            },
+            date_from=date_from,
+            date_to=date_to,
+            latest=latest,
+            sort=sort,
+            cursor=cursor,
+            limit=limit or 100,
+            q=q,
+        )
+    except StaleCursor as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
+    except (QueryError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
 
+    body = b'{"items":' + items + b',"next_cursor":' + dumps(next_cursor) + b',"total":' + dumps(total) + b"}"
+    return Response(body, media_type="application/json", headers={"X-Data-Version": snapshot.version})
 
 
 # -----------------------------
 # 3️⃣ FILTER BY STATE
 # -----------------------------
 @app.get("/districts/state/{state_name}")
-def get_districts_by_state(state_name: str):
-    filtered = df[df["state"].str.lower() == state_name.lower()]
-    return filtered.to_dict(orient="records")
+def get_districts_by_state(state_name: str, request: Request):
+    return SNAPSHOTS.current.state_index.payload(state_name).response(request)
 
 # -----------------------------
 # 4️⃣ FILTER BY DEMAND LEVEL
 # -----------------------------
 @app.get("/districts/demand/{level}")
-def get_districts_by_demand(level: str):
-    filtered = df[df["Next_Month_Demand"].str.lower() == level.lower()]
-    return filtered.to_dict(orient="records")
+def get_districts_by_demand(level: str, request: Request):
+    return SNAPSHOTS.current.demand_index.payload(level).response(request)
 
 
 @app.get("/friction-age-analysis")
-def friction_age_analysis():
+def friction_age_analysis(request: Request):
     try:
-        import pandas as pd
-        from pathlib import Path
-
-        # CANONICAL STATE MAPPING
-        CANONICAL_STATES = {
-            "andaman & nicobar islands": "Andaman & Nicobar Islands",
-            "andaman and nicobar islands": "Andaman & Nicobar Islands",
-            "andhra pradesh": "Andhra Pradesh",
-            "arunachal pradesh": "Arunachal Pradesh",
-            "assam": "Assam",
-            "bihar": "Bihar",
-            "chandigarh": "Chandigarh",
-            "chhattisgarh": "Chhattisgarh",
-            "delhi": "Delhi",
-            "goa": "Goa",
-            "gujarat": "Gujarat",
-            "haryana": "Haryana",
-            "himachal pradesh": "Himachal Pradesh",
-            "jharkhand": "Jharkhand",
-            "karnataka": "Karnataka",
-            "kerala": "Kerala",
-            "ladakh": "Ladakh",
-            "lakshadweep": "Lakshadweep",
-            "madhya pradesh": "Madhya Pradesh",
-            "maharashtra": "Maharashtra",
-            "manipur": "Manipur",
-            "meghalaya": "Meghalaya",
-            "mizoram": "Mizoram",
-            "nagaland": "Nagaland",
-            "odisha": "Odisha",
-            "orissa": "Odisha",
-            "pondicherry": "Puducherry",
-            "puducherry": "Puducherry",
-            "punjab": "Punjab",
-            "rajasthan": "Rajasthan",
-            "sikkim": "Sikkim",
-            "tamil nadu": "Tamil Nadu",
-            "telangana": "Telangana",
-            "tripura": "Tripura",
-            "uttar pradesh": "Uttar Pradesh",
-            "uttarakhand": "Uttarakhand",
-            "west bengal": "West Bengal",
-            "west bangal": "West Bengal",
-            "westbengal": "West Bengal",
-            "west  bengal": "West Bengal",
-            "jammu & kashmir": "Jammu & Kashmir",
-            "jammu and kashmir": "Jammu & Kashmir",
-            "dadra & nagar haveli": "Dadra & Nagar Haveli and Daman & Diu",
-            "dadra and nagar haveli": "Dadra & Nagar Haveli and Daman & Diu",
-            "daman & diu": "Dadra & Nagar Haveli and Daman & Diu",
-            "daman and diu": "Dadra & Nagar Haveli and Daman & Diu",
-            "dadra & nagar haveli & daman & diu": "Dadra & Nagar Haveli and Daman & Diu",
-            "dadra and nagar haveli and daman and diu": "Dadra & Nagar Haveli and Daman & Diu",
-            "the dadra & nagar haveli & daman & diu": "Dadra & Nagar Haveli and Daman & Diu",
-            "the dadra and nagar haveli and daman and diu": "Dadra & Nagar Haveli and Daman & Diu",
-        }
-
-        def normalize_state(raw):
-            if not raw:
-                return None
-            # First collapse multiple spaces, then trim
-            key = ' '.join(str(raw).lower().split())
-            return CANONICAL_STATES.get(key, raw)
-
-        # Use correct path relative to backend or absolute
-        base_path = Path(__file__).parent.parent / "output" / "enrol_monthly.csv"
-        enrol = pd.read_csv(str(base_path))
-
-        # Melt age columns into long format
-        age_cols = [col for col in enrol.columns if col.startswith('age_')]
-        melted = enrol.melt(
-            id_vars=['state', 'district', 'date', 'pincode'],
-            value_vars=age_cols,
-            var_name='age_group',
-            value_name='count'
-        )
+        return SNAPSHOTS.current.friction_age.response(request)
+    except Exception as e:
+        import traceback
+        return {"error": str(e), "traceback": traceback.format_exc()}
+
+
+@app.get("/snapshot")
+def get_snapshot():
+    snapshot = SNAPSHOTS.current
+    return {
+        "version": snapshot.version,
+        "loaded_at": snapshot.loaded_at,
+        "rows": len(snapshot.df),
+        "low_memory": LOW_MEMORY,
+        "memory_bytes": snapshot.memory_bytes,
+    }
 
-        # Remove junk rows (where state is just a number)
-        melted = melted[~melted['state'].astype(str).str.isdigit()]
-
-        # Normalize state names
-        melted['state'] = melted['state'].apply(normalize_state)
-        melted = melted[melted['state'].notna()]
-
-        # Clean up age_group names (e.g., age_0_5 -> 0-5 years)
-        melted['age_group'] = melted['age_group'].str.replace('age_', '')
-        melted['age_group'] = melted['age_group'].str.replace('_', '-')
-        melted['age_group'] = melted['age_group'].str.replace('18-greater', '18+')
-        melted['age_group'] = melted['age_group'] + ' years'
-
-        # Aggregate updates per normalized state & age group
-        agg = (
-            melted
-            .groupby(["state", "age_group"])["count"]
-            .sum()
-            .reset_index()
-            .rename(columns={"count": "num_updates"})
+
+class WhatIfRequest(BaseModel):
+    # {rule: {setting: value}}, e.g. {"udr": {"bands": [[">=", 0.4], [">", 1.2]]}}
+    rules: Dict[str, Dict[str, Any]] = {}
+    include_districts: bool = False
+
+
+@app.get("/aggregate")
+def get_aggregate(
+    group_by: Optional[str] = None,
+    metrics: Optional[str] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    age_group: Optional[str] = None,
+    date: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    """
+    Sum metrics over any grouping of state, district, date and age_group,
+    e.g. /aggregate?group_by=state,date&metrics=enrolments,udr&date_from=2025-01.
+    Filters accept comma-separated values. Answered from the smallest
+    precomputed rollup that has the dimensions the query needs.
+    """
+    snapshot = SNAPSHOTS.current
+    try:
+        rows, rollup = snapshot.aggregates.query(
+            group_by=group_by,
+            metrics=metrics,
+            filters={"state": state, "district": district, "age_group": age_group, "date": date},
+            date_from=date_from,
+            date_to=date_to,
         )
+    except (QueryError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    return Response(b'{"rollup":' + dumps(rollup) + b',"rows":' + rows + b"}",
+                    media_type="application/json", headers={"X-Data-Version": snapshot.version})
+
+
+@app.get("/export/{table}")
+def export_table(
+    table: str,
+    format: str = "csv",
+    columns: Optional[str] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    """
+    Stream a pipeline table (e.g. admin_decision_dashboard, enrol_monthly) as
+    csv, ndjson or parquet, batch by batch. `columns`, `state` and `district`
+    take comma-separated values.
+    """
+    try:
+        chunks, media_type = export(table, format, columns, state, district, date_from, date_to)
+    except (QueryError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except FileNotFoundError as e:
+        return JSONResponse(status_code=404, content={"error": str(e)})
 
-        # Define friction levels based on volume
-        def classify_friction(x):
-            if x > 50000:
-                return "High"
-            elif x > 10000:
-                return "Medium"
-            else:
-                return "Low"
+    return StreamingResponse(chunks, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{table}.{format}"',
+    })
 
-        agg["friction_level"] = agg["num_updates"].apply(classify_friction)
 
-        return agg.to_dict(orient="records")
-    except Exception as e:
-        import traceback
-        return {"error": str(e), "traceback": traceback.format_exc()}
+# State boundaries for the demand map; simplified per zoom level on first use
+STATES_GEOMETRY = GeometryLayer(STATES_GEOJSON) if STATES_GEOJSON.exists() else None
+
+
+@app.get("/map/states/geometry")
+def get_state_geometry(request: Request, zoom: int = 5):
+    """State polygons simplified and rounded for `zoom`; features keyed by state name."""
+    if STATES_GEOMETRY is None:
+        return JSONResponse(status_code=404, content={"error": f"No state boundaries at {STATES_GEOJSON}"})
+    return STATES_GEOMETRY.payload(zoom).response(request)
+
+
+@app.get("/map/states/data")
+def get_state_map_data(request: Request):
+    """Per-state demand and friction aggregates, keyed like the geometry features."""
+    return SNAPSHOTS.current.map_states.response(request)
+
+
+@app.get("/rules")
+def get_rules():
+    return SNAPSHOTS.current.rules
+
+
+@app.post("/what-if")
+def what_if(request: WhatIfRequest):
+    """Re-grade every district under trial rules (nothing is saved)."""
+    snapshot = SNAPSHOTS.current
+    try:
+        result = snapshot.whatif.score(request.rules, include_rows=request.include_districts)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    return {"version": snapshot.version, **result}
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/debug/slow-requests", include_in_schema=False)
+def get_slow_requests():
+    if METRICS.profiler is None:
+        return {"enabled": False, "requests": []}
+    return {"enabled": True, "requests": list(METRICS.profiler.slow_requests)}
 
 
 # -----------------------------
 # 5️⃣ USER DASHBOARD API
 # -----------------------------
 
-# --- MOCK DATA ---
+# Centre directory (backend/data/aadhaar_centres.csv or $AADHAAR_CENTRES_FILE),
+# spatially indexed for nearest-centre search and text-indexed for search
+CENTRES = CentreIndex.from_csv()
+CENTRE_SEARCH = CentreSearchIndex(CENTRES.records)
 
-AADHAR_CENTRES = [
-    # --- HYDERABAD ---
-    {"id": 101, "name": "UIDAI Regional Office, Ameerpet", "address": "6th Floor, A Block, Swarna Jayanthi Complex, Ameerpet, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4375, "lon": 78.4483},
-    {"id": 102, "name": "Aadhar Seva Kendra, Madhapur", "address": "Opp Cyber Towers, Hitech City, Madhapur, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4474, "lon": 78.3762},
-    {"id": 103, "name": "MeeSeva Centre, Kukatpally", "address": "KPHB Colony, Near Bus Stop, Kukatpally, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4933, "lon": 78.4017},
-    {"id": 104, "name": "Post Office Aadhar Centre, Secunderabad", "address": "Head Post Office, Patny Center, Secunderabad", "city": "Secunderabad", "state": "Telangana", "lat": 17.4399, "lon": 78.4983},
-    {"id": 105, "name": "Aadhar Seva Kendra, Begumpet", "address": "Prakash Nagar, Begumpet, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4447, "lon": 78.4664},
-    {"id": 106, "name": "Aadhar Centre, Mehdipatnam", "address": "Rythu Bazar Road, Mehdipatnam, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.3956, "lon": 78.4392},
-    {"id": 107, "name": "MeeSeva, Dilsukhnagar", "address": "Near Mega Theatre, Dilsukhnagar, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.3685, "lon": 78.5316},
-    {"id": 108, "name": "Aadhar Seva Kendra, LB Nagar", "address": "Near LB Nagar Crossroads, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.3497, "lon": 78.5524},
-    {"id": 109, "name": "Post Office Aadhar, Uppal", "address": "Survey of India, Uppal, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4018, "lon": 78.5602},
-    {"id": 110, "name": "Aadhar Centre, Gachibowli", "address": "Near Stadium, Gachibowli, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4401, "lon": 78.3489},
-    {"id": 111, "name": "MeeSeva, Miyapur", "address": "Miyapur X Roads, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4968, "lon": 78.3615},
-    {"id": 112, "name": "Aadhar Centre, Kondapur", "address": "Botanical Garden Rd, Kondapur, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4622, "lon": 78.3568},
-    {"id": 113, "name": "MeeSeva, Charminar", "address": "Near Charminar, Old City, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.3616, "lon": 78.4747},
-    {"id": 114, "name": "Aadhar Seva Kendra, Banjara Hills", "address": "Road No 12, Banjara Hills, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4137, "lon": 78.4403},
-    {"id": 115, "name": "Aadhar Centre, Jubilee Hills", "address": "Road No 36, Jubilee Hills, Hyderabad", "city": "Hyderabad", "state": "Telangana", "lat": 17.4326, "lon": 78.4071},
-
-    # --- WARANGAL ---
-    {"id": 201, "name": "Aadhar Seva Kendra, Hanamkonda", "address": "Nakkalagutta, Hanamkonda, Warangal", "city": "Warangal", "state": "Telangana", "lat": 18.0072, "lon": 79.5582},
-    {"id": 202, "name": "Warangal Head Post Office", "address": "Station Road, Warangal", "city": "Warangal", "state": "Telangana", "lat": 17.9689, "lon": 79.5941},
-    {"id": 203, "name": "MeeSeva Centre, Kazipet", "address": "Railway Station Road, Kazipet, Warangal", "city": "Warangal", "state": "Telangana", "lat": 17.9784, "lon": 79.5342},
-
-    # --- KARIMNAGAR ---
-    {"id": 301, "name": "Aadhar Seva Kendra, Karimnagar", "address": "Bus Stand Road, Karimnagar", "city": "Karimnagar", "state": "Telangana", "lat": 18.4386, "lon": 79.1288},
-    {"id": 302, "name": "Head Post Office, Karimnagar", "address": "Collectorate Complex, Karimnagar", "city": "Karimnagar", "state": "Telangana", "lat": 18.4348, "lon": 79.1329},
-
-    # --- NIZAMABAD ---
-    {"id": 401, "name": "Aadhar Seva Kendra, Nizamabad", "address": "Khaleelwadi, Nizamabad", "city": "Nizamabad", "state": "Telangana", "lat": 18.6725, "lon": 78.0941},
-    {"id": 402, "name": "MeeSeva, Bodhan", "address": "Main Road, Bodhan, Nizamabad", "city": "Nizamabad", "state": "Telangana", "lat": 18.6657, "lon": 77.8821},
-
-    # --- KHAMMAM ---
-    {"id": 501, "name": "Aadhar Centre, Khammam", "address": "Wyra Road, Khammam", "city": "Khammam", "state": "Telangana", "lat": 17.2473, "lon": 80.1514},
-    {"id": 502, "name": "Head Post Office, Khammam", "address": "Trunk Road, Khammam", "city": "Khammam", "state": "Telangana", "lat": 17.2510, "lon": 80.1470},
-
-    # --- NALGONDA ---
-    {"id": 601, "name": "Aadhar Seva Kendra, Nalgonda", "address": "Clock Tower Center, Nalgonda", "city": "Nalgonda", "state": "Telangana", "lat": 17.0575, "lon": 79.2684},
-    {"id": 602, "name": "MeeSeva, Miryalaguda", "address": "Sagar Road, Miryalaguda", "city": "Miryalaguda", "state": "Telangana", "lat": 16.8687, "lon": 79.5694},
-
-    # --- MAHABUBNAGAR ---
-    {"id": 701, "name": "Aadhar Centre, Mahabubnagar", "address": "New Town, Mahabubnagar", "city": "Mahabubnagar", "state": "Telangana", "lat": 16.7488, "lon": 78.0035},
-
-    # --- ADILABAD ---
-    {"id": 801, "name": "Head Post Office, Adilabad", "address": "Cinema Road, Adilabad", "city": "Adilabad", "state": "Telangana", "lat": 19.6759, "lon": 78.5320},
-
-    # --- OTHER DISTRICTS (SAMPLES) ---
-    {"id": 901, "name": "MeeSeva, Siddipet", "address": "Medak Road, Siddipet", "city": "Siddipet", "state": "Telangana", "lat": 18.1010, "lon": 78.8521},
-    {"id": 902, "name": "Aadhar Centre, Mancherial", "address": "Bellampalli Road, Mancherial", "city": "Mancherial", "state": "Telangana", "lat": 18.8679, "lon": 79.4639},
-    {"id": 903, "name": "Post Office, Suryapet", "address": "Kudakuda Road, Suryapet", "city": "Suryapet", "state": "Telangana", "lat": 17.1439, "lon": 79.6239}
-]
-
-# (Previously Service Docs were here, kept unchanged if not replaced. 
-# But since I'm replacing lines 224 to 383 which included SERVICE_DOCUMENTS 
-# in the view above, I must include them or be careful. 
-# Looking at line numbers in view_file: 
-# AADHAR_CENTRES starts line 224. 
-# SERVICE_DOCUMENTS starts line 299.
-# ENDPOINTS start line 322.
-# get_centers ends at 383.
-# I will supply the full replacement for this block to be safe and clean.)
+# --- MOCK DATA ---
 
 SERVICE_DOCUMENTS = {
     "new_enrollment": [
@@ -307,10 +307,6 @@ SERVICE_DOCUMENTS = {
 
 # --- ENDPOINTS ---
 
-from pydantic import BaseModel
-from typing import Optional
-import math
-
 class LoginRequest(BaseModel):
     type: str # 'user' or 'admin'
     email: str
@@ -341,43 +337,26 @@ def login(request: LoginRequest):
     return {"success": False, "message": "Invalid login type"}
 
 @app.get("/centers")
-def get_centers(city: Optional[str] = None, lat: Optional[float] = None, lon: Optional[float] = None):
-    # Start with a copy
-    results = [c.copy() for c in AADHAR_CENTRES]
-
-    # Manual Filter by City/State (Case insensitive partial match)
-    # Kept as fallback if simple text search is needed, but Geo search is preferred
+def get_centers(
+    city: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    radius_km: Optional[float] = Query(None, gt=0),
+):
+    # Text search over centre name, locality/address, city and state
+    # (prefix and typo tolerant, ranked); no geocoder needed
     if city:
-        query = city.lower().strip()
-        results = [
-            c for c in results 
-            if query in c['city'].lower() or query in c['state'].lower()
-        ]
-        return results
-
-    # Geo Filter (Sort by distance) + Distance Injection
+        return CENTRE_SEARCH.search(city)
+
+    # Geo search: k nearest, or everything within radius_km (nearest first),
+    # with the distance in km injected into each centre
     if lat is not None and lon is not None:
-        def haversine_km(lat1, lon1, lat2, lon2):
-            R = 6371  # Earth radius in km
-            d_lat = math.radians(lat2 - lat1)
-            d_lon = math.radians(lon2 - lon1)
-            a = (math.sin(d_lat / 2) * math.sin(d_lat / 2) +
-                 math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-                 math.sin(d_lon / 2) * math.sin(d_lon / 2))
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-            return R * c
-
-        # Calculate distance for ALL items first
-        for c in results:
-            c['distance'] = round(haversine_km(lat, lon, c['lat'], c['lon']), 2)
-
-        # Sort by distance
-        results.sort(key=lambda x: x['distance'])
-        
-        # Return top 5 nearest
-        return results[:5]
-
-    return results
+        if radius_km is not None:
+            return CENTRES.within(lat, lon, radius_km)
+        return CENTRES.nearest(lat, lon, k)
+
+    return [dict(c) for c in CENTRES.records]
 
 @app.get("/services")
 def get_services():
@@ -0,0 +1,257 @@
+"""
+Aadhaar centre directory with a spatial index for nearest-centre search and
+a text index for searching centres by name, locality, city or state.
+
+Centres are loaded from a CSV (id, name, address, city, state, lat, lon) and
+bucketed into a lat/lon grid. A k-nearest query scans rings of grid cells
+outwards from the query point until no unscanned cell can hold anything
+closer than the current k-th result; a radius query scans only the cells
+overlapping the circle. Distances are computed with vectorized haversine
+over the candidates only.
+
+Text search tokenizes every centre once into an inverted index. Query terms
+match vocabulary tokens exactly, by prefix (bisect over the sorted
+vocabulary) or within a small edit distance (candidates come from a
+trigram index), and centres are ranked by match quality and field weight.
+"""
+import bisect
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from backend.config import CENTRES_FILE
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = np.pi * EARTH_RADIUS_KM / 180
+
+# Grid cell size in degrees (~28 km north-south)
+CELL_DEG = 0.25
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Distance in km from one point to arrays of points (all in degrees)."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class CentreIndex:
+    def __init__(self, centres, cell_deg=CELL_DEG):
+        self.frame = pd.DataFrame(centres).reset_index(drop=True)
+        self.records = self.frame.to_dict(orient="records")
+        self.lat = self.frame["lat"].to_numpy(dtype=float)
+        self.lon = self.frame["lon"].to_numpy(dtype=float)
+        self.cell_deg = cell_deg
+
+        # Sort points by cell so each cell is a contiguous slice of `self.order`
+        rows = np.floor(self.lat / cell_deg).astype(np.int64)
+        cols = np.floor(self.lon / cell_deg).astype(np.int64)
+        self.order = np.lexsort((cols, rows))
+        self.cells = {}
+        if len(self.order):
+            keys = np.stack([rows[self.order], cols[self.order]], axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            bounds = np.concatenate([[0], starts, [len(self.order)]])
+            for s, e in zip(bounds[:-1], bounds[1:]):
+                self.cells[(int(keys[s, 0]), int(keys[s, 1]))] = (int(s), int(e))
+            self.row_range = (int(rows.min()), int(rows.max()))
+            self.col_range = (int(cols.min()), int(cols.max()))
+        self.max_lat = float(np.abs(self.lat).max()) if len(self.lat) else 0.0
+
+    @classmethod
+    def from_csv(cls, path=CENTRES_FILE, **kwargs):
+        return cls(pd.read_csv(path), **kwargs)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _cell_points(self, row, col):
+        span = self.cells.get((row, col))
+        return self.order[span[0]:span[1]] if span else None
+
+    def _ring(self, row, col, r):
+        """
+        Point ids in the cells at Chebyshev distance exactly r from (row, col).
+        Only the part of the ring inside the occupied bounding box is visited.
+        """
+        (row0, row1), (col0, col1) = self.row_range, self.col_range
+        cols = range(max(col - r, col0), min(col + r, col1) + 1)
+        cells = []
+        for ring_row in range(max(row - r, row0), min(row + r, row1) + 1):
+            if abs(ring_row - row) == r:
+                cells += [(ring_row, c) for c in cols]
+            else:
+                cells += [(ring_row, c) for c in {col - r, col + r} if col0 <= c <= col1]
+        return [p for p in (self._cell_points(*c) for c in cells) if p is not None]
+
+    def _results(self, ids, dist):
+        out = []
+        for i, d in zip(ids, dist):
+            record = dict(self.records[i])
+            record["distance"] = round(float(d), 2)
+            out.append(record)
+        return out
+
+    def nearest(self, lat, lon, k=5):
+        """The k centres closest to (lat, lon), nearest first."""
+        k = min(int(k), len(self))
+        if k <= 0:
+            return []
+        row = int(np.floor(lat / self.cell_deg))
+        col = int(np.floor(lon / self.cell_deg))
+        (row0, row1), (col0, col1) = self.row_range, self.col_range
+        max_r = max(abs(row - row0), abs(row - row1), abs(col - col0), abs(col - col1))
+        # Rings closer than the occupied bounding box are empty
+        min_r = max(0, row0 - row, row - row1, col0 - col, col - col1)
+
+        # Smallest km width of a cell anywhere the search can reach
+        km_per_cell = self.cell_deg * KM_PER_DEG_LAT * np.cos(
+            np.radians(min(89.0, max(abs(lat), self.max_lat) + self.cell_deg)))
+
+        chunks = []
+        ids = dist = None
+        for r in range(min_r, max_r + 1):
+            chunks.extend(self._ring(row, col, r))
+            if not chunks:
+                continue
+            ids = np.concatenate(chunks)
+            if len(ids) < k:
+                continue
+            dist = haversine_km(lat, lon, self.lat[ids], self.lon[ids])
+            kth = np.partition(dist, k - 1)[k - 1]
+            # Anything outside rings 0..r is at least r cells away
+            if kth <= r * km_per_cell:
+                break
+        else:
+            ids = np.concatenate(chunks)
+            dist = haversine_km(lat, lon, self.lat[ids], self.lon[ids])
+
+        top = np.argpartition(dist, k - 1)[:k] if k < len(dist) else np.arange(len(dist))
+        top = top[np.argsort(dist[top], kind="stable")]
+        return self._results(ids[top], dist[top])
+
+    def within(self, lat, lon, radius_km, limit=None):
+        """Centres within radius_km of (lat, lon), nearest first."""
+        if not len(self):
+            return []
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlon = radius_km / (KM_PER_DEG_LAT * max(np.cos(np.radians(min(89.0, abs(lat) + dlat))), 1e-6))
+        row0, row1 = int(np.floor((lat - dlat) / self.cell_deg)), int(np.floor((lat + dlat) / self.cell_deg))
+        col0, col1 = int(np.floor((lon - dlon) / self.cell_deg)), int(np.floor((lon + dlon) / self.cell_deg))
+        row0, row1 = max(row0, self.row_range[0]), min(row1, self.row_range[1])
+        col0, col1 = max(col0, self.col_range[0]), min(col1, self.col_range[1])
+
+        chunks = [p for r in range(row0, row1 + 1) for c in range(col0, col1 + 1)
+                  if (p := self._cell_points(r, c)) is not None]
+        if not chunks:
+            return []
+        ids = np.concatenate(chunks)
+        dist = haversine_km(lat, lon, self.lat[ids], self.lon[ids])
+        keep = dist <= radius_km
+        ids, dist = ids[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")[:limit]
+        return self._results(ids[order], dist[order])
+
+
+# -----------------------------
+# Text search
+# -----------------------------
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# How much a match in each field counts towards a centre's score
+FIELD_WEIGHTS = {"name": 3.0, "city": 2.5, "address": 2.0, "state": 1.0}
+EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.6
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def trigrams(token):
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(token):
+    return 0 if len(token) <= 3 else 1 if len(token) <= 6 else 2
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class CentreSearchIndex:
+    def __init__(self, records):
+        self.records = records
+        # token -> {centre position: best field weight for that token}
+        self.postings = defaultdict(dict)
+        for pos, record in enumerate(records):
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(record.get(field, "")):
+                    if self.postings[token].get(pos, 0) < weight:
+                        self.postings[token][pos] = weight
+        self.vocab = sorted(self.postings)
+        self.grams = defaultdict(set)
+        for token in self.vocab:
+            for gram in trigrams(token):
+                self.grams[gram].add(token)
+
+    def _matches(self, term):
+        """Vocabulary tokens matching a query term, with their match quality."""
+        found = {}
+        if term in self.postings:
+            found[term] = EXACT
+        i = bisect.bisect_left(self.vocab, term)
+        while i < len(self.vocab) and self.vocab[i].startswith(term):
+            found.setdefault(self.vocab[i], PREFIX)
+            i += 1
+        limit = max_typos(term)
+        if limit:
+            shared = defaultdict(int)
+            for gram in trigrams(term):
+                for token in self.grams.get(gram, ()):
+                    shared[token] += 1
+            for token, count in shared.items():
+                if token in found or count < 2:
+                    continue
+                # Also allow typos in a prefix: 'kukatpaly' vs 'kukatpally'
+                dist = min(edit_distance(term, token, limit),
+                           edit_distance(term, token[:len(term)], limit))
+                if dist <= limit:
+                    found[token] = FUZZY - 0.1 * dist
+        return found
+
+    def search(self, query, limit=50):
+        """Centres matching every term of the query, best matches first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            term_scores = defaultdict(float)
+            for token, quality in self._matches(term).items():
+                for pos, weight in self.postings[token].items():
+                    term_scores[pos] = max(term_scores[pos], quality * weight)
+            if scores is None:
+                scores = dict(term_scores)
+            else:
+                scores = {pos: s + term_scores[pos] for pos, s in scores.items() if pos in term_scores}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.records[item[0]]["name"]))
+        return [dict(self.records[pos], score=round(score, 2)) for pos, score in ranked[:limit]]
@@ -0,0 +1,37 @@
+"""
+Backend settings, read from environment variables.
+
+AADHAAR_OUTPUT_DIR       pipeline output directory holding the columnar store
+                         (read by src/store.py; default: <repo>/output)
+AADHAAR_RELOAD_INTERVAL  seconds between checks for new pipeline outputs
+                         (default 30; 0 disables hot reload)
+AADHAAR_CENTRES_FILE     centre directory CSV
+                         (default: backend/data/aadhaar_centres.csv)
+AADHAAR_STATES_GEOJSON   full-resolution state boundaries for the demand map
+                         (default: frontend/public/india_states.geojson)
+AADHAAR_SHARED_SNAPSHOTS  1 to build each snapshot once into a memory-mapped
+                         file that every uvicorn worker attaches to (default 0)
+AADHAAR_LOW_MEMORY       1 to hold tables with the compact dtypes of
+                         src/schema.py (categoricals, small ints, float32)
+AADHAAR_PROFILE_SLOW_MS  profile requests slower than this many ms
+                         (default 0: profiler off)
+AADHAAR_PROFILE_INTERVAL_MS  stack sampling interval of the profiler (default 5)
+"""
+import os
+from pathlib import Path
+
+from src import schema, store
+
+OUTPUT_DIR = store.OUTPUT_DIR
+RELOAD_INTERVAL = float(os.environ.get("AADHAAR_RELOAD_INTERVAL", "30"))
+CENTRES_FILE = Path(os.environ.get(
+    "AADHAAR_CENTRES_FILE", Path(__file__).resolve().parent / "data" / "aadhaar_centres.csv"
+))
+STATES_GEOJSON = Path(os.environ.get(
+    "AADHAAR_STATES_GEOJSON",
+    Path(__file__).resolve().parent.parent / "frontend" / "public" / "india_states.geojson"
+))
+LOW_MEMORY = schema.LOW_MEMORY
+SHARED_SNAPSHOTS = os.environ.get("AADHAAR_SHARED_SNAPSHOTS", "0") == "1"
+PROFILE_SLOW_MS = float(os.environ.get("AADHAAR_PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.environ.get("AADHAAR_PROFILE_INTERVAL_MS", "5"))
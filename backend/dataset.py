@@ -0,0 +1,127 @@
+"""
+One loaded version of the dashboard data with everything derived from it:
+lookup indexes and pre-serialized payloads. A snapshot is immutable once
+built; the snapshot manager swaps whole snapshots in.
+"""
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src import canonical, cube, rules, schema, store
+from backend.aggregates import AggregateIndex, read_cube
+from backend.geometry import state_aggregates
+from backend.indexes import DistrictQueryIndex, LookupIndex
+from backend.payloads import CachedPayload
+from backend.whatif import WhatIfModel
+
+# Pipeline tables a snapshot is built from
+SOURCE_TABLES = ("admin_decision_dashboard", "enrol_monthly", *cube.TABLES)
+
+# Age columns of enrol_monthly and their display labels
+AGE_GROUPS = {
+    "age_0_5": "0-5 years",
+    "age_5_17": "5-17 years",
+    "age_18_greater": "18+ years",
+}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: str
+    loaded_at: float
+    df: pd.DataFrame
+    state_index: LookupIndex
+    demand_index: LookupIndex
+    query_index: DistrictQueryIndex
+    summary: CachedPayload
+    districts: CachedPayload
+    friction_age: CachedPayload
+    rules: dict
+    whatif: WhatIfModel
+    aggregates: AggregateIndex
+    map_states: CachedPayload
+    # In-memory bytes of each source table (compact dtypes in low-memory mode)
+    memory_bytes: dict
+
+
+def compute_summary(frame):
+    try:
+        if frame.empty:
+            return {"error": "Data not loaded"}
+
+        return {
+            "high_lifecycle_friction_pct": round(
+                (frame["Lifecycle_Friction"].astype(str).str.strip() == "High").mean() * 100, 2
+            ),
+            "high_update_dependency_pct": round(
+                (frame["udr_level"].astype(str).str.strip() == "High Dependency").mean() * 100, 2
+            ),
+            "high_demand_forecast_pct": round(
+                (frame["Next_Month_Demand"].astype(str).str.strip() == "High Demand").mean() * 100, 2
+            )
+        }
+
+    except Exception as e:
+        return {
+            "error": "Summary calculation failed",
+            "details": str(e),
+            "available_columns": frame.columns.tolist()
+        }
+
+
+def build_friction_age(enrol, rule):
+    # Remove junk rows (where state is just a number) and empty states
+    enrol = enrol[~canonical.is_junk_state(enrol["state"])]
+
+    # Normalize state names, then sum each age column per state
+    per_state = (
+        enrol[list(AGE_GROUPS)]
+        .groupby(canonical.canonical_states(enrol["state"]).rename("state"), observed=True)
+        .sum()
+    )
+
+    # One row per (state, age group)
+    agg = (
+        per_state
+        .rename(columns=AGE_GROUPS)
+        .reset_index()
+        .melt(id_vars="state", var_name="age_group", value_name="num_updates")
+        .sort_values(["state", "age_group"])
+        .reset_index(drop=True)
+    )
+    agg["friction_level"] = rules.level(agg["num_updates"], rule)
+    return agg
+
+
+def load_snapshot(version):
+    """Read the source tables and build every index and payload for them."""
+    # Dashboard rows with canonical state/district names
+    spellings = store.read_table("district_spellings") if store.has_table("district_spellings") else None
+    df = canonical.canonicalize(store.read_table("admin_decision_dashboard"), drop_junk=False,
+                                spellings=spellings)
+    df = schema.apply(df, "admin_decision_dashboard")
+    enrol = store.read_table("enrol_monthly", columns=["state", *AGE_GROUPS])
+    cube_tables = read_cube()
+    scoring = rules.load_rules()
+    friction_age = build_friction_age(enrol, scoring["friction_age"])
+    query_index = DistrictQueryIndex(df, version)
+
+    return Snapshot(
+        version=version,
+        loaded_at=time.time(),
+        df=df,
+        state_index=LookupIndex(df, "state", version),
+        demand_index=LookupIndex(df, "Next_Month_Demand", version),
+        query_index=query_index,
+        summary=CachedPayload.from_obj(compute_summary(df), version),
+        districts=CachedPayload.from_frame(df, version),
+        friction_age=CachedPayload.from_frame(friction_age, version),
+        rules=scoring,
+        whatif=WhatIfModel(df, friction_age, scoring, query_index.latest),
+        aggregates=AggregateIndex(cube_tables, scoring["lfi"]),
+        map_states=CachedPayload.from_obj({"version": version, "states": state_aggregates(
+            df, query_index.latest, scoring["demand"], scoring["state_demand"])}, version),
+        memory_bytes={name: schema.memory_bytes(frame) for name, frame in
+                      {"admin_decision_dashboard": df, "enrol_monthly": enrol, **cube_tables}.items()},
+    )
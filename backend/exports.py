@@ -0,0 +1,146 @@
+"""
+Streaming exports of pipeline tables as CSV, NDJSON or Parquet.
+
+Rows are read from the columnar store batch by batch (store.scan_batches),
+with column projection, month pruning and state / district / date filters
+pushed down to the Parquet scan, and every batch is encoded and sent before
+the next one is read, so memory stays flat whatever the size of the table.
+"""
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from backend.indexes import QueryError
+from src import canonical, cube, store
+
+# Tables that can be exported
+TABLES = (
+    "admin_decision_dashboard",
+    "enrol_monthly", "demo_monthly", "bio_monthly",
+    "lifecycle_friction_index", "update_dependency_ratio",
+    "demand_forecast_actions", "demand_forecast_horizons", "quarantine",
+    "zero_enrolment",
+    *cube.TABLES,
+)
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _plain(batch):
+    """Dictionary columns as strings and timestamps as YYYY-MM-DD, for text formats."""
+    columns = []
+    for column in batch.columns:
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(pa.string())
+        elif pa.types.is_timestamp(column.type):
+            column = pc.strftime(column, format="%Y-%m-%d")
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def _csv(batches):
+    header = True
+    for batch in batches:
+        buf = io.BytesIO()
+        pacsv.write_csv(_plain(batch), buf, pacsv.WriteOptions(include_header=header))
+        header = False
+        yield buf.getvalue()
+
+
+def _ndjson(batches):
+    for batch in batches:
+        if not batch.num_rows:
+            continue
+        frame = _plain(batch).to_pandas()
+        yield frame.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands its bytes back to the generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        out, self.chunks = b"".join(self.chunks), []
+        return out
+
+
+def _parquet(batches):
+    sink = _Sink()
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema)
+        # One row group per batch
+        if batch.num_rows:
+            writer.write_batch(batch)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+ENCODERS = {"csv": _csv, "ndjson": _ndjson, "parquet": _parquet}
+
+
+def export(name, fmt="csv", columns=None, state=None, district=None, date_from=None, date_to=None):
+    """
+    Validate an export request and return (chunk generator, media type).
+    Nothing is read until the generator is iterated.
+    """
+    if name not in TABLES:
+        raise QueryError(f"Unknown table: {name}")
+    if fmt not in ENCODERS:
+        raise QueryError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+    wanted = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    available = store.columns_of(name)
+    unknown = [c for c in wanted or [] if c not in available]
+    if unknown:
+        raise QueryError(f"Unknown column(s): {', '.join(unknown)}")
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    for param, value in (("state", state), ("district", district), ("date", date_from or date_to)):
+        if value and param not in available:
+            raise QueryError(f"Table '{name}' has no {param} column")
+    if state:
+        states = canonical.canonical_states(pd.Series(state.split(","))).astype(str).tolist()
+        expr = both(expr, ds.field("state").isin(states))
+    if district:
+        expr = both(expr, ds.field("district").isin([d.strip() for d in district.split(",")]))
+    if date_from:
+        expr = both(expr, ds.field("date") >= pa.scalar(pd.Timestamp(date_from), pa.timestamp("ns")))
+    if date_to:
+        # date_to=YYYY-MM covers the whole month
+        end = pd.Timestamp(date_to) + pd.offsets.MonthEnd(0)
+        expr = both(expr, ds.field("date") <= pa.scalar(end, pa.timestamp("ns")))
+
+    def batches():
+        empty = True
+        for batch in store.scan_batches(name, columns=wanted, start=date_from, end=date_to, filter=expr):
+            empty = False
+            yield batch
+        if empty:
+            # No rows matched: still send the header / a valid file with the table's schema
+            yield pa.RecordBatch.from_pylist([], schema=store.schema_of(name, wanted))
+
+    return ENCODERS[fmt](batches()), FORMATS[fmt]
@@ -0,0 +1,208 @@
+"""
+Choropleth geometry for the demand map, prepared once on the server.
+
+The source GeoJSON (full resolution) is simplified per zoom level with
+Douglas-Peucker at a tolerance of about one screen pixel, and its coordinates
+are rounded to the precision that zoom can show (consecutive duplicates and
+collapsed rings are dropped). Each level is serialized once and cached, with
+an ETag derived from the source file, so geometry is versioned separately
+from the data.
+
+Features are keyed by canonical state name (`id`), the same key as the
+per-state aggregates built with every dataset snapshot, so the client joins
+them with a dictionary lookup.
+"""
+import hashlib
+import json
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from backend.payloads import CachedPayload
+from src import canonical, rules
+
+# Zoom levels with prepared geometry; requests are clamped to this range
+MIN_ZOOM, MAX_ZOOM = 3, 10
+TILE_SIZE = 256
+
+
+def pixel_degrees(zoom):
+    """Width of one screen pixel in degrees of longitude at a web-map zoom level."""
+    return 360.0 / (TILE_SIZE * 2 ** zoom)
+
+
+def simplify(points, tolerance):
+    """Douglas-Peucker: indices of the points to keep (endpoints always kept)."""
+    n = len(points)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        ab = b - a
+        length = np.hypot(*ab)
+        if length == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return np.flatnonzero(keep)
+
+
+def prepare_ring(ring, tolerance, decimals):
+    """Simplified, rounded closed ring, or None if it collapses."""
+    points = np.asarray(ring, dtype=float)[:, :2]
+    if len(points) > 1 and np.array_equal(points[0], points[-1]):
+        points = points[:-1]
+    if len(points) < 3:
+        return None
+    # Split the closed ring at its farthest point so both halves have fixed ends
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    first = simplify(points[:far + 1], tolerance)
+    second = simplify(np.vstack([points[far:], points[:1]]), tolerance) + far
+    kept = points[np.concatenate([first, second[1:-1]]) % len(points)]
+
+    kept = np.round(kept, decimals)
+    kept = kept[np.r_[True, np.any(np.diff(kept, axis=0) != 0, axis=1)]]
+    if len(kept) > 1 and np.array_equal(kept[0], kept[-1]):
+        kept = kept[:-1]
+    if len(kept) < 3:
+        return None
+    return np.vstack([kept, kept[:1]]).tolist()
+
+
+def prepare_polygons(polygons, tolerance, decimals):
+    out = []
+    for rings in polygons:
+        exterior = prepare_ring(rings[0], tolerance, decimals)
+        if exterior is None:
+            continue
+        holes = [r for r in (prepare_ring(h, tolerance, decimals) for h in rings[1:]) if r is not None]
+        out.append([exterior, *holes])
+    if not out and polygons:
+        # Keep tiny features visible: their largest polygon, barely simplified
+        largest = max(polygons, key=lambda rings: len(rings[0]))
+        ring = prepare_ring(largest[0], 0.0, decimals + 2)
+        if ring is not None:
+            out.append([ring])
+    return out
+
+
+def polygons_of(geometry):
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+class GeometryLayer:
+    """One GeoJSON layer (e.g. states) with per-zoom cached payloads."""
+
+    def __init__(self, path, name_property="NAME_1"):
+        raw = path.read_bytes()
+        self.version = hashlib.sha256(raw).hexdigest()[:12]
+        features = json.loads(raw)["features"]
+        names = [f.get("properties", {}).get(name_property) for f in features]
+        ids = canonical.canonical_states(pd.Series(names, dtype=object).fillna("")).tolist()
+        self.features = [
+            (key, name, polygons_of(f.get("geometry")))
+            for key, name, f in zip(ids, names, features)
+        ]
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def payload(self, zoom):
+        zoom = min(max(int(zoom), MIN_ZOOM), MAX_ZOOM)
+        with self._lock:
+            if zoom not in self._payloads:
+                self._payloads[zoom] = CachedPayload.from_obj(self.collection(zoom), f"{self.version}-z{zoom}")
+            return self._payloads[zoom]
+
+    def collection(self, zoom):
+        px = pixel_degrees(zoom)
+        # Rounding error stays under half a pixel
+        decimals = max(0, math.ceil(math.log10(2 / px)))
+        features = []
+        for key, name, polygons in self.features:
+            prepared = prepare_polygons(polygons, px, decimals)
+            if not prepared:
+                continue
+            features.append({
+                "type": "Feature",
+                "id": key,
+                "properties": {"name": name},
+                "geometry": {"type": "MultiPolygon", "coordinates": prepared},
+            })
+        return {"type": "FeatureCollection", "version": self.version, "zoom": zoom, "features": features}
+
+
+def state_aggregates(frame, latest, demand_rule, state_rule):
+    """
+    Per-state demand and friction figures for the map, from each district's
+    latest dashboard row, keyed by canonical state name; junk states are
+    dropped as in the cube.
+
+    A state's demand level grades the mean of its districts' levels (1 = first
+    label, 2 = second, ...) with `state_rule`.
+    """
+    rows = frame.iloc[latest]
+    rows = rows[~canonical.is_junk_state(rows["state"]).to_numpy()]
+    labels = demand_rule["labels"]
+
+    def numeric(column):
+        # Older dashboard outputs lack some columns
+        if column not in rows.columns:
+            return np.full(len(rows), np.nan)
+        return pd.to_numeric(rows[column], errors="coerce").to_numpy()
+
+    score = rows["Next_Month_Demand"].astype(str).map({l: i + 1 for i, l in enumerate(labels)}).fillna(1)
+
+    grouped = pd.DataFrame({
+        "state": canonical.canonical_states(rows["state"]).astype(str).to_numpy(),
+        "score": score.to_numpy(dtype=float),
+        "forecast": numeric("forecast_next_month"),
+        "lfi": numeric("lifecycle_friction_score"),
+        "udr": numeric("udr"),
+        "high_friction": rows["Lifecycle_Friction"].astype(str).str.strip().eq("High").to_numpy(),
+        **{label: rows["Next_Month_Demand"].astype(str).eq(label).to_numpy() for label in labels},
+    }).groupby("state", sort=True)
+
+    stats = grouped.agg(
+        districts=("score", "size"),
+        avg_score=("score", "mean"),
+        forecast_next_month=("forecast", "sum"),
+        avg_lifecycle_friction=("lfi", "mean"),
+        avg_udr=("udr", "mean"),
+        high_friction_districts=("high_friction", "sum"),
+    )
+    counts = grouped[labels].sum()
+    level = rules.level(stats["avg_score"], state_rule)
+
+    out = {}
+    for state, row in stats.iterrows():
+        out[state] = {
+            "demand_level": str(level[stats.index.get_loc(state)]),
+            "districts": int(row["districts"]),
+            "demand_counts": {label: int(counts.at[state, label]) for label in labels},
+            "forecast_next_month": round(float(row["forecast_next_month"]), 2),
+            "avg_lifecycle_friction": None if pd.isna(row["avg_lifecycle_friction"]) else round(float(row["avg_lifecycle_friction"]), 4),
+            "avg_udr": None if pd.isna(row["avg_udr"]) else round(float(row["avg_udr"]), 4),
+            "high_friction_districts": int(row["high_friction_districts"]),
+        }
+    return out
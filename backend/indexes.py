@@ -0,0 +1,224 @@
+"""
+In-memory indexes over the admin dashboard table, built once when a dataset
+is loaded so requests cost the size of their answer, not a scan of the table.
+"""
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+
+from backend.payloads import CachedPayload, records_json
+from src import canonical
+
+EMPTY_LIST = CachedPayload(b"[]")
+
+
+def lookup_key(value, column=None):
+    """Normalized lookup key; state names go through the canonical state map."""
+    if column == "state":
+        value = canonical.canonical_states([value]).iloc[0]
+    return " ".join(str(value).lower().split())
+
+
+def normalized_keys(frame, column):
+    values = frame[column]
+    if column == "state":
+        values = canonical.canonical_states(values)
+    return canonical.state_key(values).fillna("nan")
+
+
+class LookupIndex:
+    """
+    Hash index: normalized column value -> row positions, plus the matching
+    rows pre-serialized as JSON.
+    """
+
+    def __init__(self, frame, column, version=""):
+        self.column = column
+        keys = normalized_keys(frame, column)
+        self.positions = keys.groupby(keys, sort=False).indices
+        self.payloads = {
+            k: CachedPayload.from_frame(frame.iloc[pos], version) for k, pos in self.positions.items()
+        }
+
+    def payload(self, value):
+        return self.payloads.get(lookup_key(value, self.column), EMPTY_LIST)
+
+
+class QueryError(ValueError):
+    pass
+
+
+class DistrictQueryIndex:
+    """
+    Filter / sort / cursor-paginate the dashboard table from precomputed arrays:
+    per-column value -> positions maps for equality filters, a datetime64
+    array for ranges, the distinct state / district names for text search,
+    and a stable sort order per sortable column. Cursors carry the snapshot
+    version they were issued for.
+    """
+
+    FILTERS = {
+        "state": "state",
+        "friction_level": "Lifecycle_Friction",
+        "udr_level": "udr_level",
+        "demand_level": "Next_Month_Demand",
+    }
+    MAX_LIMIT = 1000
+
+    def __init__(self, frame, version=""):
+        self.frame = frame
+        self.version = version
+        self.n = len(frame)
+        self.columns = frame.columns.tolist()
+
+        self.positions = {}
+        for param, column in self.FILTERS.items():
+            if column in frame.columns:
+                keys = normalized_keys(frame, column)
+                self.positions[param] = keys.groupby(keys, sort=False).indices
+
+        # Lower-cased "state\ndistrict" per distinct pair, matched once per query
+        self.name_codes, self.names = None, None
+        if {"state", "district"} <= set(frame.columns):
+            names = frame["state"].astype(str).str.lower() + "\n" + frame["district"].astype(str).str.lower()
+            self.name_codes, uniques = pd.factorize(names)
+            self.names = np.asarray(uniques, dtype=str)
+
+        self.dates = None
+        if "date" in frame.columns:
+            self.dates = pd.to_datetime(frame["date"]).to_numpy(dtype="datetime64[ns]")
+
+        # Latest row per (state, district), for one-row-per-district views
+        self.latest = np.arange(self.n)
+        if self.dates is not None:
+            rows = pd.DataFrame({
+                "state": frame["state"].astype(str),
+                "district": frame["district"].astype(str),
+                "date": self.dates,
+                "pos": self.latest,
+            })
+            latest = rows.sort_values("date", kind="stable").groupby(["state", "district"]).tail(1)
+            self.latest = np.sort(latest["pos"].to_numpy())
+
+        # Stable ascending order and rank of every row, per column, with the
+        # missing values after the `present` others (descending keeps them last)
+        self.order = {}
+        self.rank = {}
+        self.present = {}
+        for column in self.columns:
+            values = frame[column]
+            missing = values.isna().to_numpy()
+            if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+                values = values.to_numpy()
+            else:
+                values = values.astype(object).fillna("").astype(str).str.lower().to_numpy(dtype=object)
+            present = np.flatnonzero(~missing)
+            order = np.concatenate([present[np.argsort(values[present], kind="stable")],
+                                    np.flatnonzero(missing)])
+            rank = np.empty(self.n, dtype=np.int64)
+            rank[order] = np.arange(self.n)
+            self.order[column] = order
+            self.rank[column] = rank
+            self.present[column] = len(present)
+
+    def _mask(self, filters, date_from, date_to, latest, q=None):
+        mask = np.ones(self.n, dtype=bool)
+        for param, value in filters.items():
+            if value is None:
+                continue
+            keep = np.zeros(self.n, dtype=bool)
+            for key in str(value).split(","):
+                key = lookup_key(key, self.FILTERS[param])
+                keep[self.positions.get(param, {}).get(key, [])] = True
+            mask &= keep
+        if self.dates is not None:
+            if date_from:
+                mask &= self.dates >= np.datetime64(pd.Timestamp(date_from))
+            if date_to:
+                # date_to=YYYY-MM covers the whole month
+                mask &= self.dates <= np.datetime64(pd.Timestamp(date_to) + pd.offsets.MonthEnd(0))
+        if q and self.names is not None:
+            # Substring of the state or district name
+            hits = np.char.find(self.names, " ".join(q.lower().split())) >= 0
+            mask &= hits[self.name_codes]
+        if latest:
+            keep = np.zeros(self.n, dtype=bool)
+            keep[self.latest] = True
+            mask &= keep
+        return mask
+
+    def query(self, columns=None, filters=None, date_from=None, date_to=None,
+              latest=False, sort=None, cursor=None, limit=100, q=None):
+        """Return (JSON bytes of the page, next cursor or None, total matches)."""
+        columns = self._projection(columns)
+        sort = sort or "date"
+        descending = sort.startswith("-")
+        sort_column = sort.lstrip("-")
+        if sort_column not in self.order:
+            raise QueryError(f"Unknown sort column: {sort_column}")
+        limit = max(1, min(int(limit), self.MAX_LIMIT))
+
+        order = self.order[sort_column]
+        present = self.present[sort_column]
+        if descending:
+            order = np.concatenate([order[:present][::-1], order[present:]])
+        mask = self._mask(filters or {}, date_from, date_to, latest, q)
+        selected = order[mask[order]]
+
+        # Keyset cursor: position (in this sort order) of the last row served
+        start = 0
+        if cursor:
+            last = decode_cursor(cursor, sort, self.version)
+            ranks = self._positions(selected, sort_column, descending)
+            start = int(np.searchsorted(ranks, last, side="right"))
+
+        page = selected[start:start + limit]
+        next_cursor = None
+        if start + limit < len(selected):
+            last = int(self._positions(page[-1:], sort_column, descending)[0])
+            next_cursor = encode_cursor(sort, last, self.version)
+
+        return records_json(self.frame.iloc[page][columns]), next_cursor, int(len(selected))
+
+    def _positions(self, rows, column, descending):
+        """Positions of rows in the (ascending or descending) order of a column."""
+        rank = self.rank[column][rows]
+        if descending:
+            present = self.present[column]
+            rank = np.where(rank < present, present - 1 - rank, rank)
+        return rank
+
+    def _projection(self, columns):
+        if not columns:
+            return self.columns
+        wanted = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = [c for c in wanted if c not in self.columns]
+        if unknown:
+            raise QueryError(f"Unknown column(s): {', '.join(unknown)}")
+        return wanted
+
+
+class StaleCursor(QueryError):
+    pass
+
+
+def encode_cursor(sort, position, version=""):
+    raw = json.dumps({"s": sort, "p": position, "v": version}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort, version=""):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        position = int(data["p"])
+    except (ValueError, KeyError, TypeError):
+        raise QueryError("Invalid cursor")
+    if data.get("s") != sort:
+        raise QueryError("Cursor belongs to a different sort order")
+    # Positions refer to the rows of one snapshot; a reload reorders them
+    if data.get("v") != version:
+        raise StaleCursor("Cursor is from an older data version; start again from the first page")
+    return position
@@ -0,0 +1,203 @@
+"""
+Request metrics in the Prometheus text format, plus an opt-in sampling
+profiler for slow requests.
+
+MetricsMiddleware records, per route template (e.g. /districts/state/{state_name}):
+latency and response-size histograms, a request counter by status, and the
+number of requests in flight. Metrics.render() adds the dataset snapshot
+version and serves it all at GET /metrics.
+
+With AADHAAR_PROFILE_SLOW_MS set, a background thread samples the Python
+stacks of all busy threads every AADHAAR_PROFILE_INTERVAL_MS while requests
+are in flight; requests slower than the threshold keep their samples as
+folded stacks (flame-graph input), logged and listed at /debug/slow-requests.
+Samples are attributed to every request in flight at the time, so profiles
+of concurrent requests overlap.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from backend.config import PROFILE_INTERVAL_MS, PROFILE_SLOW_MS
+
+log = logging.getLogger("uvicorn.error")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+SLOW_REQUESTS_KEPT = 20
+
+# Innermost frames of threads that are idle rather than working
+IDLE_FUNCTIONS = {"wait", "select", "poll", "epoll", "_worker", "get", "accept", "run_forever"}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self.sums = defaultdict(float)
+
+    def observe(self, labels, value):
+        counts = self.counts[labels]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.sums[labels] += value
+
+    def render(self, name, label_names):
+        lines = []
+        for labels, counts in sorted(self.counts.items()):
+            base = ",".join(f'{k}="{v}"' for k, v in zip(label_names, labels))
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                total += count
+                lines.append(f'{name}_bucket{{{base},le="{bound}"}} {total}')
+            lines.append(f"{name}_sum{{{base}}} {self.sums[labels]}")
+            lines.append(f"{name}_count{{{base}}} {total}")
+        return lines
+
+
+class Metrics:
+    def __init__(self, snapshots=None):
+        self.snapshots = snapshots
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.requests = Counter()
+        self.in_flight = 0
+        self.profiler = SlowRequestProfiler() if PROFILE_SLOW_MS > 0 else None
+
+    def observe(self, method, route, status, seconds, size):
+        self.latency.observe((method, route), seconds)
+        self.size.observe((method, route), size)
+        self.requests[(method, route, str(status))] += 1
+
+    def render(self):
+        lines = [
+            "# HELP aadhaar_http_request_duration_seconds Request latency by route.",
+            "# TYPE aadhaar_http_request_duration_seconds histogram",
+            *self.latency.render("aadhaar_http_request_duration_seconds", ("method", "route")),
+            "# HELP aadhaar_http_response_size_bytes Response body size by route (after compression).",
+            "# TYPE aadhaar_http_response_size_bytes histogram",
+            *self.size.render("aadhaar_http_response_size_bytes", ("method", "route")),
+            "# HELP aadhaar_http_requests_total Requests by route and status.",
+            "# TYPE aadhaar_http_requests_total counter",
+            *(f'aadhaar_http_requests_total{{method="{m}",route="{r}",status="{s}"}} {n}'
+              for (m, r, s), n in sorted(self.requests.items())),
+            "# HELP aadhaar_http_requests_in_flight Requests currently being served.",
+            "# TYPE aadhaar_http_requests_in_flight gauge",
+            f"aadhaar_http_requests_in_flight {self.in_flight}",
+        ]
+        snapshot = self.snapshots.current if self.snapshots else None
+        if snapshot is not None:
+            lines += [
+                "# HELP aadhaar_dataset_snapshot_info Dataset snapshot being served.",
+                "# TYPE aadhaar_dataset_snapshot_info gauge",
+                f'aadhaar_dataset_snapshot_info{{version="{snapshot.version}"}} 1',
+                "# HELP aadhaar_dataset_snapshot_loaded_timestamp_seconds When the snapshot was loaded.",
+                "# TYPE aadhaar_dataset_snapshot_loaded_timestamp_seconds gauge",
+                f"aadhaar_dataset_snapshot_loaded_timestamp_seconds {snapshot.loaded_at}",
+                "# HELP aadhaar_dataset_rows Dashboard rows in the snapshot.",
+                "# TYPE aadhaar_dataset_rows gauge",
+                f"aadhaar_dataset_rows {len(snapshot.df)}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding a Metrics registry."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metrics = self.metrics
+        status, size = 500, 0
+
+        async def counting_send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        profile = metrics.profiler.begin() if metrics.profiler else None
+        try:
+            await self.app(scope, receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight -= 1
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe(scope["method"], route, status, elapsed, size)
+            if profile is not None:
+                metrics.profiler.end(profile, scope["method"], scope.get("path", ""), elapsed)
+
+
+class SlowRequestProfiler:
+    def __init__(self, slow_ms=PROFILE_SLOW_MS, interval_ms=PROFILE_INTERVAL_MS):
+        self.slow = slow_ms / 1000
+        self.interval = interval_ms / 1000
+        # Sample counters of the requests in flight, by id
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.slow_requests = deque(maxlen=SLOW_REQUESTS_KEPT)
+        self.wake = threading.Event()
+        threading.Thread(target=self._sample, name="slow-request-profiler", daemon=True).start()
+
+    def begin(self):
+        samples = Counter()
+        with self.lock:
+            self.in_flight[id(samples)] = samples
+        self.wake.set()
+        return samples
+
+    def end(self, samples, method, path, seconds):
+        with self.lock:
+            self.in_flight.pop(id(samples), None)
+            if not self.in_flight:
+                self.wake.clear()
+        if seconds < self.slow:
+            return
+        top = samples.most_common(10)
+        self.slow_requests.append({
+            "method": method,
+            "path": path,
+            "ms": round(seconds * 1000, 2),
+            "samples": sum(samples.values()),
+            "stacks": [{"stack": stack, "samples": n} for stack, n in top],
+        })
+        log.warning("Slow request %s %s took %.1f ms; top stack: %s",
+                    method, path, seconds * 1000, top[0][0] if top else "(no samples)")
+
+    def _sample(self):
+        me = threading.get_ident()
+        while True:
+            self.wake.wait()
+            time.sleep(self.interval)
+            stacks = [folded(frame) for ident, frame in sys._current_frames().items()
+                      if ident != me and frame.f_code.co_name not in IDLE_FUNCTIONS]
+            with self.lock:
+                for samples in self.in_flight.values():
+                    samples.update(stacks)
+
+
+def folded(frame, limit=40):
+    """'file:function;file:function;...' from outermost to innermost frame."""
+    parts = []
+    while frame is not None and len(parts) < limit:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
@@ -0,0 +1,115 @@
+"""
+Pre-serialized JSON payloads for read-only endpoints.
+
+A payload is serialized once per data version, compressed once per encoding
+and tagged with a strong ETag, so repeated polls cost a header comparison
+(304) or a bytes copy instead of rebuilding identical JSON.
+"""
+import gzip
+import hashlib
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+from fastapi import Request, Response
+
+from src import schema
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 512
+
+
+def records_json(frame):
+    """Serialize rows as a JSON array (dates as YYYY-MM-DD, NaN/inf as null)."""
+    single = [c for c in frame.columns if frame[c].dtype == np.float32]
+    # float32 columns (low-memory mode) as their shortest decimals, not 0.100000001
+    out = schema.widen(frame).copy()
+    for col in out.columns:
+        if "date" in col.lower() and pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime("%Y-%m-%d")
+    if not single:
+        return out.to_json(orient="records", force_ascii=False, double_precision=15).encode("utf-8")
+    # to_json prints a fixed 15 decimals, so 107.333 would come out as
+    # 107.332999999999998; float repr keeps the ~7 digits float32 holds
+    floats = out.select_dtypes("float").columns
+    out[floats] = out[floats].where(np.isfinite(out[floats]))
+    records = out.astype(object).where(out.notna(), None).to_dict("records")
+    return json.dumps(records, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CachedPayload:
+    """JSON bytes plus their gzip/brotli variants and ETag."""
+
+    def __init__(self, body, version=""):
+        self.body = body
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = f'"{version}-{digest}"' if version else f'"{digest}"'
+        self.encoded = {}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=5)
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=6)
+
+    def __reduce_ex__(self, protocol):
+        # Protocol 5 ships the bodies as out-of-band buffers (see backend/shared.py)
+        wrap = pickle.PickleBuffer if protocol >= 5 else bytes
+        return (_restore, (wrap(self.body), self.etag,
+                           {k: wrap(v) for k, v in self.encoded.items()}))
+
+    @classmethod
+    def from_obj(cls, obj, version=""):
+        return cls(dumps(obj), version)
+
+    @classmethod
+    def from_frame(cls, frame, version=""):
+        return cls(records_json(frame), version)
+
+    def response(self, request: Request):
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.encoded:
+                headers["Content-Encoding"] = encoding
+                return Response(self.encoded[encoding], media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def _restore(body, etag, encoded):
+    payload = CachedPayload.__new__(CachedPayload)
+    payload.body, payload.etag, payload.encoded = body, etag, encoded
+    return payload
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
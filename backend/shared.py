@@ -0,0 +1,134 @@
+"""
+Dataset snapshots shared between uvicorn workers through a memory-mapped file.
+
+The first worker to need a version builds the snapshot (under a file lock)
+and publishes it to output/serving/<version>.snapshot: a pickle (protocol 5)
+whose large buffers -- DataFrame columns, index arrays, pre-serialized
+payloads -- are stored out-of-band, 64-byte aligned, after it. Every worker,
+the builder included, then maps the file and unpickles against views of the
+mapping, so those buffers live once in the page cache instead of once per
+worker. Only the small in-band part (dicts, categories, metadata) is copied.
+
+Files are keyed by the data version and by BUILD, a hash of the code that
+builds and unpickles a snapshot, the library versions, the rules file and the
+low-memory flag, so a deploy or a worker in the other mode never attaches a
+file it did not build.
+
+File layout: MAGIC, header length (8 bytes), header pickle with the main
+pickle's and each buffer's (offset, length), then the data.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import sys
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import schema, store
+
+SHARED_DIR = store.OUTPUT_DIR / "serving"
+MAGIC = b"AADHSNP1"
+ALIGN = 64
+
+
+def build_key():
+    h = hashlib.sha256()
+    root = Path(__file__).resolve().parent.parent
+    for path in sorted([*root.glob("backend/*.py"), *root.glob("src/*.py")]):
+        h.update(path.name.encode() + path.read_bytes())
+    rules_file = os.environ.get("AADHAAR_RULES_FILE")
+    if rules_file and os.path.exists(rules_file):
+        h.update(Path(rules_file).read_bytes())
+    h.update(f"{sys.version}|{np.__version__}|{pd.__version__}|low_memory={schema.LOW_MEMORY}".encode())
+    return h.hexdigest()[:12]
+
+
+BUILD = build_key()
+
+
+def snapshot_path(version):
+    return SHARED_DIR / f"{version}-{BUILD}.snapshot"
+
+
+def _aligned(offset):
+    return -offset % ALIGN
+
+
+def publish(snapshot):
+    """Write a snapshot file atomically; returns its path."""
+    buffers = []
+    main = pickle.dumps(snapshot, protocol=5, buffer_callback=buffers.append)
+    raws = [main] + [b.raw() for b in buffers]
+
+    # Offsets are relative to the start of the data section
+    spans, offset = [], 0
+    for raw in raws:
+        offset += _aligned(offset)
+        spans.append((offset, raw.nbytes if isinstance(raw, memoryview) else len(raw)))
+        offset += spans[-1][1]
+    header = pickle.dumps(spans, protocol=5)
+    start = len(MAGIC) + 8 + len(header)
+    pad = _aligned(start)
+
+    SHARED_DIR.mkdir(parents=True, exist_ok=True)
+    path = snapshot_path(snapshot.version)
+    tmp = SHARED_DIR / f".{path.name}.{uuid.uuid4().hex}"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header + b"\0" * pad)
+        written = 0
+        for (offset, _), raw in zip(spans, raws):
+            f.write(b"\0" * (offset - written))
+            f.write(raw)
+            written = offset + (raw.nbytes if isinstance(raw, memoryview) else len(raw))
+    os.replace(tmp, path)
+    return path
+
+
+def attach(version):
+    """Map a published snapshot; its arrays and payloads are read-only views."""
+    with open(snapshot_path(version), "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    if view[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{snapshot_path(version)} is not a snapshot file")
+    (header_len,) = struct.unpack("<Q", view[len(MAGIC):len(MAGIC) + 8])
+    start = len(MAGIC) + 8 + header_len
+    spans = pickle.loads(view[len(MAGIC) + 8:start])
+    start += _aligned(start)
+
+    parts = [view[start + offset:start + offset + length] for offset, length in spans]
+    return pickle.loads(parts[0], buffers=parts[1:])
+
+
+def shared_loader(build):
+    """
+    Wrap a snapshot loader (version -> Snapshot) so each version is built by
+    one worker and attached by all of them.
+    """
+    def load(version):
+        SHARED_DIR.mkdir(parents=True, exist_ok=True)
+        with open(SHARED_DIR / f".{snapshot_path(version).stem}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not snapshot_path(version).exists():
+                publish(build(version))
+                _remove_others(version)
+        return attach(version)
+
+    return load
+
+
+def _remove_others(version):
+    # Workers still serving an older version keep their mapping after unlink
+    current = snapshot_path(version)
+    for path in SHARED_DIR.glob("*.snapshot"):
+        if path != current:
+            path.unlink(missing_ok=True)
+    for path in SHARED_DIR.glob(".*.lock"):
+        if path.name != f".{current.stem}.lock":
+            path.unlink(missing_ok=True)
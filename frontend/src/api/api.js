@@ -12,8 +12,43 @@ export async function fetchDistricts() {
   return data;
 }
 
+// One page of districts: { items, next_cursor, total }.
+// params: columns, state, friction_level, udr_level, demand_level,
+// date_from, date_to, latest, sort, cursor, limit, q (state/district search).
+// A cursor from an older data version comes back as { stale: true }.
+export async function fetchDistrictPage(params = {}) {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== "")
+  );
+  const res = await fetch(`${BASE_URL}/districts?${query}`);
+  if (res.status === 409) return { stale: true };
+  return await res.json();
+}
+
+// Summed metrics per group: { rollup, rows }, e.g. { group_by: "state", metrics: "enrolments" }
+export async function fetchAggregate(params = {}) {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== "")
+  );
+  const res = await fetch(`${BASE_URL}/aggregate?${query}`);
+  return await res.json();
+}
+
 
 export const fetchFrictionAge = async () => {
   const res = await fetch("http://127.0.0.1:8000/friction-age-analysis");
   return res.json();
 };
+
+
+// Demand map: state polygons simplified for a zoom level, and per-state
+// aggregates keyed by the same state names (versioned and cached separately)
+export async function fetchStateGeometry(zoom) {
+  const res = await fetch(`${BASE_URL}/map/states/geometry?zoom=${zoom}`);
+  return await res.json();
+}
+
+export async function fetchStateMapData() {
+  const res = await fetch(`${BASE_URL}/map/states/data`);
+  return await res.json();
+}
@@ -1,4 +1,8 @@
-import { useMemo, useState } from "react";
+import { useEffect, useMemo, useState } from "react";
+import { fetchAggregate, fetchDistrictPage } from "../api/api";
+
+const PAGE_SIZE = 100;
+const TABLE_COLUMNS = "state,district,Next_Month_Demand,recommended_action";
 
 /* ===============================
    🔴 DEMAND PRIORITY
@@ -129,9 +133,56 @@ const normalizeDistrict = (district) => {
 /* ===============================
    🟢 COMPONENT
 ================================ */
-export default function DistrictTable({ data }) {
+export default function DistrictTable() {
   const [search, setSearch] = useState("");
+  const [query, setQuery] = useState("");
   const [stateFilter, setStateFilter] = useState("All");
+  const [stateNames, setStateNames] = useState([]);
+  const [data, setData] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [total, setTotal] = useState(0);
+
+  /* ===============================
+     ✅ STATE NAMES (one aggregate row per canonical state)
+  ================================ */
+  useEffect(() => {
+    fetchAggregate({ group_by: "state", metrics: "enrolments" }).then((res) =>
+      setStateNames((res.rows || []).map((row) => row.state))
+    );
+  }, []);
+
+  /* ===============================
+     ✅ SEARCH (sent to the server once typing pauses)
+  ================================ */
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(search.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
+
+  /* ===============================
+     ✅ SERVER-SIDE PAGES (latest row per district)
+  ================================ */
+  const loadPage = async (after, replace) => {
+    const page = await fetchDistrictPage({
+      columns: TABLE_COLUMNS,
+      latest: true,
+      sort: "state",
+      limit: PAGE_SIZE,
+      cursor: after,
+      state: stateFilter === "All" ? null : stateFilter,
+      q: query,
+    });
+    // The data was reloaded since the first page: start over
+    if (page.stale) return loadPage(null, true);
+    setData((prev) => (replace ? page.items : [...prev, ...page.items]));
+    setCursor(page.next_cursor);
+    setTotal(page.total);
+  };
+
+  useEffect(() => {
+    loadPage(null, true);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [stateFilter, query]);
 
   /* ===============================
      ✅ CLEAN + DEDUPE DATA
@@ -168,24 +219,10 @@ export default function DistrictTable({ data }) {
   /* ===============================
      ✅ STATES DROPDOWN
   ================================ */
-  const states = useMemo(() => {
-    const set = new Set(cleanedData.map((d) => d.state));
-    return ["All", ...Array.from(set).sort()];
-  }, [cleanedData]);
-
-  /* ===============================
-     ✅ FILTER
-  ================================ */
-  const filteredData = cleanedData.filter((row) => {
-    const matchState =
-      stateFilter === "All" || row.state === stateFilter;
-
-    const matchSearch =
-      row.state.toLowerCase().includes(search.toLowerCase()) ||
-      row.district.toLowerCase().includes(search.toLowerCase());
-
-    return matchState && matchSearch;
-  });
+  const states = useMemo(
+    () => ["All", ...[...stateNames].sort()],
+    [stateNames]
+  );
 
   const getBadgeClass = (value) => {
     if (value === "High Demand") return "badge red";
@@ -273,7 +310,7 @@ export default function DistrictTable({ data }) {
           </thead>
 
           <tbody>
-            {filteredData.map((row, index) => (
+            {cleanedData.map((row, index) => (
               <tr key={index} style={{ borderBottom: "1px solid #f1f5f9" }}>
                 <td style={cellStyle}>{row.state}</td>
                 <td style={cellStyle}>{row.district}</td>
@@ -287,7 +324,7 @@ export default function DistrictTable({ data }) {
             ))}
 
             {/* ✅ EMPTY STATE IMAGE */}
-            {filteredData.length === 0 && (
+            {cleanedData.length === 0 && (
               <tr>
                 <td colSpan="4" style={{ textAlign: "center", padding: "40px" }}>
                   <img
@@ -301,6 +338,14 @@ export default function DistrictTable({ data }) {
             )}
           </tbody>
         </table>
+
+        {cursor && (
+          <div style={{ textAlign: "center", marginTop: "16px" }}>
+            <button onClick={() => loadPage(cursor, false)} style={loadMoreStyle}>
+              Load more ({data.length} of {total})
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -325,3 +370,13 @@ const cellStyle = {
   fontSize: "0.95rem",
   fontWeight: "500"
 };
+
+const loadMoreStyle = {
+  padding: "10px 20px",
+  borderRadius: "12px",
+  border: "1px solid #e2e8f0",
+  background: "#f8fafc",
+  cursor: "pointer",
+  fontWeight: "600",
+  color: "#334155"
+};
@@ -1,7 +1,8 @@
-import { useEffect, useState } from "react";
-import { MapContainer, TileLayer, GeoJSON, useMap } from "react-leaflet";
+import { useEffect, useRef, useState } from "react";
+import { MapContainer, TileLayer, GeoJSON, useMap, useMapEvents } from "react-leaflet";
 import "leaflet/dist/leaflet.css";
 import L from "leaflet";
+import { fetchStateGeometry, fetchStateMapData } from "../api/api";
 
 /* ---------------- FIX LEAFLET ICON ---------------- */
 delete L.Icon.Default.prototype._getIconUrl;
@@ -22,15 +23,19 @@ const getColor = (level) => {
 };
 
 /* ---------------- MAP EVENT LISTENER ---------------- */
-function MapZoomHandler({ geoData }) {
+function MapZoomHandler({ geoData, onZoom }) {
   const map = useMap();
 
+  useMapEvents({
+    zoomend: () => onZoom(map.getZoom()),
+  });
+
   useEffect(() => {
     const handler = (e) => {
       const { state } = e.detail;
 
       geoData?.features.forEach((feature) => {
-        if (feature.properties.NAME_1 === state) {
+        if (feature.id === state || feature.properties.name === state) {
           const layer = L.geoJSON(feature);
           map.fitBounds(layer.getBounds());
         }
@@ -44,62 +49,42 @@ function MapZoomHandler({ geoData }) {
   return null;
 }
 
-export default function IndiaDemandMap({ data }) {
+export default function IndiaDemandMap() {
+  const [zoom, setZoom] = useState(5);
   const [geoData, setGeoData] = useState(null);
+  const [stateStats, setStateStats] = useState({});
+  const [dataVersion, setDataVersion] = useState("");
+  const geometryCache = useRef({});
 
-  /* ---------------- LOAD GEOJSON ---------------- */
+  /* ---------------- LOAD GEOMETRY FOR THE ZOOM LEVEL ---------------- */
+  // Simplified server-side per zoom level; features are keyed by state name
   useEffect(() => {
-    fetch("/india_states.geojson")
-      .then((res) => res.json())
-      .then(setGeoData)
-      .catch((err) => console.error("GeoJSON load error", err));
-  }, []);
-
-  /* ---------------- AGGREGATE STATE DATA ---------------- */
-  const stateStats = {};
-
-  data.forEach((row) => {
-    if (!row.state) return;
-
-    if (!stateStats[row.state]) {
-      stateStats[row.state] = {
-        total: 0,
-        high: 0,
-        medium: 0,
-        low: 0,
-        score: 0,
-      };
-    }
-
-    stateStats[row.state].total += 1;
-
-    if (row.Next_Month_Demand === "High Demand") {
-      stateStats[row.state].high += 1;
-      stateStats[row.state].score += 3;
-    } else if (row.Next_Month_Demand === "Medium Demand") {
-      stateStats[row.state].medium += 1;
-      stateStats[row.state].score += 2;
-    } else {
-      stateStats[row.state].low += 1;
-      stateStats[row.state].score += 1;
+    const level = Math.round(zoom);
+    if (geometryCache.current[level]) {
+      setGeoData(geometryCache.current[level]);
+      return;
     }
-  });
-
-  /* ---------------- FINAL STATE DEMAND LEVEL ---------------- */
-  const getStateDemandLevel = (stateName) => {
-    const s = stateStats[stateName];
-    if (!s) return "Low Demand";
-
-    const avg = s.score / s.total;
-    if (avg > 2.3) return "High Demand";
-    if (avg > 1.6) return "Medium Demand";
-    return "Low Demand";
-  };
+    fetchStateGeometry(level)
+      .then((geo) => {
+        geometryCache.current[level] = geo;
+        setGeoData(geo);
+      })
+      .catch((err) => console.error("Geometry load error", err));
+  }, [zoom]);
+
+  /* ---------------- LOAD STATE AGGREGATES ---------------- */
+  useEffect(() => {
+    fetchStateMapData()
+      .then((res) => {
+        setStateStats(res.states || {});
+        setDataVersion(res.version || "");
+      })
+      .catch((err) => console.error("Map data load error", err));
+  }, []);
 
   /* ---------------- MAP STYLE ---------------- */
   const style = (feature) => {
-    const stateName = feature.properties.NAME_1;
-    const level = getStateDemandLevel(stateName);
+    const level = stateStats[feature.id]?.demand_level || "Low Demand";
 
     return {
       fillColor: getColor(level),
@@ -111,17 +96,16 @@ export default function IndiaDemandMap({ data }) {
 
   /* ---------------- STATE INTERACTIONS ---------------- */
   const onEachState = (feature, layer) => {
-    const stateName = feature.properties.NAME_1;
-    const stats = stateStats[stateName];
-    const level = getStateDemandLevel(stateName);
+    const stats = stateStats[feature.id];
+    const counts = stats?.demand_counts || {};
 
     layer.bindTooltip(
-      `<b>${stateName}</b><br/>
-       Demand: ${level}<br/>
-       Total districts: ${stats?.total || 0}<br/>
-       High: ${stats?.high || 0}<br/>
-       Medium: ${stats?.medium || 0}<br/>
-       Low: ${stats?.low || 0}`,
+      `<b>${feature.properties.name}</b><br/>
+       Demand: ${stats?.demand_level || "Low Demand"}<br/>
+       Total districts: ${stats?.districts || 0}<br/>
+       High: ${counts["High Demand"] || 0}<br/>
+       Medium: ${counts["Medium Demand"] || 0}<br/>
+       Low: ${counts["Low Demand"] || 0}`,
       { sticky: true }
     );
 
@@ -158,15 +142,15 @@ export default function IndiaDemandMap({ data }) {
           url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
         />
 
+        <MapZoomHandler geoData={geoData} onZoom={setZoom} />
+
         {geoData && (
-          <>
-            <GeoJSON
-              data={geoData}
-              style={style}
-              onEachFeature={onEachState}
-            />
-            <MapZoomHandler geoData={geoData} />
-          </>
+          <GeoJSON
+            key={`${geoData.version}-${geoData.zoom}-${dataVersion}`}
+            data={geoData}
+            style={style}
+            onEachFeature={onEachState}
+          />
         )}
       </MapContainer>
     </div>
@@ -43,25 +43,33 @@ export default function SmartCentreLocator() {
   const findByCity = async () => {
     if (!city.trim()) return;
 
-    // Use OpenStreetMap Nominatim for Geocoding
     setLoading(true);
     setError(null);
     try {
+      // Backend text search first: centre names, localities, cities, states
+      const res = await fetch(`http://localhost:8000/centers?city=${encodeURIComponent(city)}`);
+      const matches = await res.json();
+      if (matches.length > 0) {
+        setCentres(matches);
+        setLoading(false);
+        return;
+      }
+
+      // Otherwise geocode with OpenStreetMap Nominatim and search nearby
       const geoRes = await fetch(`https://nominatim.openstreetmap.org/search?format=json&q=${encodeURIComponent(city)}`);
       const geoData = await geoRes.json();
 
       if (geoData && geoData.length > 0) {
         const { lat, lon } = geoData[0];
-        // Now search backend using these coordinates
         await fetchCentres({ lat, lon });
       } else {
-        // Fallback to text search if geocoding fails (though backend text search is limited)
-        await fetchCentres({ city: city });
+        setCentres([]);
+        setLoading(false);
       }
     } catch (err) {
       console.error(err);
-      // Fallback
-      await fetchCentres({ city: city });
+      setError("Failed to fetch centres. Please try again.");
+      setLoading(false);
     }
   };
 
@@ -76,9 +76,17 @@ export default function AdminDashboard({ onLogout }) {
   const [data, setData] = useState([]);
   const [active, setActive] = useState("Overview");
 
+  // Full district rows are only needed by the chart/map tabs; the overview
+  // uses /summary and the table pages through /districts itself
+  const needsAllRows = ["Demand Analysis", "Friction Analysis", "Crowd Prediction Map"].includes(active);
+  const [loaded, setLoaded] = useState(false);
+
   useEffect(() => {
-    fetchDistricts().then(setData);
-  }, []);
+    if (needsAllRows && !loaded) {
+      setLoaded(true);
+      fetchDistricts().then(setData);
+    }
+  }, [needsAllRows, loaded]);
 
   return (
     <>
@@ -297,8 +305,8 @@ export default function AdminDashboard({ onLogout }) {
         <div style={{ maxWidth: "1400px", margin: "0 auto", padding: "32px" }}>
           {active === "Demand Analysis" && <DemandCharts data={data} />}
           {active === "Friction Analysis" && <FrictionAnalysis data={data} />}
-          {active === "Crowd Prediction Map" && <IndiaDemandMap data={data} />}
-          {active === "Demand Table" && <DistrictTable data={data} />}
+          {active === "Crowd Prediction Map" && <IndiaDemandMap />}
+          {active === "Demand Table" && <DistrictTable />}
         </div>
       </div>
     </>
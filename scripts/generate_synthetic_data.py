@@ -0,0 +1,139 @@
+"""
+Deterministic synthetic UIDAI dumps for scale testing.
+
+Writes enrolment, demographic and biometric shards with the same columns and
+file naming as the real api_data_aadhar_* files (date as dd-mm-yyyy, state,
+district, pincode, age-band counts), plus a centre directory CSV. The same
+--seed, --scale and --shard-rows always produce byte-identical files, whichever
+shards are generated and in whatever order.
+
+    python scripts/generate_synthetic_data.py --scale 10 --out /tmp/aadhaar_10x
+
+Scale 1 is BASE_ROWS rows per dataset. A small share of rows carries the
+spelling variants and junk values seen in the real dumps (e.g. 'Orissa',
+lower-case names, numeric states) so canonicalization does real work.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+repo = Path(__file__).parent.parent
+sys.path.insert(0, str(repo))
+
+from src import canonical
+
+BASE_ROWS = 100_000
+SHARD_ROWS = 500_000
+DISTRICTS_PER_STATE = 20
+PINCODES_PER_DISTRICT = 8
+CENTRES_PER_DISTRICT = 3
+FIRST_MONTH, MONTHS = "2025-03", 10
+# Share of rows with a non-canonical state spelling / a junk state
+VARIANT_SHARE, JUNK_SHARE = 0.02, 0.001
+
+DATASETS = {
+    "enrolment": ["age_0_5", "age_5_17", "age_18_greater"],
+    "demographic": ["demo_age_5_17", "demo_age_17_"],
+    "biometric": ["bio_age_5_17", "bio_age_17_"],
+}
+
+STATES = sorted(set(canonical.CANONICAL_STATES.values()))
+# Spellings per canonical state, as they appear in raw dumps
+SPELLINGS = {
+    state: [key for key, value in canonical.CANONICAL_STATES.items() if value == state]
+    for state in STATES
+}
+
+
+def geography(seed):
+    """One row per (state, district, pincode) with a demand scale and location."""
+    rng = np.random.default_rng([seed, 0])
+    n_districts = len(STATES) * DISTRICTS_PER_STATE
+    state = np.repeat(STATES, DISTRICTS_PER_STATE)
+    district = [f"{s.split()[0]} District {i + 1:02d}" for s in STATES for i in range(DISTRICTS_PER_STATE)]
+    districts = pd.DataFrame({
+        "state": state,
+        "district": district,
+        "weight": rng.lognormal(0, 1, n_districts),
+        "lat": rng.uniform(8, 34, n_districts),
+        "lon": rng.uniform(69, 96, n_districts),
+    })
+    geo = districts.loc[districts.index.repeat(PINCODES_PER_DISTRICT)].reset_index(drop=True)
+    geo["pincode"] = rng.choice(np.arange(110000, 860000), len(geo), replace=False)
+    geo["weight"] /= geo["weight"].sum()
+    return geo
+
+
+def shard_frame(geo, dataset, start, stop, seed):
+    """Rows start..stop of a dataset; depends only on (seed, dataset, start)."""
+    rng = np.random.default_rng([seed, list(DATASETS).index(dataset) + 1, start])
+    n = stop - start
+    place = rng.choice(len(geo), n, p=geo["weight"].to_numpy())
+    days = pd.Period(FIRST_MONTH, "M").start_time + pd.to_timedelta(
+        rng.integers(0, MONTHS * 30, n), unit="D")
+
+    state = geo["state"].to_numpy()[place].astype(object)
+    variant = rng.random(n) < VARIANT_SHARE
+    state[variant] = [rng.choice(SPELLINGS[s]) for s in state[variant]]
+    state[rng.random(n) < JUNK_SHARE] = "100000"
+
+    frame = pd.DataFrame({
+        "date": days.strftime("%d-%m-%Y"),
+        "state": state,
+        "district": geo["district"].to_numpy()[place],
+        "pincode": geo["pincode"].to_numpy()[place],
+    })
+    for i, column in enumerate(DATASETS[dataset]):
+        frame[column] = rng.poisson(3 + 6 * i, n)
+    return frame
+
+
+def centres(geo, seed):
+    rng = np.random.default_rng([seed, 99])
+    districts = geo.drop_duplicates(["state", "district"])
+    rows = districts.loc[districts.index.repeat(CENTRES_PER_DISTRICT)].reset_index(drop=True)
+    return pd.DataFrame({
+        "id": np.arange(1, len(rows) + 1),
+        "name": "Aadhaar Seva Kendra, " + rows["district"] + " " + (rows.index % CENTRES_PER_DISTRICT + 1).astype(str),
+        "address": rows["district"] + ", " + rows["state"],
+        "city": rows["district"],
+        "state": rows["state"],
+        "lat": (rows["lat"] + rng.normal(0, 0.2, len(rows))).round(4),
+        "lon": (rows["lon"] + rng.normal(0, 0.2, len(rows))).round(4),
+    })
+
+
+def generate(out, scale=1.0, seed=0, shard_rows=SHARD_ROWS):
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    geo = geography(seed)
+    total = int(BASE_ROWS * scale)
+    written = []
+    for dataset in DATASETS:
+        for start in range(0, total, shard_rows):
+            stop = min(start + shard_rows, total)
+            path = out / f"api_data_aadhar_{dataset}_{start}_{stop}.csv"
+            shard_frame(geo, dataset, start, stop, seed).to_csv(path, index=False)
+            written.append(path)
+    path = out / "aadhaar_centres.csv"
+    centres(geo, seed).to_csv(path, index=False)
+    written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic Aadhaar shards")
+    parser.add_argument("--out", default=str(repo / "data"), help="output directory (default: data/)")
+    parser.add_argument("--scale", type=float, default=1.0, help=f"multiple of {BASE_ROWS} rows per dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS)
+    args = parser.parse_args(argv)
+    for path in generate(args.out, args.scale, args.seed, args.shard_rows):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,35 @@
-import pandas as pd
-import re
+import sys
 from pathlib import Path
-p = Path(__file__).parent.parent / 'output' / 'admin_decision_dashboard.csv'
-if not p.exists():
-    print('ERROR: file not found:', p)
-    raise SystemExit(1)
 
-df = pd.read_csv(p)
+repo = Path(__file__).parent.parent
+sys.path.insert(0, str(repo))
+
+from src import canonical, store
 
-def norm_state(s):
-    if pd.isna(s): return ''
-    return ' '.join(str(s).lower().split())
+try:
+    df = store.read_table('admin_decision_dashboard', columns=['state', 'district'])
+except FileNotFoundError as e:
+    print('ERROR:', e)
+    raise SystemExit(1)
 
-def norm_district(d):
-    if pd.isna(d): return ''
-    return re.sub('[^a-z0-9 ]',' ', str(d).lower()).split()
+variants = df.assign(
+    state_norm=canonical.state_key(canonical.canonical_states(df['state'])),
+    district_norm=canonical.district_key(df['district']),
+    district=df['district'].astype(str),
+).dropna(subset=['state_norm', 'district_norm'])
+variants = variants[(variants['state_norm'] != '') & (variants['district_norm'] != '')]
 
-dist_map = {}
-for _, r in df.iterrows():
-    st = norm_state(r.get('state',''))
-    dt_words = norm_district(r.get('district',''))
-    if not st or not dt_words: continue
-    dk = ' '.join(dt_words)
-    key = (st, dk)
-    dist_map.setdefault(key, set()).add(str(r.get('district','')))
+groups = (
+    variants.groupby(['state_norm', 'district_norm'])['district']
+    .agg(lambda s: sorted(set(s)))
+)
+problems = groups[groups.str.len() > 1].sort_index()
 
-problems = [(k,v) for k,v in dist_map.items() if len(v) > 1]
-problems.sort()
 print('Total groups with multiple district spellings:', len(problems))
-for st_dk, variants in problems[:200]:
-    st, dk = st_dk
+for (st, dk), raw_variants in list(problems.items())[:200]:
     print('\n---')
     print('state_norm:', st)
     print('district_norm:', dk)
     print('raw variants:')
-    for v in sorted(variants):
-        print('  -', v)
\ No newline at end of file
+    for v in raw_variants:
+        print('  -', v)
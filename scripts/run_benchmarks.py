@@ -0,0 +1,170 @@
+"""
+Scale benchmark for the pipeline and the API, run fully offline.
+
+Generates synthetic shards (scripts/generate_synthetic_data.py) into a
+scratch directory, runs each pipeline stage in its own process against them
+and records wall time and peak RSS per stage, then loads the backend
+in-process on the produced tables and records p50/p99 latency per endpoint.
+
+    python scripts/run_benchmarks.py --scale 10
+    python scripts/run_benchmarks.py --compare old.json new.json
+
+Results are written as JSON to benchmarks/<commit>-scale<scale>.json with the
+commit, seed and machine details, so runs at the same scale and seed can be
+compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+repo = Path(__file__).parent.parent
+sys.path.insert(0, str(repo))
+sys.path.insert(0, str(repo / "scripts"))
+
+import generate_synthetic_data as synthetic
+from src.pipeline import STAGES
+
+RESULTS_DIR = repo / "benchmarks"
+REQUESTS = 200
+
+ENDPOINTS = [
+    "/summary",
+    "/districts",
+    "/districts?latest=true&sort=-udr&limit=100",
+    "/districts/state/Kerala",
+    "/friction-age-analysis",
+    "/centers?lat=17.44&lon=78.45&k=5",
+    "/centers?city=District 01",
+]
+
+# Runs one stage (upstream stages are already cached) and reports its peak RSS
+STAGE_RUNNER = """
+import json, resource, sys, time
+from src.pipeline import main
+started = time.perf_counter()
+main([sys.argv[1]])
+wall = time.perf_counter() - started
+usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+print(json.dumps({"wall_seconds": wall, "peak_rss_mb": max(u.ru_maxrss for u in usage) / 1024}))
+"""
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_stages(env):
+    results = {}
+    for stage in STAGES:
+        if not stage.persist:
+            continue
+        proc = subprocess.run([sys.executable, "-c", STAGE_RUNNER, stage.name], cwd=repo, env=env,
+                              capture_output=True, text=True, check=True)
+        results[stage.name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"  {stage.name}: {results[stage.name]['wall_seconds']:.2f}s, "
+              f"{results[stage.name]['peak_rss_mb']:.0f} MB")
+    return results
+
+
+def bench_api(requests=REQUESTS):
+    from fastapi.testclient import TestClient
+    from backend import api
+
+    results = {}
+    with TestClient(api.app) as client:
+        for url in ENDPOINTS:
+            client.get(url)  # warm-up
+            timings = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            results[url] = {
+                "p50_ms": float(np.percentile(timings, 50)),
+                "p99_ms": float(np.percentile(timings, 99)),
+                "bytes": len(response.content),
+            }
+            print(f"  {url}: p50 {results[url]['p50_ms']:.2f} ms, p99 {results[url]['p99_ms']:.2f} ms")
+    return results
+
+
+def run(scale, seed, requests):
+    with tempfile.TemporaryDirectory(prefix="aadhaar-bench-") as scratch:
+        data_dir, output_dir = Path(scratch) / "data", Path(scratch) / "output"
+        print(f"Generating scale {scale} data in {data_dir}")
+        synthetic.generate(data_dir, scale, seed)
+
+        env = dict(os.environ,
+                   AADHAAR_DATA_DIR=str(data_dir),
+                   AADHAAR_OUTPUT_DIR=str(output_dir),
+                   AADHAAR_CENTRES_FILE=str(data_dir / "aadhaar_centres.csv"),
+                   AADHAAR_RELOAD_INTERVAL="0")
+        print("Pipeline stages:")
+        stages = bench_stages(env)
+
+        # The backend reads its settings at import time
+        os.environ.update({k: env[k] for k in ("AADHAAR_DATA_DIR", "AADHAAR_OUTPUT_DIR",
+                                               "AADHAAR_CENTRES_FILE", "AADHAAR_RELOAD_INTERVAL")})
+        print("API endpoints:")
+        endpoints = bench_api(requests)
+
+    return {
+        "commit": git_commit(),
+        "scale": scale,
+        "seed": seed,
+        "rows_per_dataset": int(synthetic.BASE_ROWS * scale),
+        "requests_per_endpoint": requests,
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "stages": stages,
+        "endpoints": endpoints,
+    }
+
+
+def compare(old_path, new_path):
+    old, new = (json.loads(Path(p).read_text()) for p in (old_path, new_path))
+    print(f"{old['commit']} -> {new['commit']} (scale {old['scale']} -> {new['scale']})")
+    for section, metrics in (("stages", ("wall_seconds", "peak_rss_mb")),
+                             ("endpoints", ("p50_ms", "p99_ms"))):
+        for name in new[section]:
+            for metric in metrics:
+                before = old[section].get(name, {}).get(metric)
+                after = new[section][name][metric]
+                change = f"{(after / before - 1) * 100:+.1f}%" if before else "new"
+                print(f"  {name:<45} {metric:<13} {before or 0:>10.2f} -> {after:>10.2f}  {change}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline and API on synthetic data")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=REQUESTS, help="requests per endpoint")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    result = run(args.scale, args.seed, args.requests)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{result['commit']}-scale{args.scale:g}.json"
+    path.write_text(json.dumps(result, indent=2))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
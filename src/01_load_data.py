@@ -1,11 +1,31 @@
 import pandas as pd
 
-# Load datasets
-enrol = pd.read_csv("data/api_data_aadhar_enrolment_0_500000.csv")
-demo = pd.read_csv("data/api_data_aadhar_demographic_0_500000.csv")
-bio = pd.read_csv("data/api_data_aadhar_biometric_0_500000.csv")
-
-print("Datasets loaded successfully")
-print("Enrolment shape:", enrol.shape)
-print("Demographic shape:", demo.shape)
-print("Biometric shape:", bio.shape)
\ No newline at end of file
+from src import schema
+from src.pipeline import DATA_DIR, RAW_SHARDS
+
+# Rows per chunk when streaming a shard; peak memory scales with this, not with the dump
+CHUNK_ROWS = 200_000
+
+# Keep location columns as text in every chunk, so junk values like "100000"
+# group together no matter which chunk they land in
+RAW_DTYPES = {'state': str, 'district': str}
+if schema.LOW_MEMORY:
+    # Categories are parsed as text too; a chunk holds each name once
+    RAW_DTYPES = {'state': 'category', 'district': 'category', 'date': 'category'}
+
+
+def discover_shards(dataset):
+    """All raw shards of a dataset ('enrol', 'demo' or 'bio'), in a stable order."""
+    return sorted(DATA_DIR.glob(RAW_SHARDS[dataset]))
+
+
+def iter_chunks(path, chunksize=CHUNK_ROWS):
+    return pd.read_csv(path, dtype=RAW_DTYPES, chunksize=chunksize)
+
+
+if __name__ == "__main__":
+    # Shard inventory (streams each shard, never holds a whole one in memory)
+    for dataset in RAW_SHARDS:
+        shards = discover_shards(dataset)
+        rows = sum(len(chunk) for path in shards for chunk in iter_chunks(path))
+        print(f"{dataset}: {len(shards)} shard(s), {rows} rows")
@@ -1,30 +1,144 @@
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
-# Load datasets
-enrol = pd.read_csv("data/api_data_aadhar_enrolment_0_500000.csv")
-demo = pd.read_csv("data/api_data_aadhar_demographic_0_500000.csv")
-bio = pd.read_csv("data/api_data_aadhar_biometric_0_500000.csv")
+from src import canonical
+from src.manifest import record_join
+
+loader = importlib.import_module("src.01_load_data")
+validate = importlib.import_module("src.04_validate_output")
+
+KEYS = ['state', 'district', 'month']
+
+# Partial aggregates are folded together once this many have piled up
+FOLD_EVERY = 16
+
+INGEST_WORKERS = int(os.environ.get("AADHAAR_INGEST_WORKERS", os.cpu_count() or 1))
+
+
+def fold(partials):
+    return pd.concat(partials).groupby(KEYS, sort=False, observed=True).sum()
+
+
+def aggregate_shard(path, dataset, chunksize=loader.CHUNK_ROWS):
+    """
+    Stream one raw shard and return its (state, district, month) sums and the
+    rows that failed validation (src/04_validate_output.py).
+    """
+    checker = validate.ChunkChecker(dataset, path.name)
+    partials, quarantined = [], []
+    for chunk in loader.iter_chunks(path, chunksize):
+        clean, bad = checker.check(chunk)
+        partials.append(clean.groupby(KEYS, sort=False, observed=True).sum())
+        if len(bad):
+            quarantined.append(bad)
+        if len(partials) >= FOLD_EVERY:
+            partials = [fold(partials)]
+    return (fold(partials) if partials else None,
+            pd.concat(quarantined, ignore_index=True) if quarantined else None)
+
+
+def quarantine_table(frames):
+    """Quarantined rows as one frame with a fixed schema (text values)."""
+    frame = pd.concat([validate.empty_quarantine(), *frames], ignore_index=True)
+    text = [c for c in frame.columns if c != 'line']
+    frame[text] = frame[text].astype('str')
+    return frame.astype({'line': 'int64'})
+
+
+def spellings_of(folded):
+    """
+    One preferred district spelling per (state, district key) across every
+    dataset, so enrolment, demographic and biometric rows of a district get
+    the same name and join. Persisted as the `district_spellings` table.
+    """
+    frames = [frame[['state', 'district']] for frame in folded]
+    both = pd.concat(frames, ignore_index=True)
+    return canonical.district_spellings(both['state'], both['district'])
+
+
+def monthly(folded, spellings):
+    # Fold spelling variants (e.g. 'Orissa'/'Odisha') into canonical names
+    monthly = canonical.canonicalize(folded, drop_junk=False, spellings=spellings)
+    monthly = monthly.groupby(KEYS, observed=True).sum().reset_index()
+    # Month-end date label (same as pd.Grouper(freq='M'))
+    monthly['month'] = monthly['month'].dt.end_time.dt.normalize()
+    return monthly.rename(columns={'month': 'date'})
+
+
+def run():
+    # Discover every shard and spread them over a process pool
+    shards = {name: loader.discover_shards(name) for name in ('enrol', 'demo', 'bio')}
+    jobs = [(name, path) for name, paths in shards.items() for path in paths]
+    for name, paths in shards.items():
+        if not paths:
+            raise FileNotFoundError(f"No raw shards found for '{name}' in {loader.DATA_DIR}")
+
+    # Rows are validated chunk by chunk as they are read; bad ones are quarantined
+    with ProcessPoolExecutor(max_workers=min(INGEST_WORKERS, len(jobs))) as pool:
+        results = pool.map(aggregate_shard, [path for _, path in jobs], [name for name, _ in jobs])
+        partials = {name: [] for name in shards}
+        quarantined = []
+        for (name, _), (partial, bad) in zip(jobs, results):
+            if partial is not None:
+                partials[name].append(partial)
+            if bad is not None:
+                quarantined.append(bad)
+
+    folded = {name: fold(partials[name]).reset_index() for name in shards}
+    spellings = spellings_of(folded.values())
+    tables = {f"{name}_monthly": monthly(folded[name], spellings) for name in shards}
+    for name, table in tables.items():
+        validate.check_keys(table, name)
+
+    print("Preprocessing completed:",
+          ", ".join(f"{name} {len(paths)} shard(s)" for name, paths in shards.items()))
+
+    # LFI / UDR are undefined where a month has updates but no enrolments
+    return {**tables, "quarantine": quarantine_table(quarantined),
+            "zero_enrolment": validate.zero_enrolments(*tables.values()),
+            "district_spellings": spellings[['state', 'district_key', 'district']]}
+
+
+def merge_updates(enrol_monthly, demo_monthly, bio_monthly):
+    """Enrolments joined with demographic/biometric update totals (shared by LFI and UDR)."""
+    # Row sums come back as int64 even from compact (int8/int16) counts
+    demo = demo_monthly.assign(
+        demo_total=demo_monthly[['demo_age_5_17', 'demo_age_17_']].sum(axis=1)
+    )
+    bio = bio_monthly.assign(
+        bio_total=bio_monthly[['bio_age_5_17', 'bio_age_17_']].sum(axis=1)
+    )
+
+    merged = enrol_monthly.merge(
+        demo[['state', 'district', 'date', 'demo_total']],
+        on=['state', 'district', 'date'],
+        how='left'
+    )
+    record_join('enrol+demo', enrol_monthly, demo, merged)
+
+    with_bio = merged.merge(
+        bio[['state', 'district', 'date', 'bio_total']],
+        on=['state', 'district', 'date'],
+        how='left'
+    )
+    record_join('enrol+bio', merged, bio, with_bio)
+    merged = with_bio
 
-# Convert date column
-for df in [enrol, demo, bio]:
-    df['date'] = pd.to_datetime(df['date'], dayfirst=True)
+    merged.fillna(0, inplace=True)
+    merged = merged.astype({'demo_total': 'int64', 'bio_total': 'int64'})
 
-# Monthly aggregation
-enrol_monthly = enrol.groupby(
-    ['state', 'district', pd.Grouper(key='date', freq='M')]
-).sum().reset_index()
+    # Total enrolment
+    merged['total_enrolment'] = merged[['age_0_5', 'age_5_17', 'age_18_greater']].sum(axis=1)
 
-demo_monthly = demo.groupby(
-    ['state', 'district', pd.Grouper(key='date', freq='M')]
-).sum().reset_index()
+    # Zero-enrolment months have no ratio (listed in the zero_enrolment table)
+    merged = merged[merged['total_enrolment'] > 0].reset_index(drop=True)
 
-bio_monthly = bio.groupby(
-    ['state', 'district', pd.Grouper(key='date', freq='M')]
-).sum().reset_index()
+    return {"enrol_updates": merged}
 
-# Save intermediate files
-enrol_monthly.to_csv("output/enrol_monthly.csv", index=False)
-demo_monthly.to_csv("output/demo_monthly.csv", index=False)
-bio_monthly.to_csv("output/bio_monthly.csv", index=False)
 
-print("Preprocessing completed")
\ No newline at end of file
+if __name__ == "__main__":
+    from src.pipeline import main
+    main(["preprocess"])
@@ -1,65 +1,29 @@
-import pandas as pd
-import numpy as np
+from src import rules
 
-# Load monthly data
-enrol = pd.read_csv("output/enrol_monthly.csv")
-demo = pd.read_csv("output/demo_monthly.csv")
-bio = pd.read_csv("output/bio_monthly.csv")
 
-# Total updates
-demo['demo_total'] = demo['demo_age_5_17'] + demo['demo_age_17_']
-bio['bio_total'] = bio['bio_age_5_17'] + bio['bio_age_17_']
+def run(enrol_updates):
+    merged = enrol_updates.copy()
 
-# Merge datasets
-merged = enrol.merge(
-    demo[['state','district','date','demo_total']],
-    on=['state','district','date'],
-    how='left'
-)
+    # Normalize pressure (zero-enrolment months are quarantined at ingest;
+    # any left over get NaN rather than inf)
+    enrolment = merged['total_enrolment'].where(merged['total_enrolment'] > 0)
+    merged['demo_pressure'] = merged['demo_total'] / enrolment
+    merged['bio_pressure'] = merged['bio_total'] / enrolment
 
-merged = merged.merge(
-    bio[['state','district','date','bio_total']],
-    on=['state','district','date'],
-    how='left'
-)
+    # Lifecycle Friction Index and its category (weights / bands in src/rules.py)
+    rule = rules.load_rules()["lfi"]
+    merged['lifecycle_friction_score'] = rules.weighted(merged, rule)
+    merged['friction_level'] = rules.level(merged['lifecycle_friction_score'], rule)
 
-merged.fillna(0, inplace=True)
+    final = merged[['state', 'district', 'date',
+                    'bio_pressure', 'demo_pressure',
+                    'lifecycle_friction_score', 'friction_level']]
 
-# Total enrolment
-merged['total_enrolment'] = (
-    merged['age_0_5'] +
-    merged['age_5_17'] +
-    merged['age_18_greater']
-)
+    print("Lifecycle Friction Index computed successfully")
 
-# Normalize pressure
-merged['demo_pressure'] = merged['demo_total'] / merged['total_enrolment']
-merged['bio_pressure'] = merged['bio_total'] / merged['total_enrolment']
+    return {"lifecycle_friction_index": final}
 
-# Lifecycle Friction Index
-merged['lifecycle_friction_score'] = (
-    0.6 * merged['bio_pressure'] +
-    0.4 * merged['demo_pressure']
-)
 
-# Categorize friction
-conditions = [
-    merged['lifecycle_friction_score'] < 0.01,
-    merged['lifecycle_friction_score'].between(0.01, 0.03),
-    merged['lifecycle_friction_score'] > 0.03
-]
-
-labels = ['Low', 'Medium', 'High']
-merged['friction_level'] = np.select(
-    conditions,
-    labels,
-    default='Low'   # explicit string default
-)
-
-# Save output
-final = merged[['state','district','date',
-                'lifecycle_friction_score','friction_level']]
-
-final.to_csv("output/lifecycle_friction_index.csv", index=False)
-
-print("Lifecycle Friction Index computed successfully")
\ No newline at end of file
+if __name__ == "__main__":
+    from src.pipeline import main
+    main(["lfi"])
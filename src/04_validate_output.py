@@ -1,10 +1,159 @@
+"""
+Schema and quality checks for the raw UIDAI shards.
+
+Every chunk read at ingest goes through a ChunkChecker before it is summed, so
+bad rows never reach the monthly tables or the joins after them. The checks
+are vectorized over the chunk; a row that fails any of them is moved to the
+quarantine table with its reason codes (';'-joined, e.g. 'junk_state;bad_count'):
+
+    bad_date        date missing or not a DD-MM-YYYY date
+    junk_state      state empty or numeric (e.g. '100000')
+    unknown_state   state not in the canonical state list (src/canonical.py)
+    junk_district   district empty or numeric
+    bad_pincode     pincode not a 6-digit number
+    bad_count       count missing, non-numeric, negative or fractional
+
+Identical raw rows are kept: the dumps list separate records with the same
+values, and they all count. A shard missing an expected column fails the
+run, and so does a monthly table with a repeated (state, district, month)
+key, which would fan out the joins after it. After the monthly sums,
+(state, district, month) keys with update counts but zero enrolments go to the
+zero_enrolment table: LFI and UDR are undefined there. Those keys can leave it
+when a later drop adds enrolments, so they are kept apart from the quarantined
+rows, which only ever grow.
+
+As a pipeline stage this prints the quarantine summary.
+"""
+import numpy as np
 import pandas as pd
 
-df = pd.read_csv("output/lifecycle_friction_index.csv")
+from src import canonical
+
+# Count columns of each raw dataset
+COUNT_COLUMNS = {
+    "enrol": ["age_0_5", "age_5_17", "age_18_greater"],
+    "demo": ["demo_age_5_17", "demo_age_17_"],
+    "bio": ["bio_age_5_17", "bio_age_17_"],
+}
+KEY_COLUMNS = ["date", "state", "district", "pincode"]
+
+# Reason codes in bit order
+REASONS = ("bad_date", "junk_state", "unknown_state", "junk_district",
+           "bad_pincode", "bad_count")
+BIT = {reason: 1 << i for i, reason in enumerate(REASONS)}
+
+# Every known spelling, and the canonical names themselves
+KNOWN_STATES = np.array(sorted(
+    set(canonical.CANONICAL_STATES) |
+    set(canonical.state_key(list(canonical.CANONICAL_STATES.values())))
+), dtype=object)
+
+# Raw values are kept as text; `raw_date` is the unparsed date
+QUARANTINE_COLUMNS = ["dataset", "shard", "line", "reason", "raw_date", "state", "district", "pincode",
+                      *dict.fromkeys(c for cols in COUNT_COLUMNS.values() for c in cols)]
+
+
+def check_schema(columns, dataset, shard):
+    missing = [c for c in KEY_COLUMNS + COUNT_COLUMNS[dataset] if c not in columns]
+    if missing:
+        raise ValueError(f"{shard}: missing column(s) {', '.join(missing)}")
+
+
+def reason_strings(masks):
+    """';'-joined reason codes per bitmask (computed once per distinct mask)."""
+    codes, uniques = pd.factorize(masks)
+    labels = np.array([";".join(r for r in REASONS if m & BIT[r]) for m in uniques], dtype=object)
+    return labels[codes]
+
+
+class ChunkChecker:
+    """Checks the chunks of one shard; holds nothing between chunks."""
+
+    def __init__(self, dataset, shard):
+        self.dataset = dataset
+        self.shard = shard
+        self.counts = COUNT_COLUMNS[dataset]
+
+    def check(self, chunk):
+        """Return (clean rows with a parsed `month` column, quarantined rows)."""
+        check_schema(chunk.columns, self.dataset, self.shard)
+        mask = np.zeros(len(chunk), dtype=np.int64)
+
+        dates = pd.to_datetime(chunk["date"], format="%d-%m-%Y", errors="coerce")
+        retry = dates.isna() & chunk["date"].notna()
+        if retry.any():
+            # Other layouts, still day first (the old parser accepted these)
+            dates[retry] = pd.to_datetime(chunk.loc[retry, "date"], dayfirst=True,
+                                          format="mixed", errors="coerce")
+        mask |= np.where(dates.isna(), BIT["bad_date"], 0)
+
+        junk_state = canonical.is_junk_state(chunk["state"]).to_numpy()
+        known = canonical.state_key(chunk["state"]).isin(KNOWN_STATES).to_numpy()
+        mask |= np.where(junk_state, BIT["junk_state"], 0)
+        mask |= np.where(~junk_state & ~known, BIT["unknown_state"], 0)
+        mask |= np.where(canonical.is_junk_state(chunk["district"]).to_numpy(), BIT["junk_district"], 0)
+
+        pincode = pd.to_numeric(chunk["pincode"], errors="coerce").to_numpy(dtype=float)
+        mask |= np.where(~((pincode >= 100000) & (pincode <= 999999) & (pincode % 1 == 0)),
+                         BIT["bad_pincode"], 0)
+
+        counts = chunk[self.counts].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        bad_count = np.any(~np.isfinite(counts) | (counts < 0) | (counts % 1 != 0), axis=1)
+        mask |= np.where(bad_count, BIT["bad_count"], 0)
+
+        bad = mask != 0
+        clean = chunk[~bad].drop(columns="date").assign(month=dates[~bad].dt.to_period("M"))
+        clean[self.counts] = counts[~bad].astype(np.int64)
+        return clean, quarantine_rows(chunk[bad], mask[bad], self.dataset, self.shard)
+
+
+def quarantine_rows(rows, masks, dataset, shard):
+    """Raw rows (as text, so nothing is lost) with their reason codes."""
+    out = rows.astype(str).where(rows.notna(), None).rename(columns={"date": "raw_date"})
+    out.insert(0, "reason", reason_strings(masks))
+    # Line numbers in the shard file (header is line 1)
+    out.insert(0, "line", rows.index.to_numpy(dtype=np.int64) + 2)
+    out.insert(0, "shard", shard)
+    out.insert(0, "dataset", dataset)
+    return out.reindex(columns=QUARANTINE_COLUMNS).reset_index(drop=True)
+
+
+def check_keys(frame, name, keys=("state", "district", "date")):
+    """Fail on repeated join keys (e.g. two spellings left as separate rows then merged)."""
+    repeated = frame.duplicated(list(keys), keep=False)
+    if repeated.any():
+        sample = frame.loc[repeated, list(keys)].head(3).to_dict("records")
+        raise ValueError(f"{name}: {int(repeated.sum())} rows share a key, e.g. {sample}")
+
+
+def zero_enrolments(enrol_monthly, demo_monthly, bio_monthly):
+    """(state, district, month) keys with demographic/biometric updates but no enrolments."""
+    keys = ["state", "district", "date"]
+    enrol = enrol_monthly.assign(total=enrol_monthly[COUNT_COLUMNS["enrol"]].sum(axis=1))
+    updates = pd.concat([demo_monthly[keys], bio_monthly[keys]]).drop_duplicates()
+    joined = updates.merge(enrol[keys + ["total"]], on=keys, how="left")
+    zero = joined[joined["total"].fillna(0) == 0]
+    return pd.DataFrame({
+        "state": zero["state"].astype(str).to_numpy(),
+        "district": zero["district"].astype(str).to_numpy(),
+        "date": pd.to_datetime(zero["date"]).to_numpy(),
+    })
+
+
+def empty_quarantine():
+    return pd.DataFrame({c: pd.Series(dtype=object) for c in QUARANTINE_COLUMNS}).astype(
+        {"line": np.int64})
+
+
+def run(quarantine, zero_enrolment):
+    print(f"Quarantined rows: {len(quarantine)}")
+    if len(quarantine):
+        reasons = quarantine["reason"].str.split(";").explode()
+        summary = pd.crosstab(reasons, quarantine.loc[reasons.index, "dataset"])
+        print(summary.to_string())
+    print(f"Zero-enrolment district-months: {len(zero_enrolment)}")
 
-print(df.head())
-print("\nFriction Level Distribution:")
-print(df['friction_level'].value_counts())
 
-print("\nMax friction score:", df['lifecycle_friction_score'].max())
-print("Min friction score:", df['lifecycle_friction_score'].min())
\ No newline at end of file
+if __name__ == "__main__":
+    from src.pipeline import main
+    main(["validate"])
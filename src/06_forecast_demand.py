@@ -1,72 +1,82 @@
 import pandas as pd
-import numpy as np
-
-# Load monthly aggregated data
-demo = pd.read_csv("output/demo_monthly.csv")
-bio = pd.read_csv("output/bio_monthly.csv")
-
-# Convert date
-demo['date'] = pd.to_datetime(demo['date'])
-bio['date'] = pd.to_datetime(bio['date'])
-
-# Total updates per month
-demo['demo_total'] = demo['demo_age_5_17'] + demo['demo_age_17_']
-bio['bio_total'] = bio['bio_age_5_17'] + bio['bio_age_17_']
-
-# Merge update datasets
-updates = demo.merge(
-    bio[['state','district','date','bio_total']],
-    on=['state','district','date'],
-    how='left'
-)
-
-updates.fillna(0, inplace=True)
-
-updates['total_updates'] = (
-    updates['demo_total'] + updates['bio_total']
-)
-
-# Sort for rolling calculation
-updates = updates.sort_values(['state','district','date'])
-
-# 3-month rolling average forecast
-updates['forecast_next_month'] = (
-    updates.groupby(['state','district'])['total_updates']
-    .transform(lambda x: x.rolling(3, min_periods=1).mean())
-)
-
-# Demand level classification
-conditions = [
-    updates['forecast_next_month'] < 500,
-    updates['forecast_next_month'].between(500, 2000),
-    updates['forecast_next_month'] > 2000
-]
-
-labels = ['Low Demand', 'Medium Demand', 'High Demand']
-
-updates['forecast_level'] = np.select(
-    conditions,
-    labels,
-    default='Low Demand'
-)
-
-# Action recommendations
-def recommend_action(level):
-    if level == 'High Demand':
-        return 'Deploy mobile Aadhaar van / add staff'
-    elif level == 'Medium Demand':
-        return 'Extend working hours'
-    else:
-        return 'No action required'
-
-updates['recommended_action'] = updates['forecast_level'].apply(recommend_action)
-
-# Save output
-forecast_output = updates[
-    ['state','district','date',
-     'forecast_next_month','forecast_level','recommended_action']
-]
-
-forecast_output.to_csv("output/demand_forecast_actions.csv", index=False)
-
-print("Demand forecasting and action plan generated successfully")
\ No newline at end of file
+
+from src import forecasting, rules
+from src.manifest import record_join
+
+# Model behind forecast_next_month (one of forecasting.MODELS)
+MODEL = "rolling_mean"
+# Months ahead in demand_forecast_horizons, and its interval coverage
+HORIZONS = 3
+INTERVAL_LEVEL = 0.95
+
+
+def monthly_updates(demo_monthly, bio_monthly):
+    """Demographic + biometric updates per (state, district, month)."""
+    demo = demo_monthly.copy()
+    bio = bio_monthly.copy()
+
+    # Convert date
+    demo['date'] = pd.to_datetime(demo['date'])
+    bio['date'] = pd.to_datetime(bio['date'])
+
+    # Total updates per month
+    demo['demo_total'] = demo[['demo_age_5_17', 'demo_age_17_']].sum(axis=1)
+    bio['bio_total'] = bio[['bio_age_5_17', 'bio_age_17_']].sum(axis=1)
+
+    # Merge update datasets
+    updates = demo.merge(
+        bio[['state', 'district', 'date', 'bio_total']],
+        on=['state', 'district', 'date'],
+        how='left'
+    )
+    record_join('demo+bio', demo, bio, updates)
+
+    updates.fillna(0, inplace=True)
+
+    updates['total_updates'] = updates[['demo_total', 'bio_total']].sum(axis=1)
+    return updates
+
+
+def demand_level(forecast):
+    """Demand level classification of forecast update counts (bands in src/rules.py)."""
+    return rules.level(forecast, rules.load_rules()["demand"])
+
+
+def run(demo_monthly, bio_monthly):
+    updates = monthly_updates(demo_monthly, bio_monthly)
+
+    # Fit every model across all districts at once
+    panel = forecasting.Panel.from_frame(updates, ['state', 'district'], 'total_updates')
+    fit = forecasting.fit_model(panel, MODEL)
+
+    # Forecast for next month, made at each month
+    updates['forecast_next_month'] = fit.next_values()
+    updates = updates.sort_values(['state', 'district', 'date'])
+
+    # Next HORIZONS months after the latest data, per model, with intervals
+    horizons = pd.concat(
+        [forecasting.forecast(panel, model, HORIZONS, INTERVAL_LEVEL) for model in forecasting.MODELS],
+        ignore_index=True
+    )
+
+    # Demand level classification
+    updates['forecast_level'] = demand_level(updates['forecast_next_month'])
+
+    updates['recommended_action'] = rules.action(updates['forecast_level'], rules.load_rules()["demand"])
+
+    forecast_output = updates[
+        ['state', 'district', 'date',
+         'forecast_next_month', 'forecast_level', 'recommended_action']
+    ]
+
+    print("Demand forecasting and action plan generated successfully")
+
+    return {
+        "demand_forecast_actions": forecast_output,
+        "demand_forecast_horizons": horizons,
+    }
+
+
+if __name__ == "__main__":
+    from src.pipeline import main
+    main(["forecast"])
@@ -1,40 +1,65 @@
 import pandas as pd
 
-# Load analytics outputs (USE ACTUAL FILENAMES)
-lfi = pd.read_csv("output/lifecycle_friction_index.csv")
-udr = pd.read_csv("output/update_dependency_ratio.csv")
-forecast = pd.read_csv("output/demand_forecast_actions.csv")
-
-# Ensure date is datetime
-forecast['date'] = pd.to_datetime(forecast['date'])
-
-# Keep latest forecast per district
-latest_forecast = (
-    forecast.sort_values('date')
-    .groupby(['state', 'district'])
-    .tail(1)
-)
-
-# Merge datasets
-admin_view = (
-    lfi.merge(udr, on=['state', 'district'], how='left')
-       .merge(
-           latest_forecast[
-               ['state', 'district', 'forecast_level', 'recommended_action']
-           ],
-           on=['state', 'district'],
-           how='left'
-       )
-)
-
-# Rename columns for clarity
-admin_view.rename(columns={
-    'friction_level': 'Lifecycle_Friction',
-    'dependency_level': 'Update_Dependency_Pressure',
-    'forecast_level': 'Next_Month_Demand'
-}, inplace=True)
-
-# Save final admin dataset
-admin_view.to_csv("output/admin_decision_dashboard.csv", index=False)
-
-print("✅ Admin master decision dataset created successfully")
\ No newline at end of file
+from src.manifest import record_join
+
+KEYS = ['state', 'district', 'date']
+
+
+def checked_merge(left, right, on, validate):
+    """
+    Left join that fails the build when it fans out: pandas checks key
+    uniqueness (`validate`) and the result must keep exactly the left rows.
+    """
+    merged = left.merge(right, on=on, how='left', validate=validate)
+    record_join(f"{'+'.join(on)} ({validate})", left, right, merged)
+    if len(merged) != len(left):
+        raise ValueError(
+            f"Join on {on} fanned out: {len(left)} rows became {len(merged)}"
+        )
+    return merged
+
+
+def run(lifecycle_friction_index, update_dependency_ratio, demand_forecast_actions):
+    lfi = lifecycle_friction_index.copy()
+    udr = update_dependency_ratio.copy()
+    forecast = demand_forecast_actions.copy()
+
+    # Ensure date is datetime on every side of the joins
+    for frame in (lfi, udr, forecast):
+        frame['date'] = pd.to_datetime(frame['date'])
+
+    # Keep latest forecast per district
+    latest_forecast = (
+        forecast.sort_values('date')
+        .groupby(['state', 'district'], observed=True)
+        .tail(1)
+    )
+
+    # Merge datasets: LFI and UDR are both monthly, so align them on the month
+    admin_view = checked_merge(
+        lfi, udr[KEYS + ['udr', 'udr_level']],
+        on=KEYS, validate='one_to_one'
+    )
+    admin_view = checked_merge(
+        admin_view,
+        latest_forecast[
+            ['state', 'district', 'forecast_next_month', 'forecast_level', 'recommended_action']
+        ],
+        on=['state', 'district'], validate='many_to_one'
+    )
+
+    # Rename columns for clarity
+    admin_view.rename(columns={
+        'friction_level': 'Lifecycle_Friction',
+        'dependency_level': 'Update_Dependency_Pressure',
+        'forecast_level': 'Next_Month_Demand'
+    }, inplace=True)
+
+    print("✅ Admin master decision dataset created successfully:", len(admin_view), "rows")
+
+    return {"admin_decision_dashboard": admin_view}
+
+
+if __name__ == "__main__":
+    from src.pipeline import main
+    main(["admin"])
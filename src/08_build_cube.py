@@ -0,0 +1,16 @@
+from src import cube
+
+
+def run(enrol_monthly, demo_monthly, bio_monthly, demand_forecast_actions):
+    # Additive measures per (state, district, month, age group), then every
+    # coarser rollup the /aggregate endpoint can answer from (src/cube.py)
+    tables = cube.build(enrol_monthly, demo_monthly, bio_monthly, demand_forecast_actions)
+
+    print("Rollup cube built:", ", ".join(f"{name} ({len(frame)} rows)" for name, frame in tables.items()))
+
+    return tables
+
+
+if __name__ == "__main__":
+    from src.pipeline import main
+    main(["cube"])
@@ -0,0 +1,130 @@
+"""
+Rolling-origin backtest of the demand forecasting models.
+
+Every (state, district) series is replayed month by month: at each origin the
+models see only the months up to it and forecast the next HORIZONS months,
+which are scored against what actually happened. Series are split into
+chunks spread over a process pool; within a chunk each origin is one batched
+fit across all its series (src/forecasting.py).
+
+Run from the repository root (after the preprocess stage):
+    python -m src.backtest                  # print the leaderboard, save it to the store
+    python -m src.backtest --horizons 1 --min-train 4 --csv output/leaderboard.csv
+
+Leaderboard columns: candidate, model, horizon, points, mae, mape (%, over
+months with non-zero actuals), level_accuracy (share of months whose
+forecast demand level matches the actual one) and fit_seconds (summed over
+workers).
+"""
+import argparse
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src import forecasting, store
+
+forecast_stage = importlib.import_module("src.06_forecast_demand")
+
+# Candidate name -> (model, parameters)
+CANDIDATES = {
+    "rolling_mean_3": ("rolling_mean", {"window": 3}),
+    "rolling_mean_6": ("rolling_mean", {"window": 6}),
+    "ewma_0.3": ("ewma", {"alpha": 0.3}),
+    "ewma_0.5": ("ewma", {"alpha": 0.5}),
+    "holt_winters": ("holt_winters", {}),
+}
+
+HORIZONS = 3
+# Months of history before the first origin
+MIN_TRAIN = 3
+SERIES_PER_CHUNK = 2000
+BACKTEST_WORKERS = int(os.environ.get("AADHAAR_BACKTEST_WORKERS", os.cpu_count() or 1))
+
+KEYS = ['state', 'district']
+SUMS = ["points", "abs_error", "ape", "ape_points", "level_hits", "fit_seconds"]
+
+
+def backtest_chunk(updates, candidates=CANDIDATES, horizons=HORIZONS, min_train=MIN_TRAIN):
+    """Error sums per (candidate, horizon) for one chunk of series."""
+    panel = forecasting.Panel.from_frame(updates, KEYS, 'total_updates')
+    y = panel.values
+    rows = []
+    for name, (model, params) in candidates.items():
+        sums = {h: dict.fromkeys(SUMS, 0.0) for h in range(1, horizons + 1)}
+        for origin in range(min_train, y.shape[1]):
+            started = time.perf_counter()
+            fit = forecasting.fit_model(panel.truncate(origin), model, **params)
+            paths = {h: fit.path(h) for h in sums}
+            elapsed = time.perf_counter() - started
+
+            for h, predicted in paths.items():
+                target = origin - 1 + h
+                if target >= y.shape[1]:
+                    continue
+                scored = panel.lengths > target
+                actual, predicted = y[scored, target], predicted[scored]
+                nonzero = actual != 0
+                s = sums[h]
+                s["points"] += len(actual)
+                s["abs_error"] += np.abs(predicted - actual).sum()
+                s["ape"] += (np.abs(predicted - actual)[nonzero] / actual[nonzero]).sum()
+                s["ape_points"] += nonzero.sum()
+                s["level_hits"] += (forecast_stage.demand_level(predicted)
+                                    == forecast_stage.demand_level(actual)).sum()
+            # Fit cost is shared by every horizon of the origin
+            for s in sums.values():
+                s["fit_seconds"] += elapsed / len(sums)
+        rows += [{"candidate": name, "model": model, "horizon": h, **s} for h, s in sums.items()]
+    return pd.DataFrame(rows)
+
+
+def chunks(updates, size=SERIES_PER_CHUNK):
+    series = updates.groupby(KEYS, observed=True, sort=False).ngroup()
+    for _, chunk in updates.groupby(series // size, sort=False):
+        yield chunk
+
+
+def leaderboard(updates, candidates=CANDIDATES, horizons=HORIZONS, min_train=MIN_TRAIN,
+                workers=BACKTEST_WORKERS):
+    parts = list(chunks(updates))
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(parts)))) as pool:
+        results = list(pool.map(backtest_chunk, parts,
+                                [candidates] * len(parts), [horizons] * len(parts),
+                                [min_train] * len(parts)))
+
+    totals = pd.concat(results).groupby(["candidate", "model", "horizon"], as_index=False)[SUMS].sum()
+    board = totals[["candidate", "model", "horizon"]].copy()
+    board["points"] = totals["points"].astype(int)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        board["mae"] = totals["abs_error"] / totals["points"]
+        board["mape"] = 100 * totals["ape"] / totals["ape_points"]
+        board["level_accuracy"] = totals["level_hits"] / totals["points"]
+    board["fit_seconds"] = totals["fit_seconds"]
+    return board.sort_values(["horizon", "mae"]).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the demand forecasts")
+    parser.add_argument("--horizons", type=int, default=HORIZONS)
+    parser.add_argument("--min-train", type=int, default=MIN_TRAIN)
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    parser.add_argument("--csv", help="also write the leaderboard to this CSV file")
+    args = parser.parse_args(argv)
+
+    updates = forecast_stage.monthly_updates(store.read_table("demo_monthly"),
+                                             store.read_table("bio_monthly"))
+    board = leaderboard(updates, horizons=args.horizons, min_train=args.min_train,
+                        workers=args.workers)
+
+    store.write_table(board, "forecast_leaderboard")
+    if args.csv:
+        board.to_csv(args.csv, index=False)
+    print(board.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+State / district canonicalization shared by the pipeline, the backend and
+the cleanup scripts.
+
+Columns are factorized first, so each distinct spelling is normalized once
+and a whole column is mapped through integer codes in one vectorized pass.
+Canonical columns come back as categoricals (`.cat.codes` are the ids).
+"""
+import numpy as np
+import pandas as pd
+
+CANONICAL_STATES = {
+    "andaman & nicobar islands": "Andaman & Nicobar Islands",
+    "andaman and nicobar islands": "Andaman & Nicobar Islands",
+    "andhra pradesh": "Andhra Pradesh",
+    "arunachal pradesh": "Arunachal Pradesh",
+    "assam": "Assam",
+    "bihar": "Bihar",
+    "chandigarh": "Chandigarh",
+    "chhattisgarh": "Chhattisgarh",
+    "chhatisgarh": "Chhattisgarh",
+    "chattisgarh": "Chhattisgarh",
+    "delhi": "Delhi",
+    "goa": "Goa",
+    "gujarat": "Gujarat",
+    "haryana": "Haryana",
+    "himachal pradesh": "Himachal Pradesh",
+    "jharkhand": "Jharkhand",
+    "karnataka": "Karnataka",
+    "kerala": "Kerala",
+    "ladakh": "Ladakh",
+    "lakshadweep": "Lakshadweep",
+    "madhya pradesh": "Madhya Pradesh",
+    "maharashtra": "Maharashtra",
+    "manipur": "Manipur",
+    "meghalaya": "Meghalaya",
+    "mizoram": "Mizoram",
+    "nagaland": "Nagaland",
+    "odisha": "Odisha",
+    "orissa": "Odisha",
+    "pondicherry": "Puducherry",
+    "puducherry": "Puducherry",
+    "punjab": "Punjab",
+    "rajasthan": "Rajasthan",
+    "sikkim": "Sikkim",
+    "tamil nadu": "Tamil Nadu",
+    "tamilnadu": "Tamil Nadu",
+    "telangana": "Telangana",
+    "tripura": "Tripura",
+    "uttar pradesh": "Uttar Pradesh",
+    "uttarakhand": "Uttarakhand",
+    "uttaranchal": "Uttarakhand",
+    "west bengal": "West Bengal",
+    "west bangal": "West Bengal",
+    "west bengli": "West Bengal",
+    "westbengal": "West Bengal",
+    "west  bengal": "West Bengal",
+    "jammu & kashmir": "Jammu & Kashmir",
+    "jammu and kashmir": "Jammu & Kashmir",
+    "dadra & nagar haveli": "Dadra & Nagar Haveli and Daman & Diu",
+    "dadra and nagar haveli": "Dadra & Nagar Haveli and Daman & Diu",
+    "daman & diu": "Dadra & Nagar Haveli and Daman & Diu",
+    "daman and diu": "Dadra & Nagar Haveli and Daman & Diu",
+    "dadra & nagar haveli & daman & diu": "Dadra & Nagar Haveli and Daman & Diu",
+    "dadra and nagar haveli and daman and diu": "Dadra & Nagar Haveli and Daman & Diu",
+    "the dadra & nagar haveli & daman & diu": "Dadra & Nagar Haveli and Daman & Diu",
+    "the dadra and nagar haveli and daman and diu": "Dadra & Nagar Haveli and Daman & Diu",
+}
+
+
+def _per_unique(values, func):
+    """Apply a vectorized Series -> Series function to the distinct values only."""
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    mapped = func(pd.Series(uniques, dtype=object).astype(str)).to_numpy(dtype=object)
+    out = np.full(len(values), None, dtype=object) if len(mapped) == 0 else mapped[codes]
+    out[codes < 0] = None
+    return pd.Series(out, index=values.index, dtype=object)
+
+
+def state_key(states):
+    """Lowercase with whitespace collapsed, e.g. 'West  Bengal ' -> 'west bengal'."""
+    return _per_unique(states, lambda s: s.str.lower().str.split().str.join(" "))
+
+
+def district_key(districts):
+    """Lowercase, punctuation to spaces, whitespace collapsed."""
+    return _per_unique(
+        districts,
+        lambda s: s.str.lower().str.replace(r"[^a-z0-9 ]", " ", regex=True).str.split().str.join(" ")
+    )
+
+
+def is_junk_state(states):
+    """Empty, missing or purely numeric state values (e.g. '100000')."""
+    states = pd.Series(states)
+    text = states.astype(object).fillna("").astype(str).str.strip()
+    return states.isna() | (text == "") | text.str.isdigit()
+
+
+def canonical_states(states):
+    """Canonical state names as a categorical; unknown spellings are kept as-is."""
+    states = pd.Series(states)
+    keys = state_key(states)
+    names = keys.map(CANONICAL_STATES).fillna(states.astype(object))
+    return names.astype("category")
+
+
+def district_spellings(states, districts):
+    """
+    Preferred spelling per (canonical state, district key): the most frequent
+    raw spelling, ties going to the first seen. Returns a frame with columns
+    state, district_key, district, variants (number of raw spellings).
+    """
+    frame = pd.DataFrame({
+        "state": canonical_states(states).astype(object),
+        "district_key": district_key(districts),
+        "district": pd.Series(districts).astype(object).str.strip(),
+    }).dropna()
+    frame = frame[(frame["state"] != "") & (frame["district_key"] != "")]
+
+    counts = (
+        frame.groupby(["state", "district_key", "district"], sort=False)
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+    counts["variants"] = counts.groupby(["state", "district_key"])["district"].transform("size")
+    best = (
+        counts.sort_values("count", ascending=False, kind="stable")
+        .drop_duplicates(["state", "district_key"])
+        .sort_values(["state", "district_key"])
+        .reset_index(drop=True)
+    )
+    return best[["state", "district_key", "district", "variants"]]
+
+
+def canonical_districts(states, districts, spellings=None):
+    """Map every district to its preferred spelling (categorical)."""
+    states = canonical_states(states).astype(object)
+    keys = district_key(districts)
+    if spellings is None:
+        spellings = district_spellings(states, districts)
+    lookup = pd.MultiIndex.from_arrays([spellings["state"].astype(object),
+                                        spellings["district_key"].astype(object)])
+    pos = lookup.get_indexer(pd.MultiIndex.from_arrays([states, keys]))
+    preferred = spellings["district"].to_numpy(dtype=object)[pos]
+    names = np.where(pos >= 0, preferred, pd.Series(districts).astype(object).to_numpy())
+    return pd.Series(names, index=pd.Series(districts).index).astype("category")
+
+
+def canonicalize(frame, state="state", district="district", drop_junk=True, spellings=None):
+    """
+    Return a copy of `frame` with canonical categorical state/district columns.
+    Junk states (empty or numeric) are dropped unless drop_junk=False.
+    Pass the same `spellings` (district_spellings) to frames that are joined
+    later, so every one of them picks the same spelling of a district.
+    """
+    if drop_junk:
+        frame = frame[~is_junk_state(frame[state]).to_numpy()]
+    frame = frame.copy()
+    if district in frame.columns:
+        frame[district] = canonical_districts(frame[state], frame[district], spellings)
+    frame[state] = canonical_states(frame[state])
+    return frame
@@ -0,0 +1,138 @@
+"""
+Rollup cube over (state, district, month, age group) for every additive
+metric, plus the query logic that answers group-by / filter requests from
+the smallest precomputed rollup that still has the dimensions they need.
+
+Base metrics are stored as sums so they can be rolled up any way:
+    enrolments      age groups 0-5, 5-17, 18+
+    demo_updates    age groups 5-17, 18+ (raw column 17+)
+    bio_updates     age groups 5-17, 18+ (raw column 17+)
+    forecast        next-month demand forecast (age group 'all'); kept only in
+                    rollups by date, since a sum of forecasts made in
+                    different months means nothing
+Ratio metrics are derived from the sums of each answer row, so they are
+consistent at every level:
+    udr = (demo_updates + bio_updates) / enrolments
+    lfi = LFI weights (src/rules.py) applied to bio / demo updates per enrolment
+"""
+import numpy as np
+import pandas as pd
+
+from src import canonical, rules
+
+DIMENSIONS = ("state", "district", "date", "age_group")
+MEASURES = ("enrolments", "demo_updates", "bio_updates", "forecast")
+DERIVED = ("lfi", "udr")
+
+# Raw column -> (metric, age group). The update dumps split adults at 17+
+# while enrolments use 18+; 17+ is filed under 18+ so adult enrolments and
+# updates share a row (their 18+ then includes 17-year-olds' updates).
+SOURCES = {
+    "enrol_monthly": {
+        "age_0_5": ("enrolments", "0-5"),
+        "age_5_17": ("enrolments", "5-17"),
+        "age_18_greater": ("enrolments", "18+"),
+    },
+    "demo_monthly": {
+        "demo_age_5_17": ("demo_updates", "5-17"),
+        "demo_age_17_": ("demo_updates", "18+"),
+    },
+    "bio_monthly": {
+        "bio_age_5_17": ("bio_updates", "5-17"),
+        "bio_age_17_": ("bio_updates", "18+"),
+    },
+}
+
+# Precomputed groupings, finest first (district always comes with its state)
+ROLLUPS = (
+    ("state", "district", "date", "age_group"),
+    ("state", "district", "date"),
+    ("state", "district"),
+    ("state", "date", "age_group"),
+    ("state", "age_group"),
+    ("state", "date"),
+    ("date", "age_group"),
+    ("state",),
+    ("date",),
+    ("age_group",),
+    (),
+)
+
+# LFI weight names (src/rules.py) -> measure divided by enrolments
+PRESSURES = {"bio_pressure": "bio_updates", "demo_pressure": "demo_updates"}
+
+
+def measures_of(dims):
+    """Measures stored in the rollup by `dims`."""
+    return MEASURES if "date" in dims else tuple(m for m in MEASURES if m != "forecast")
+
+
+def table_name(dims):
+    return "cube_" + ("_".join(dims) if dims else "total")
+
+
+TABLES = tuple(table_name(dims) for dims in ROLLUPS)
+
+
+def base_cube(enrol_monthly, demo_monthly, bio_monthly, demand_forecast_actions):
+    """Finest rollup: one row per (state, district, month, age group)."""
+    frames = {"enrol_monthly": enrol_monthly, "demo_monthly": demo_monthly,
+              "bio_monthly": bio_monthly, "demand_forecast_actions": demand_forecast_actions}
+    # Canonical names, junk states dropped (inputs may be legacy CSV outputs);
+    # one spelling table for all inputs so their districts line up
+    both = pd.concat([frame[["state", "district"]] for frame in frames.values()], ignore_index=True)
+    spellings = canonical.district_spellings(both["state"], both["district"])
+    frames = {name: canonical.canonicalize(frame, spellings=spellings) for name, frame in frames.items()}
+    parts = []
+    for name, columns in SOURCES.items():
+        frame = frames[name]
+        for column, (metric, age_group) in columns.items():
+            parts.append(pd.DataFrame({
+                "state": frame["state"].astype(str),
+                "district": frame["district"].astype(str),
+                "date": pd.to_datetime(frame["date"]),
+                "age_group": age_group,
+                metric: frame[column].to_numpy(dtype=float),
+            }))
+    forecast = frames["demand_forecast_actions"]
+    parts.append(pd.DataFrame({
+        "state": forecast["state"].astype(str),
+        "district": forecast["district"].astype(str),
+        "date": pd.to_datetime(forecast["date"]),
+        "age_group": "all",
+        "forecast": forecast["forecast_next_month"].to_numpy(dtype=float),
+    }))
+    cube = pd.concat(parts, ignore_index=True)
+    cube[list(MEASURES)] = cube[list(MEASURES)].fillna(0.0)
+    base = cube.groupby(list(DIMENSIONS), as_index=False, sort=True)[list(MEASURES)].sum()
+    # Counts are whole numbers; only the forecast is fractional
+    return base.astype({m: "int64" for m in MEASURES if m != "forecast"})
+
+
+def rollup(base, dims):
+    measures = list(measures_of(dims))
+    if not dims:
+        # Column by column, so counts stay integers (and int64 even from compact frames)
+        return pd.DataFrame({m: [base[m].sum()] for m in measures})
+    return base.groupby(list(dims), as_index=False, sort=True, observed=True)[measures].sum()
+
+
+def build(enrol_monthly, demo_monthly, bio_monthly, demand_forecast_actions):
+    """Every rollup as {table name: frame}."""
+    base = base_cube(enrol_monthly, demo_monthly, bio_monthly, demand_forecast_actions)
+    return {table_name(dims): base if dims == ROLLUPS[0] else rollup(base, dims)
+            for dims in ROLLUPS}
+
+
+def derive(frame, metrics, lfi_rule=None):
+    """Add the ratio metrics, computed from the summed measures of each row."""
+    lfi_rule = lfi_rule or rules.RULES["lfi"]
+    enrolments = frame["enrolments"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "udr" in metrics:
+            frame["udr"] = (frame["demo_updates"].to_numpy(dtype=float) +
+                            frame["bio_updates"].to_numpy(dtype=float)) / enrolments
+        if "lfi" in metrics:
+            frame["lfi"] = sum(weight * frame[PRESSURES[name]].to_numpy(dtype=float) / enrolments
+                               for name, weight in lfi_rule["weights"].items())
+    return frame.replace([np.inf, -np.inf], np.nan)
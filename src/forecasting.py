@@ -0,0 +1,221 @@
+"""
+Batched demand forecasting over many monthly series at once.
+
+Series (one per district, or per district x pincode, ...) are sorted by key
+and time and laid out as rows of a NaN-padded (series x months) matrix.
+Every model then runs as vectorized NumPy over all series together: rolling
+means from cumulative sums, and the EWMA / Holt-Winters recursions as one
+loop over time steps, each step updating every series at once. No Python
+code runs per series.
+
+    panel = Panel.from_frame(updates, ["state", "district"], "total_updates")
+    fit = fit_model(panel, "holt_winters")
+    fit.next_values()                     # one-step-ahead forecast per input row
+    forecast(panel, "ewma", horizons=3)   # h = 1..3 months ahead, 95% intervals
+
+Observations are taken in order per series; missing months are not filled.
+"""
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+MODELS = ("rolling_mean", "ewma", "holt_winters")
+
+# Default model parameters
+WINDOW = 3
+ALPHA = 0.5
+BETA = 0.1
+GAMMA = 0.2
+SEASON_LENGTH = 12
+
+
+@dataclass
+class Panel:
+    keys: pd.DataFrame      # one row per series
+    values: np.ndarray      # (series, months), NaN after each series ends
+    lengths: np.ndarray     # observations per series
+    last_time: pd.Series    # time of the last observation per series
+    series: np.ndarray      # series id of each input row
+    step: np.ndarray        # position of each input row within its series
+
+    @classmethod
+    def from_frame(cls, frame, keys, value, time="date"):
+        ordered = frame.reset_index(drop=True).sort_values([*keys, time], kind="stable")
+        order = ordered.index.to_numpy()
+
+        # Rows are sorted, so group numbers follow the sort order
+        series_sorted = ordered.groupby(keys, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+        lengths = np.bincount(series_sorted, minlength=series_sorted.max() + 1 if len(order) else 0)
+        starts = np.cumsum(lengths) - lengths
+        step_sorted = np.arange(len(order)) - starts[series_sorted]
+        key_values = ordered[keys].reset_index(drop=True)
+
+        values = np.full((len(starts), lengths.max() if len(lengths) else 0), np.nan)
+        values[series_sorted, step_sorted] = ordered[value].to_numpy(dtype=float)
+
+        # Map back to the caller's row order
+        series = np.empty(len(frame), dtype=np.int64)
+        step = np.empty(len(frame), dtype=np.int64)
+        series[order] = series_sorted
+        step[order] = step_sorted
+
+        times = pd.to_datetime(ordered[time]).reset_index(drop=True)
+        return cls(
+            keys=key_values.iloc[starts].reset_index(drop=True),
+            values=values,
+            lengths=lengths,
+            last_time=times.iloc[starts + lengths - 1].reset_index(drop=True),
+            series=series,
+            step=step,
+        )
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def truncate(self, n):
+        """The panel as it was after each series' first n observations."""
+        values = self.values[:, :n]
+        return Panel(self.keys, values, np.minimum(self.lengths, values.shape[1]),
+                     self.last_time, self.series, self.step)
+
+    @property
+    def observed(self):
+        return np.arange(self.values.shape[1]) < self.lengths[:, None]
+
+
+@dataclass
+class Fit:
+    model: str
+    panel: Panel
+    fitted: np.ndarray      # (series, months): forecast for t + 1 made at t
+    sigma: np.ndarray       # std of one-step-ahead errors per series
+    path: object            # h -> (series,) forecast h steps after the last observation
+
+    def next_values(self):
+        """One-step-ahead forecast at every input row, in input order."""
+        return self.fitted[self.panel.series, self.panel.step]
+
+
+def _last(matrix, lengths):
+    return matrix[np.arange(len(lengths)), np.maximum(lengths - 1, 0)]
+
+
+def _rolling_mean(panel, window=WINDOW):
+    y = np.nan_to_num(panel.values)
+    csum = np.cumsum(y, axis=1)
+    shifted = np.zeros_like(csum)
+    shifted[:, window:] = csum[:, :-window]
+    counts = np.minimum(np.arange(1, y.shape[1] + 1), window)
+    fitted = np.where(panel.observed, (csum - shifted) / counts, np.nan)
+    last = _last(fitted, panel.lengths)
+    return fitted, lambda h: last
+
+
+def _ewma(panel, alpha=ALPHA):
+    y = panel.values
+    level = y[:, 0].copy() if y.shape[1] else np.zeros(0)
+    fitted = np.full_like(y, np.nan)
+    for t in range(y.shape[1]):
+        live = t < panel.lengths
+        level = np.where(live, alpha * y[:, t] + (1 - alpha) * level, level)
+        fitted[:, t] = np.where(live, level, np.nan)
+    return fitted, lambda h: level
+
+
+def _holt_winters(panel, alpha=ALPHA, beta=BETA, gamma=GAMMA, season_length=SEASON_LENGTH):
+    """
+    Additive Holt-Winters. Series with fewer than two full seasons get no
+    seasonal component (Holt's linear trend).
+    """
+    y = panel.values
+    m = season_length
+    n_series, n_steps = y.shape
+    rows = np.arange(n_series)
+    seasonal_ok = panel.lengths >= 2 * m
+
+    level = y[:, 0].copy() if n_steps else np.zeros(0)
+    trend = np.zeros(n_series)
+    season = np.zeros((n_series, m))
+    if n_steps >= 2 * m and seasonal_ok.any():
+        first = np.nanmean(y[:, :m], axis=1)
+        second = np.nanmean(y[:, m:2 * m], axis=1)
+        slope = (second - first) / m
+        # First-season deviations from the trend line through its mean;
+        # the level starts one step before the first observation
+        line = first[:, None] + (np.arange(m) - (m - 1) / 2) * slope[:, None]
+        season[seasonal_ok] = (y[:, :m] - line)[seasonal_ok]
+        level = np.where(seasonal_ok, first - (m + 1) / 2 * slope, level)
+        trend = np.where(seasonal_ok, slope, trend)
+
+    fitted = np.full_like(y, np.nan)
+    for t in range(n_steps):
+        live = t < panel.lengths
+        phase = t % m
+        s = season[:, phase]
+        new_level = alpha * (y[:, t] - s) + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        new_season = np.where(seasonal_ok, gamma * (y[:, t] - new_level) + (1 - gamma) * s, 0.0)
+        level = np.where(live, new_level, level)
+        trend = np.where(live, new_trend, trend)
+        season[:, phase] = np.where(live, new_season, s)
+        next_phase = (t + 1) % m
+        fitted[:, t] = np.where(live, level + trend + season[:, next_phase], np.nan)
+
+    def path(h):
+        phase = (panel.lengths - 1 + h) % m
+        return level + h * trend + season[rows, phase]
+
+    return fitted, path
+
+
+FITTERS = {
+    "rolling_mean": _rolling_mean,
+    "ewma": _ewma,
+    "holt_winters": _holt_winters,
+}
+
+
+def fit_model(panel, model="rolling_mean", **params):
+    """Fit one model to every series; params override the module defaults."""
+    if model not in FITTERS:
+        raise ValueError(f"Unknown model '{model}', expected one of {', '.join(MODELS)}")
+    fitted, path = FITTERS[model](panel, **params)
+
+    # In-sample one-step-ahead errors: y[t + 1] - forecast made at t
+    errors = panel.values[:, 1:] - fitted[:, :-1]
+    count = np.sum(~np.isnan(errors), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma = np.sqrt(np.nansum(errors ** 2, axis=1) / np.maximum(count, 1))
+    sigma[count == 0] = np.nan
+    return Fit(model, panel, fitted, sigma, path)
+
+
+def interval(fit, h, level=0.95):
+    """
+    (forecast, lower, upper) h steps ahead. The band is +/- z * sigma * sqrt(h),
+    an approximation that widens with the horizon; demand is never negative.
+    """
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    point = fit.path(h)
+    half = z * fit.sigma * np.sqrt(h)
+    point = np.maximum(point, 0)
+    return point, np.maximum(point - half, 0), point + half
+
+
+def forecast(panel, model="rolling_mean", horizons=3, level=0.95, **params):
+    """Long frame: keys, model, horizon, date, forecast, lower, upper."""
+    fit = fit_model(panel, model, **params)
+    frames = []
+    for h in range(1, horizons + 1):
+        point, lower, upper = interval(fit, h, level)
+        frame = panel.keys.copy()
+        frame["model"] = model
+        frame["horizon"] = h
+        frame["date"] = (panel.last_time + pd.offsets.MonthEnd(h)).to_numpy()
+        frame["forecast"] = point
+        frame["lower"] = lower
+        frame["upper"] = upper
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
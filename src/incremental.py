@@ -0,0 +1,209 @@
+"""
+Incremental ingest of new raw shards.
+
+Instead of re-running every stage over the whole history, new shards are
+aggregated on their own and folded into the stored monthly tables, and only
+what depends on the (state, district, month) keys they touch is recomputed:
+
+    monthly tables   touched keys (summed into the stored partitions), with
+                     district names mapped through the stored district_spellings
+                     of the full build; the new shards' bad rows are appended
+                     to quarantine, zero_enrolment is re-checked for the keys
+    LFI / UDR        touched keys
+    forecasts        touched districts, from their first touched month on
+    admin dashboard  touched districts (their latest forecast may change)
+    rollup cube      base rows of touched districts from their first touched
+                     month on; dated rollups are re-summed for those months,
+                     the others get the change of the base rows added
+
+Tables are updated with store.upsert, which rewrites only the month
+partitions the new rows fall in. Run through the pipeline:
+
+    python -m src.pipeline --incremental
+"""
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from src import cube, store
+
+preprocess = importlib.import_module("src.02_preprocess")
+lfi_stage = importlib.import_module("src.03_compute_lfi")
+udr_stage = importlib.import_module("src.05_compute_udr")
+forecast_stage = importlib.import_module("src.06_forecast_demand")
+admin_stage = importlib.import_module("src.07_admin_master_dataset")
+
+KEYS = ['state', 'district', 'date']
+DISTRICT = ['state', 'district']
+MONTHLY = {"enrol": "enrol_monthly", "demo": "demo_monthly", "bio": "bio_monthly"}
+
+
+def dataset_of(path, patterns):
+    for dataset, pattern in patterns.items():
+        if fnmatch(path.name, pattern):
+            return dataset
+    raise ValueError(f"{path.name} does not match any raw shard pattern")
+
+
+def _plain(frame):
+    """Keys as plain strings / timestamps so frames from different sources align."""
+    return frame.assign(
+        state=frame['state'].astype(str),
+        district=frame['district'].astype(str),
+        date=pd.to_datetime(frame['date']),
+    )
+
+
+def _months(keys):
+    return sorted(set(keys['date'].dt.strftime("%Y-%m")))
+
+
+def _only(frame, keys, on):
+    return _plain(frame).merge(keys[on].drop_duplicates(), on=on, how='inner')
+
+
+def _district_rows(name, districts):
+    """Rows of a table for the given (state, district) pairs."""
+    expr = (ds.field('state').isin(sorted(districts['state'].unique())) &
+            ds.field('district').isin(sorted(districts['district'].unique())))
+    return _only(store.read_table(name, filter=expr), districts, DISTRICT)
+
+
+def fold_monthly(paths, patterns):
+    """Add the new shards' monthly sums to the monthly tables; returns the touched keys."""
+    with ProcessPoolExecutor(max_workers=max(1, min(preprocess.INGEST_WORKERS, len(paths)))) as pool:
+        datasets = [dataset_of(path, patterns) for path in paths]
+        results = list(pool.map(preprocess.aggregate_shard, paths, datasets))
+
+    partials = {name: [] for name in MONTHLY}
+    quarantined = []
+    for dataset, (partial, bad) in zip(datasets, results):
+        if partial is not None:
+            partials[dataset].append(partial)
+        if bad is not None:
+            quarantined.append(bad)
+
+    folded = {dataset: preprocess.fold(parts).reset_index() for dataset, parts in partials.items() if parts}
+    spellings = extend_spellings(folded.values()) if folded else None
+
+    touched = []
+    for dataset, frame in folded.items():
+        delta = _plain(preprocess.monthly(frame, spellings))
+        stored = _plain(store.read_table(MONTHLY[dataset], months=_months(delta)))
+        combined = pd.concat([stored, delta]).groupby(KEYS, as_index=False).sum()
+        store.upsert(combined.merge(delta[KEYS], on=KEYS), MONTHLY[dataset], KEYS)
+        touched.append(delta[KEYS])
+    touched = pd.concat(touched).drop_duplicates() if touched else pd.DataFrame(columns=KEYS)
+    update_quarantine(quarantined, touched)
+    return touched
+
+
+def extend_spellings(folded):
+    """
+    The stored district spellings of the full build, plus spellings for
+    districts the new shards bring in for the first time. Known districts keep
+    their stored spelling, so new rows land on the same keys as their history.
+    """
+    stored = store.read_table('district_spellings')
+    new = preprocess.spellings_of(folded)[stored.columns]
+    known = pd.MultiIndex.from_arrays([stored['state'].astype(str), stored['district_key'].astype(str)])
+    added = new[~pd.MultiIndex.from_arrays([new['state'].astype(str), new['district_key'].astype(str)]).isin(known)]
+    if added.empty:
+        return stored
+    spellings = pd.concat([stored.astype({'state': str, 'district': str}), added], ignore_index=True)
+    store.write_table(spellings, 'district_spellings')
+    return spellings
+
+
+def update_quarantine(quarantined, touched):
+    """Append the new shards' bad rows and re-check zero enrolments for the touched keys."""
+    if quarantined:
+        store.append(preprocess.quarantine_table(quarantined), 'quarantine')
+    if len(touched):
+        months = _months(touched)
+        monthly = [_only(store.read_table(table, months=months), touched, KEYS) for table in MONTHLY.values()]
+        zero = preprocess.validate.zero_enrolments(*monthly)
+        # Touched keys that have enrolments now leave the table
+        store.upsert(zero, 'zero_enrolment', KEYS, delete=touched)
+
+
+def _add(stored, change, dims):
+    """A rollup with the rolled-up change of its base rows added."""
+    measures = list(cube.measures_of(dims))
+    if not dims:
+        return pd.DataFrame({m: [stored[m].sum() + change[m].sum()] for m in measures})
+    both = pd.concat([stored.astype({d: str for d in dims}), change], ignore_index=True)
+    return both.groupby(list(dims), as_index=False, sort=True)[measures].sum()
+
+
+def refresh(touched):
+    """Recompute every derived table for the touched keys."""
+    months = _months(touched)
+    monthly = {name: _only(store.read_table(table, months=months), touched, KEYS)
+               for name, table in MONTHLY.items()}
+
+    # LFI / UDR rows are per (state, district, month)
+    enrol_updates = preprocess.merge_updates(
+        monthly['enrol'], monthly['demo'], monthly['bio'])['enrol_updates']
+    store.upsert(lfi_stage.run(enrol_updates)['lifecycle_friction_index'],
+                 'lifecycle_friction_index', KEYS)
+    store.upsert(udr_stage.run(enrol_updates)['update_dependency_ratio'],
+                 'update_dependency_ratio', KEYS)
+
+    # Forecasts look back over each district's history; earlier months are unchanged
+    districts = touched[DISTRICT].drop_duplicates()
+    forecasts = forecast_stage.run(_district_rows('demo_monthly', districts),
+                                   _district_rows('bio_monthly', districts))
+    first = touched.groupby(DISTRICT, as_index=False)['date'].min().rename(columns={'date': 'first'})
+    actions = _plain(forecasts['demand_forecast_actions']).merge(first, on=DISTRICT)
+    store.upsert(actions[actions['date'] >= actions['first']].drop(columns='first'),
+                 'demand_forecast_actions', KEYS)
+
+    # Horizons start after each district's last month, so its old rows are replaced
+    horizon_keys = KEYS + ['model', 'horizon']
+    store.upsert(_plain(forecasts['demand_forecast_horizons']), 'demand_forecast_horizons', horizon_keys,
+                 delete=_district_rows('demand_forecast_horizons', districts)[horizon_keys])
+
+    # Admin rows take the district's latest forecast, so all of its months change
+    admin = admin_stage.run(
+        _district_rows('lifecycle_friction_index', districts),
+        _district_rows('update_dependency_ratio', districts),
+        _district_rows('demand_forecast_actions', districts),
+    )['admin_decision_dashboard']
+    store.upsert(admin, 'admin_decision_dashboard', KEYS)
+
+    # Cube rows follow the monthly tables and forecasts of the same districts
+    dims = list(cube.DIMENSIONS)
+    base = _plain(cube.base_cube(
+        *(_district_rows(table, districts) for table in MONTHLY.values()),
+        _district_rows('demand_forecast_actions', districts),
+    )).merge(first, on=DISTRICT)
+    base = base[base['date'] >= base['first']].drop(columns='first')
+    base_name = cube.table_name(cube.ROLLUPS[0])
+    months = _months(base)
+    old = _plain(store.read_table(base_name, months=months)).astype({'age_group': str})
+    old = old.merge(base[dims], on=dims, how='inner')
+    change = pd.concat([base, old.assign(**{m: -old[m] for m in cube.MEASURES})], ignore_index=True)
+    change = change.groupby(dims, as_index=False)[list(cube.MEASURES)].sum()
+    store.upsert(base, base_name, dims)
+
+    # Dated rollups are re-summed for the touched months, the rest add the change
+    touched_base = _plain(store.read_table(base_name, months=months))
+    for rollup_dims in cube.ROLLUPS[1:]:
+        name = cube.table_name(rollup_dims)
+        if 'date' in rollup_dims:
+            store.upsert(cube.rollup(touched_base, rollup_dims), name, list(rollup_dims))
+        else:
+            store.write_table(_add(store.read_table(name), cube.rollup(change, rollup_dims), rollup_dims), name)
+
+
+def apply(paths, patterns):
+    touched = fold_monthly(paths, patterns)
+    if not touched.empty:
+        refresh(touched)
+    print(f"Incremental ingest: {len(paths)} shard(s), {len(touched)} (state, district, month) keys, "
+          f"{len(touched[DISTRICT].drop_duplicates())} district(s) refreshed")
+    return touched
@@ -0,0 +1,217 @@
+"""
+Run manifests: what every pipeline stage cost and produced.
+
+The runner measures each stage (wall and CPU time, peak RSS, input/output
+row counts, output sizes on disk and in memory) and stages report their joins through
+record_join(), so a fan-out shows up as a ratio above 1. Each run is written
+to output/manifests/<run id>.json and copied to output/run_manifest.json.
+
+    python -m src.manifest diff                  # each stage's last two executed runs
+    python -m src.manifest diff OLD.json NEW.json
+"""
+import argparse
+import json
+import resource
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src import schema, store
+
+MANIFEST_DIR = store.OUTPUT_DIR / "manifests"
+LATEST = store.OUTPUT_DIR / "run_manifest.json"
+
+# Seconds between RSS samples while a stage runs
+SAMPLE_INTERVAL = 0.01
+
+# Joins reported by the stage currently running
+_joins = []
+
+
+def record_join(name, left, right, merged):
+    _joins.append({
+        "join": name,
+        "left_rows": len(left),
+        "right_rows": len(right),
+        "output_rows": len(merged),
+        "fan_out": round(len(merged) / len(left), 4) if len(left) else None,
+    })
+
+
+def current_rss():
+    """Resident set size of this process in bytes (Linux), else its peak so far."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_seconds():
+    return sum(u.ru_utime + u.ru_stime for u in (resource.getrusage(resource.RUSAGE_SELF),
+                                                resource.getrusage(resource.RUSAGE_CHILDREN)))
+
+
+class StageMeter:
+    """Times a block and tracks the highest RSS seen while it runs."""
+
+    def __enter__(self):
+        _joins.clear()
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self.wall = time.perf_counter()
+        self.cpu = _cpu_seconds()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            self.peak = max(self.peak, current_rss())
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = _cpu_seconds() - self.cpu
+        self._stop.set()
+        self._sampler.join()
+        self.peak = max(self.peak, current_rss())
+        # Highest peak of any worker process so far (e.g. the preprocess pool)
+        self.children_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+        self.joins = list(_joins)
+        return False
+
+    def metrics(self):
+        return {
+            "wall_seconds": round(self.wall, 4),
+            "cpu_seconds": round(self.cpu, 4),
+            "peak_rss_mb": round(self.peak / 2**20, 1),
+            "children_peak_rss_mb": round(self.children_peak / 2**20, 1),
+            "joins": self.joins,
+        }
+
+
+def output_bytes(name, csv_path=None):
+    sizes = {}
+    if store.has_table(name):
+        sizes["store"] = sum(p.stat().st_size for p in store.table_dir(name).rglob("*") if p.is_file())
+    if csv_path is not None and Path(csv_path).exists():
+        sizes["csv"] = Path(csv_path).stat().st_size
+    return sizes
+
+
+class RunManifest:
+    def __init__(self, targets=None, force=False):
+        started = datetime.now(timezone.utc)
+        self.data = {
+            "run_id": started.strftime("%Y%m%dT%H%M%S%fZ"),
+            "started_at": started.isoformat(),
+            "targets": list(targets or []),
+            "force": force,
+            "low_memory": schema.LOW_MEMORY,
+            "stages": {},
+        }
+
+    def stage(self, name, **entry):
+        self.data["stages"][name] = entry
+        self.save()
+
+    def save(self):
+        MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+        text = json.dumps(self.data, indent=2)
+        (MANIFEST_DIR / f"{self.data['run_id']}.json").write_text(text, encoding="utf-8")
+        LATEST.write_text(text, encoding="utf-8")
+
+
+# -----------------------------
+# Diff
+# -----------------------------
+METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb")
+
+
+def _rows(entry, kind):
+    return entry.get(kind, {}) or {}
+
+
+def diff(old, new):
+    """Lines describing how each stage changed between two manifests."""
+    lines = [f"{old['run_id']} -> {new['run_id']}"]
+    for name in dict.fromkeys([*old["stages"], *new["stages"]]):
+        before, after = old["stages"].get(name), new["stages"].get(name)
+        if before is None or after is None:
+            lines.append(f"[{name}] only in {'new' if before is None else 'old'} run")
+            continue
+        lines.append(f"[{name}] {before.get('status')} -> {after.get('status')}")
+        if "ran" in (before.get("status"), after.get("status")):
+            lines += _changes(before, after)
+    return lines
+
+
+def _changes(before, after):
+    """Lines for the metrics, row counts and joins that changed in one stage."""
+    lines = []
+    for metric in METRICS:
+        a, b = before.get(metric), after.get(metric)
+        if a is not None and b is not None:
+            change = f" ({(b / a - 1) * 100:+.1f}%)" if a else ""
+            lines.append(f"    {metric:<16} {a:>12} -> {b:<12}{change}")
+    for kind in ("input_rows", "output_rows"):
+        for table in dict.fromkeys([*_rows(before, kind), *_rows(after, kind)]):
+            a, b = _rows(before, kind).get(table), _rows(after, kind).get(table)
+            if a != b and None not in (a, b):
+                lines.append(f"    {kind[:-5]} {table:<28} {a} -> {b} rows")
+    for table in dict.fromkeys([*_rows(before, "memory_bytes"), *_rows(after, "memory_bytes")]):
+        a, b = _rows(before, "memory_bytes").get(table), _rows(after, "memory_bytes").get(table)
+        if a != b and None not in (a, b):
+            lines.append(f"    memory {table:<27} {a} -> {b} bytes")
+    old_joins = {j["join"]: j for j in before.get("joins", [])}
+    for join in after.get("joins", []):
+        was = old_joins.get(join["join"], {}).get("fan_out")
+        flag = "  <-- FAN-OUT" if join["fan_out"] and join["fan_out"] > 1 else ""
+        if was != join["fan_out"] or flag:
+            lines.append(f"    join {join['join']:<27} fan-out {was} -> {join['fan_out']}{flag}")
+    return lines
+
+
+def diff_executed(manifests):
+    """Per stage, compare the two latest of the manifests (oldest first) in which it ran."""
+    lines = []
+    names = dict.fromkeys(name for m in reversed(manifests) for name in m["stages"])
+    for name in names:
+        runs = [m for m in manifests if m["stages"].get(name, {}).get("status") == "ran"]
+        if len(runs) < 2:
+            when = f"only in {runs[0]['run_id']}" if runs else "in none of them"
+            lines.append(f"[{name}] no earlier executed run to compare (ran {when})")
+            continue
+        old, new = runs[-2], runs[-1]
+        lines.append(f"[{name}] ran {old['run_id']} -> {new['run_id']}")
+        lines += _changes(old["stages"][name], new["stages"][name])
+    return lines
+
+
+def load(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline run manifests")
+    sub = parser.add_subparsers(dest="command", required=True)
+    diff_parser = sub.add_parser("diff", help="compare two runs (default: the last two that ran each stage)")
+    diff_parser.add_argument("old", nargs="?")
+    diff_parser.add_argument("new", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.old and args.new:
+        old, new = load(args.old), load(args.new)
+        print("\n".join(diff(old, new)))
+        return
+    runs = sorted(MANIFEST_DIR.glob("*.json"))
+    if len(runs) < 2:
+        parser.error(f"need two runs in {MANIFEST_DIR}, or pass two manifest files")
+    # Cached stages have nothing to compare, so each stage is compared
+    # across the last two runs that executed it
+    print("\n".join(diff_executed([load(path) for path in runs])))
+
+
+if __name__ == "__main__":
+    main()
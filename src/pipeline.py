@@ -0,0 +1,327 @@
+"""
+Single entry point for the analytics pipeline.
+
+Every src/0N_*.py script from 02 on is a stage with declared upstream stages. Frames are
+handed from stage to stage in memory, and a stage is skipped when the content
+hash of its inputs (raw files, upstream results and its own source) matches
+the previous run.
+
+Run from the repository root:
+    python -m src.pipeline              # run every stage that is out of date
+    python -m src.pipeline admin        # run one stage and whatever it needs
+    python -m src.pipeline --force      # ignore the cache
+    python -m src.pipeline --csv        # also export tables as output/*.csv
+    python -m src.pipeline --incremental  # fold new raw shards into the stored tables
+
+Persisted outputs go to the columnar store (src/store.py); every run writes a
+manifest of per-stage timings, memory and row counts (src/manifest.py).
+With AADHAAR_LOW_MEMORY=1 the frames handed between stages use the compact
+dtypes of src/schema.py.
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from src import cube, rules, schema, store
+from src.manifest import RunManifest, StageMeter, output_bytes
+
+REPO = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(os.environ.get("AADHAAR_DATA_DIR", REPO / "data"))
+OUTPUT_DIR = store.OUTPUT_DIR
+STATE_FILE = OUTPUT_DIR / ".pipeline_state.json"
+
+# Raw UIDAI dumps arrive as shards: api_data_aadhar_<dataset>_<start>_<end>.csv
+RAW_SHARDS = {
+    "enrol": "api_data_aadhar_enrolment_*.csv",
+    "demo": "api_data_aadhar_demographic_*.csv",
+    "bio": "api_data_aadhar_biometric_*.csv",
+}
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    module: str
+    func: str = "run"
+    deps: tuple = ()
+    raw: tuple = ()
+    outputs: tuple = ()
+    # False keeps the outputs in memory only (cheap derived frames)
+    persist: bool = True
+    # Scoring rules (src/rules.py) the stage applies; part of its cache key
+    rules: tuple = ()
+    # Other src/ modules the stage runs; their source is part of its cache key
+    uses: tuple = ()
+
+
+STAGES = [
+    Stage("preprocess", "02_preprocess",
+          raw=tuple(RAW_SHARDS.values()),
+          outputs=("enrol_monthly", "demo_monthly", "bio_monthly", "quarantine", "zero_enrolment",
+                   "district_spellings"),
+          uses=("01_load_data", "04_validate_output", "canonical")),
+    Stage("validate", "04_validate_output", deps=("preprocess",)),
+    Stage("monthly_totals", "02_preprocess", func="merge_updates",
+          deps=("preprocess",),
+          outputs=("enrol_updates",), persist=False),
+    Stage("lfi", "03_compute_lfi", deps=("monthly_totals",),
+          outputs=("lifecycle_friction_index",), rules=("lfi",)),
+    Stage("udr", "05_compute_udr", deps=("monthly_totals",),
+          outputs=("update_dependency_ratio",), rules=("udr",)),
+    Stage("forecast", "06_forecast_demand", deps=("preprocess",),
+          outputs=("demand_forecast_actions", "demand_forecast_horizons"), rules=("demand",),
+          uses=("forecasting",)),
+    Stage("admin", "07_admin_master_dataset", deps=("lfi", "udr", "forecast"),
+          outputs=("admin_decision_dashboard",)),
+    Stage("cube", "08_build_cube", deps=("preprocess", "forecast"),
+          outputs=cube.TABLES, uses=("cube", "canonical")),
+]
+
+STAGE_BY_NAME = {s.name: s for s in STAGES}
+
+# Helpers every stage goes through (dtypes, table storage, rule evaluation);
+# their source is part of every cache key
+SHARED = ("schema", "store", "rules")
+
+
+# -----------------------------
+# Content hashing
+# -----------------------------
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_digest(path, fingerprints):
+    """Content hash of a file, reusing the stored hash while size/mtime match."""
+    stat = path.stat()
+    key = str(path)
+    cached = fingerprints.get(key)
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["sha256"]
+    digest = _sha256_file(path)
+    fingerprints[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def raw_files(skip=()):
+    return [path for pattern in RAW_SHARDS.values()
+            for path in sorted(DATA_DIR.glob(pattern)) if str(path) not in skip]
+
+
+def stage_keys(fingerprints, skip=()):
+    """
+    Cache key per stage: its source and the shared helpers', rules, raw files
+    (minus `skip`) and its upstream keys.
+    """
+    keys = {}
+    scoring = rules.load_rules()
+    for stage in STAGES:
+        h = hashlib.sha256()
+        h.update(stage.func.encode())
+        for module in dict.fromkeys((*SHARED, stage.module, *stage.uses)):
+            h.update(file_digest(REPO / "src" / f"{module}.py", fingerprints).encode())
+        for name in stage.rules:
+            h.update(json.dumps(scoring[name], sort_keys=True).encode())
+        for pattern in stage.raw:
+            h.update(pattern.encode())
+            for path in sorted(DATA_DIR.glob(pattern)):
+                if str(path) in skip:
+                    continue
+                h.update(path.name.encode())
+                h.update(file_digest(path, fingerprints).encode())
+        for dep in stage.deps:
+            h.update(keys[dep].encode())
+        if stage.deps and schema.LOW_MEMORY:
+            # Stages fed compact (float32) frames can round differently
+            h.update(b"low-memory")
+        keys[stage.name] = h.hexdigest()
+    return keys
+
+
+def load_state():
+    if STATE_FILE.exists():
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    return {"stages": {}, "fingerprints": {}}
+
+
+def save_state(state):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    STATE_FILE.write_text(json.dumps(state, indent=2), encoding="utf-8")
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+class Runner:
+    def __init__(self, force=False, export_csv=False):
+        self.force = force
+        self.export_csv = export_csv
+        self.state = load_state()
+        self.keys = stage_keys(self.state["fingerprints"])
+        self.frames = {}
+        self.done = set()
+        self.manifest = RunManifest(force=force)
+
+    def is_fresh(self, stage):
+        if self.force or self.state["stages"].get(stage.name) != self.keys[stage.name]:
+            return False
+        return not stage.persist or all(store.has_table(name) for name in stage.outputs)
+
+    def frames_of(self, stage):
+        """Outputs of a stage: from memory, from disk when cached, or by running it."""
+        missing = [name for name in stage.outputs if name not in self.frames]
+        if missing:
+            if stage.name not in self.done and stage.persist and self.is_fresh(stage):
+                for name in missing:
+                    self.frames[name] = store.read_table(name)
+            else:
+                self.execute(stage)
+        return {name: self.frames[name] for name in stage.outputs}
+
+    def execute(self, stage):
+        inputs = {}
+        for dep in stage.deps:
+            inputs.update(self.frames_of(STAGE_BY_NAME[dep]))
+
+        module = importlib.import_module(f"src.{stage.module}")
+        func = getattr(module, stage.func)
+        wanted = inspect.signature(func).parameters
+        inputs = {k: v for k, v in inputs.items() if k in wanted}
+
+        try:
+            with StageMeter() as meter:
+                result = func(**inputs) or {}
+                for name in stage.outputs:
+                    if stage.persist:
+                        store.write_table(result[name], name)
+                        if self.export_csv:
+                            result[name].to_csv(OUTPUT_DIR / f"{name}.csv", index=False)
+                    self.frames[name] = schema.apply(result[name], name)
+        except Exception as e:
+            self.manifest.stage(stage.name, status="failed", error=f"{type(e).__name__}: {e}",
+                                **meter.metrics())
+            raise
+
+        self.manifest.stage(
+            stage.name, status="ran", **meter.metrics(),
+            input_rows={k: len(v) for k, v in inputs.items()},
+            output_rows={name: len(self.frames[name]) for name in stage.outputs},
+            memory_bytes={name: schema.memory_bytes(self.frames[name]) for name in stage.outputs},
+            output_bytes={name: output_bytes(name, OUTPUT_DIR / f"{name}.csv" if self.export_csv else None)
+                          for name in stage.outputs if stage.persist},
+        )
+        self.done.add(stage.name)
+        self.state["stages"][stage.name] = self.keys[stage.name]
+        if stage.raw:
+            # Raw shards the stored tables include, for --incremental
+            self.state["ingested"] = self.raw_digests()
+        save_state(self.state)
+        print(f"[{stage.name}] done")
+
+    def run(self, targets=None):
+        self.manifest.data["targets"] = list(targets or [])
+        wanted = upstream_of(targets) if targets else [s.name for s in STAGES]
+        for stage in STAGES:
+            if stage.name not in wanted or stage.name in self.done:
+                continue
+            if not stage.persist and stage.name not in (targets or ()):
+                # memory-only frames are produced on demand by the stages that need them
+                continue
+            if self.is_fresh(stage):
+                self.manifest.stage(stage.name, status="cached")
+                print(f"[{stage.name}] up to date, skipped")
+                continue
+            self.execute(stage)
+
+
+    def raw_digests(self):
+        return {str(path): file_digest(path, self.state["fingerprints"]) for path in raw_files()}
+
+    def run_incremental(self):
+        """Fold raw shards added since the last run into the stored tables."""
+        ingested = self.state.get("ingested")
+        if ingested is None or self.force:
+            print("No record of ingested shards; running the full pipeline")
+            return self.run()
+
+        current = self.raw_digests()
+        new = [path for path in current if path not in ingested]
+        if any(ingested.get(path, digest) != digest for path, digest in current.items()) \
+                or set(ingested) - set(current):
+            print("Existing shards changed or were removed; running the full pipeline")
+            return self.run()
+
+        # Everything except the new shards must match the last run
+        baseline = stage_keys(self.state["fingerprints"], skip=set(new))
+        stored = self.state["stages"]
+        if any(stored.get(s.name) != baseline[s.name] for s in STAGES if s.persist) or not all(
+                store.has_table(name) for s in STAGES if s.persist for name in s.outputs):
+            print("Code, rules or outputs changed since the last run; running the full pipeline")
+            return self.run()
+        if not new:
+            print("No new shards")
+            return
+
+        from src import incremental
+        with StageMeter() as meter:
+            incremental.apply([Path(p) for p in new], RAW_SHARDS)
+        self.manifest.stage("incremental", status="ran", shards=new, **meter.metrics())
+
+        for stage in STAGES:
+            stored[stage.name] = self.keys[stage.name]
+        self.state["ingested"] = current
+        save_state(self.state)
+        if self.export_csv:
+            for name in (name for s in STAGES if s.persist for name in s.outputs):
+                store.export_csv(name)
+
+
+def upstream_of(targets):
+    seen = []
+
+    def visit(name):
+        if name in seen:
+            return
+        for dep in STAGE_BY_NAME[name].deps:
+            visit(dep)
+        seen.append(name)
+
+    for name in targets:
+        visit(name)
+    return seen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Aadhaar analytics pipeline")
+    parser.add_argument("targets", nargs="*", metavar="stage",
+                        help="stages to bring up to date (default: all); one of "
+                             + ", ".join(STAGE_BY_NAME))
+    parser.add_argument("--force", action="store_true", help="re-run stages even if cached")
+    parser.add_argument("--csv", action="store_true",
+                        help="also export every table written to output/<table>.csv")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fold raw shards added since the last run into the stored tables")
+    args = parser.parse_args(argv)
+    unknown = [t for t in args.targets if t not in STAGE_BY_NAME]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    if args.incremental and args.targets:
+        parser.error("--incremental updates every table; it takes no stage names")
+    runner = Runner(force=args.force, export_csv=args.csv)
+    if args.incremental:
+        runner.run_incremental()
+    else:
+        runner.run(args.targets)
+
+
+if __name__ == "__main__":
+    main()
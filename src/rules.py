@@ -0,0 +1,142 @@
+"""
+Scoring rules shared by the pipeline and the backend.
+
+Every weight, threshold and label used to grade districts is declared once in
+RULES, and each rule is applied to a whole column in one vectorized pass:
+
+    rules.level(scores, RULES["lfi"])          # -> 'Low' / 'Medium' / 'High'
+    rules.action(levels, RULES["demand"])      # -> recommended action per row
+
+A rule's `bands` are (operator, threshold) pairs in increasing order; a value's
+level is the number of bands it passes, so with [(">=", 0.01), (">", 0.03)]
+0.01 is already Medium and 0.03 is still Medium. Values that pass none
+(including NaN) get the first label.
+
+AADHAAR_RULES_FILE may point to a JSON file with the same shape; its entries
+replace the defaults key by key (e.g. {"udr": {"bands": [[">=", 0.4], [">", 1.2]]}}).
+"""
+import copy
+import json
+import os
+
+import numpy as np
+
+RULES = {
+    # Lifecycle Friction Index: weighted update pressure (updates per enrolment)
+    "lfi": {
+        "weights": {"bio_pressure": 0.6, "demo_pressure": 0.4},
+        "bands": [(">=", 0.01), (">", 0.03)],
+        "labels": ["Low", "Medium", "High"],
+    },
+    # Update Dependency Ratio: (demographic + biometric updates) / enrolments
+    "udr": {
+        "bands": [(">=", 0.5), (">", 1.5)],
+        "labels": ["Low Dependency", "Medium Dependency", "High Dependency"],
+    },
+    # Next-month demand forecast (updates per district)
+    "demand": {
+        "bands": [(">=", 500), (">", 2000)],
+        "labels": ["Low Demand", "Medium Demand", "High Demand"],
+        "actions": ["No action required", "Extend working hours",
+                    "Deploy mobile Aadhaar van / add staff"],
+    },
+    # A state's mean district demand level on the map (1 = first demand label,
+    # 2 = second, ...)
+    "state_demand": {
+        "bands": [(">", 1.6), (">", 2.3)],
+        "labels": ["Low Demand", "Medium Demand", "High Demand"],
+    },
+    # Updates per (state, age group) in /friction-age-analysis
+    "friction_age": {
+        "bands": [(">", 10000), (">", 50000)],
+        "labels": ["Low", "Medium", "High"],
+    },
+}
+
+OPERATORS = {">": np.greater, ">=": np.greater_equal}
+
+
+def load_rules(path=None, base=RULES):
+    """Default rules, with overrides from a JSON file (or AADHAAR_RULES_FILE)."""
+    rules = copy.deepcopy(base)
+    path = path or os.environ.get("AADHAAR_RULES_FILE")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        merge(rules, overrides)
+    return rules
+
+
+def merge(rules, overrides):
+    """Apply {rule: {key: value}} overrides in place, validating them."""
+    for name, changes in overrides.items():
+        if name not in rules:
+            raise ValueError(f"Unknown rule '{name}'")
+        if not isinstance(changes, dict):
+            raise ValueError(f"'{name}': expected an object of settings")
+        unknown = set(changes) - set(rules[name])
+        if unknown:
+            raise ValueError(f"Unknown setting(s) for '{name}': {', '.join(sorted(unknown))}")
+        # Weights name the columns they apply to, so only known ones can be re-weighted
+        weights = changes.get("weights", {})
+        if not isinstance(weights, dict):
+            raise ValueError(f"'{name}': weights must be an object of column: weight")
+        unknown = set(weights) - set(rules[name].get("weights", {}))
+        if unknown:
+            raise ValueError(f"'{name}': unknown weight(s) {', '.join(sorted(unknown))}; "
+                             f"expected {', '.join(rules[name]['weights'])}")
+        rules[name].update(changes)
+        validate(name, rules[name])
+    return rules
+
+
+def validate(name, rule):
+    bands, labels = rule["bands"], rule["labels"]
+    if not isinstance(labels, (list, tuple)) or not all(isinstance(label, str) for label in labels):
+        raise ValueError(f"'{name}': labels must be a list of strings")
+    if not isinstance(bands, (list, tuple)) or not all(
+            isinstance(band, (list, tuple)) and len(band) == 2 for band in bands):
+        raise ValueError(f"'{name}': bands must be a list of [operator, threshold] pairs")
+    if len(bands) != len(labels) - 1:
+        raise ValueError(f"'{name}' needs one band fewer than labels")
+    for op, threshold in bands:
+        if op not in OPERATORS:
+            raise ValueError(f"'{name}': unknown operator '{op}'")
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+            raise ValueError(f"'{name}': thresholds must be numbers")
+    thresholds = [float(t) for _, t in bands]
+    if thresholds != sorted(thresholds):
+        raise ValueError(f"'{name}': thresholds must be increasing")
+    if "actions" in rule and len(rule["actions"]) != len(labels):
+        raise ValueError(f"'{name}' needs one action per label")
+    if "weights" in rule and not all(isinstance(w, (int, float)) for w in rule["weights"].values()):
+        raise ValueError(f"'{name}': weights must be numbers")
+
+
+def weighted(columns, rule):
+    """Weighted sum of the columns named in rule['weights']."""
+    return sum(weight * np.asarray(columns[column], dtype=float)
+               for column, weight in rule["weights"].items())
+
+
+def level_codes(values, rule):
+    """Band index per value (0 = first label)."""
+    values = np.asarray(values, dtype=float)
+    codes = np.zeros(values.shape, dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        for op, threshold in rule["bands"]:
+            codes += OPERATORS[op](values, threshold)
+    return codes
+
+
+def level(values, rule):
+    return np.asarray(rule["labels"], dtype=object)[level_codes(values, rule)]
+
+
+def action(levels, rule):
+    """Action per level label; unknown labels get the first action."""
+    lookup = dict(zip(rule["labels"], rule["actions"]))
+    levels = np.asarray(levels, dtype=object)
+    labels, codes = np.unique(levels.astype(str), return_inverse=True)
+    actions = np.asarray([lookup.get(label, rule["actions"][0]) for label in labels], dtype=object)
+    return actions[codes.reshape(levels.shape)]
@@ -0,0 +1,128 @@
+"""
+Schema registry: the in-memory dtype of every column of the pipeline tables.
+
+By default frames keep pandas' inferred types (int64 counts, float64 scores,
+object strings). With AADHAAR_LOW_MEMORY=1 every table is compacted as it is
+ingested, handed from stage to stage, read from the store and loaded by the
+backend:
+
+    category   repeated strings (state, district, labels) as categorical codes
+    int        counts as the smallest integer type that holds them
+    float32    ratios, scores and forecasts
+    date       parsed datetime64
+
+The store always gets full-width types back (widen), so both modes read and
+upsert the same Parquet schema. Columns missing from the registry are left
+alone. `python -m src.schema` prints the in-memory bytes of every stored
+table with the default and the compact dtypes.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import cube
+
+LOW_MEMORY = os.environ.get("AADHAAR_LOW_MEMORY", "0") == "1"
+
+CATEGORY, INT, FLOAT32, DATE = "category", "int", "float32", "date"
+
+KEYS = {"state": CATEGORY, "district": CATEGORY, "date": DATE}
+LABELS = ("friction_level", "Lifecycle_Friction", "udr_level",
+          "forecast_level", "Next_Month_Demand", "recommended_action")
+
+TABLES = {
+    "enrol_monthly": {**KEYS, "pincode": INT, "age_0_5": INT, "age_5_17": INT, "age_18_greater": INT},
+    "demo_monthly": {**KEYS, "pincode": INT, "demo_age_5_17": INT, "demo_age_17_": INT},
+    "bio_monthly": {**KEYS, "pincode": INT, "bio_age_5_17": INT, "bio_age_17_": INT},
+    "quarantine": {"dataset": CATEGORY, "shard": CATEGORY, "line": INT, "reason": CATEGORY,
+                   "state": CATEGORY, "district": CATEGORY},
+    "zero_enrolment": KEYS,
+    "district_spellings": {"state": CATEGORY, "district": CATEGORY},
+    "lifecycle_friction_index": {**KEYS, "bio_pressure": FLOAT32, "demo_pressure": FLOAT32,
+                                 "lifecycle_friction_score": FLOAT32, "friction_level": CATEGORY},
+    "update_dependency_ratio": {**KEYS, "udr": FLOAT32, "udr_level": CATEGORY},
+    "demand_forecast_actions": {**KEYS, "forecast_next_month": FLOAT32,
+                                "forecast_level": CATEGORY, "recommended_action": CATEGORY},
+    "demand_forecast_horizons": {**KEYS, "model": CATEGORY, "horizon": INT,
+                                 "forecast": FLOAT32, "lower": FLOAT32, "upper": FLOAT32},
+    "admin_decision_dashboard": {**KEYS, "bio_pressure": FLOAT32, "demo_pressure": FLOAT32,
+                                 "lifecycle_friction_score": FLOAT32, "udr": FLOAT32,
+                                 "forecast_next_month": FLOAT32,
+                                 **{label: CATEGORY for label in LABELS}},
+}
+# Memory-only frame shared by the LFI and UDR stages
+TABLES["enrol_updates"] = {**TABLES["enrol_monthly"],
+                           "demo_total": INT, "bio_total": INT, "total_enrolment": INT}
+for _dims in cube.ROLLUPS:
+    TABLES[cube.table_name(_dims)] = {
+        **{dim: KEYS.get(dim, CATEGORY) for dim in _dims},
+        **{m: FLOAT32 if m == "forecast" else INT for m in cube.measures_of(_dims)},
+    }
+
+
+def _int(column):
+    if not pd.api.types.is_integer_dtype(column.dtype):
+        return column
+    # Signed, so differences and sums of counts never wrap around
+    return pd.to_numeric(column, downcast="integer")
+
+
+def _convert(column, kind):
+    if kind == CATEGORY:
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return column.cat.remove_unused_categories()
+        return column.astype("category")
+    if kind == INT:
+        return _int(column)
+    if kind == FLOAT32:
+        return column.astype(np.float32) if pd.api.types.is_numeric_dtype(column.dtype) else column
+    if kind == DATE:
+        return column if pd.api.types.is_datetime64_any_dtype(column.dtype) else pd.to_datetime(column)
+    raise ValueError(f"Unknown column kind: {kind}")
+
+
+def compact(frame, name):
+    """The frame with its registered columns converted to their compact types."""
+    columns = TABLES.get(name, {})
+    converted = {c: _convert(frame[c], kind) for c, kind in columns.items() if c in frame.columns}
+    return frame.assign(**converted) if converted else frame
+
+
+def apply(frame, name):
+    """compact() in low-memory mode, the frame unchanged otherwise."""
+    return compact(frame, name) if LOW_MEMORY else frame
+
+
+def widen(frame):
+    """Full-width numeric types for storage: int64 counts, float64 floats."""
+    converted = {}
+    for c in frame.columns:
+        dtype = frame[c].dtype
+        if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype) \
+                and dtype != np.int64:
+            converted[c] = frame[c].astype(np.int64)
+        elif dtype == np.float32:
+            # Through the shortest decimal form, so 0.1f is stored as 0.1
+            converted[c] = frame[c].astype(str).astype(np.float64)
+    return frame.assign(**converted) if converted else frame
+
+
+def memory_bytes(frame):
+    """Bytes held by a frame, strings included."""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+if __name__ == "__main__":
+    import src.schema
+    from src import store
+
+    # Read with the default dtypes whatever AADHAAR_LOW_MEMORY says
+    src.schema.LOW_MEMORY = False
+    print(f"{'table':<40}{'rows':>10}{'default':>14}{'compact':>14}")
+    for name in TABLES:
+        if not store.has_table(name):
+            continue
+        frame = store.read_table(name)
+        full, small = memory_bytes(frame), memory_bytes(compact(frame, name))
+        print(f"{name:<40}{len(frame):>10}{full:>14,}{small:>14,}")
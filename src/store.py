@@ -0,0 +1,318 @@
+"""
+Columnar intermediate store for pipeline outputs.
+
+Each table is a Parquet dataset under output/store/<table>/, partitioned by
+month (hive style, month=YYYY-MM) when it has a `date` column. Repeated
+strings such as state and district are dictionary-encoded, so readers get
+them back as pandas categoricals without re-parsing text.
+
+    write_table(frame, "enrol_monthly")
+    upsert(frame, "enrol_monthly", keys=["state", "district", "date"])
+    append(frame, "quarantine")
+    read_table("enrol_monthly", columns=["state", "age_0_5"], start="2025-06")
+
+CSV is only an export format (export_csv); tables that only exist as legacy
+output/<table>.csv are still readable.
+
+Tables are always stored with full-width types; read_table hands them back
+compacted when AADHAAR_LOW_MEMORY=1 (src/schema.py).
+"""
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src import schema
+
+OUTPUT_DIR = Path(os.environ.get(
+    "AADHAAR_OUTPUT_DIR", Path(__file__).resolve().parent.parent / "output"
+))
+STORE_DIR = OUTPUT_DIR / "store"
+
+PARTITION = "month"
+# Rows per record batch when streaming a table (scan_batches)
+BATCH_ROWS = 65_536
+PARTITIONING = ds.partitioning(pa.schema([(PARTITION, pa.string())]), flavor="hive")
+
+# Repeated string columns stored as dictionaries (state/district codes + label columns)
+DICTIONARY_COLUMNS = (
+    "state", "district", "age_group",
+    "friction_level", "Lifecycle_Friction", "udr_level",
+    "forecast_level", "Next_Month_Demand", "recommended_action",
+)
+
+
+def table_dir(name):
+    return STORE_DIR / name
+
+
+def has_table(name):
+    return table_dir(name).exists()
+
+
+def table_version(name):
+    """Cheap change marker for a table: mtime of its directory (or legacy CSV)."""
+    path = table_dir(name) if has_table(name) else OUTPUT_DIR / f"{name}.csv"
+    return path.stat().st_mtime_ns if path.exists() else None
+
+
+def _to_arrow(frame):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    for i, column in enumerate(table.column_names):
+        if column in DICTIONARY_COLUMNS and not pa.types.is_dictionary(table.schema.field(i).type):
+            table = table.set_column(i, column, table.column(i).cast(pa.string()).dictionary_encode())
+    return table
+
+
+def write_table(frame, name):
+    """Replace a table atomically (write to a temp dir, then swap it in)."""
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STORE_DIR / f".{name}.{uuid.uuid4().hex}"
+    partitioned = "date" in frame.columns
+    frame = schema.widen(frame)
+
+    if partitioned:
+        frame = frame.assign(**{PARTITION: pd.to_datetime(frame["date"]).dt.strftime("%Y-%m")})
+    table = _to_arrow(frame)
+    if table.num_rows:
+        ds.write_dataset(
+            table, tmp, format="parquet",
+            partitioning=PARTITIONING if partitioned else None,
+            basename_template="part-{i}.parquet",
+        )
+    else:
+        # write_dataset writes nothing for no rows; keep the schema in one empty file
+        tmp.mkdir()
+        pq.write_table(table.drop_columns([PARTITION]) if partitioned else table, tmp / "part-0.parquet")
+
+    target = table_dir(name)
+    old = None
+    if target.exists():
+        old = STORE_DIR / f".{name}.old.{uuid.uuid4().hex}"
+        target.rename(old)
+    tmp.rename(target)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def upsert(frame, name, keys, delete=None):
+    """
+    Insert or replace rows by `keys`, and drop the rows whose keys are in
+    `delete`, rewriting only the month partitions those rows fall in (the
+    whole table if it is not partitioned). Each touched partition is swapped
+    in with a rename.
+    """
+    if not has_table(name):
+        return write_table(frame, name)
+    delete = frame.iloc[:0] if delete is None else delete
+    if frame.empty and delete.empty:
+        return
+
+    dataset = ds.dataset(table_dir(name), format="parquet", partitioning=PARTITIONING)
+    # Tables with a date column are written partitioned by month (write_table)
+    partitioned = "date" in dataset.schema.names
+    months = None
+    if partitioned:
+        dates = pd.concat([pd.to_datetime(frame["date"]), pd.to_datetime(delete["date"])])
+        months = sorted(set(dates.dt.strftime("%Y-%m")))
+    old = read_table(name, months=months)
+
+    # Drop the old versions of the incoming rows (and deleted rows), then append the new ones
+    key = lambda f: pd.MultiIndex.from_frame(f[keys].astype(str))
+    kept = old[~key(old).isin(key(frame)) & ~key(old).isin(key(delete))]
+    merged = schema.widen(pd.concat([kept, frame[old.columns]], ignore_index=True))
+    if not partitioned:
+        return write_table(merged, name)
+
+    stored = pa.schema([f for f in dataset.schema if f.name != PARTITION])
+    merged = merged.assign(**{PARTITION: pd.to_datetime(merged["date"]).dt.strftime("%Y-%m")})
+    table = _to_arrow(merged.drop(columns=PARTITION)).cast(stored)
+    table = table.append_column(PARTITION, pa.array(merged[PARTITION].to_numpy(), pa.string()))
+
+    tmp = STORE_DIR / f".{name}.{uuid.uuid4().hex}"
+    ds.write_dataset(table, tmp, format="parquet", partitioning=PARTITIONING,
+                     basename_template="part-{i}.parquet")
+    written = {part.name for part in tmp.iterdir()} if tmp.exists() else set()
+    for part in sorted(tmp.iterdir() if tmp.exists() else ()):
+        _swap(part, table_dir(name) / part.name, name)
+    # Months left with no rows at all
+    for month in months:
+        target = table_dir(name) / f"{PARTITION}={month}"
+        if target.name not in written and target.exists():
+            _swap(None, target, name)
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _swap(part, target, name):
+    """Put `part` in place of `target` (or just remove `target` if part is None)."""
+    old_part = None
+    if target.exists():
+        old_part = STORE_DIR / f".{name}.old.{uuid.uuid4().hex}"
+        target.rename(old_part)
+    if part is not None:
+        part.rename(target)
+    if old_part is not None:
+        shutil.rmtree(old_part, ignore_errors=True)
+
+
+def append(frame, name):
+    """
+    Add rows to a table without touching the rows already stored: the new
+    rows go to new Parquet files next to the existing ones.
+    """
+    if not has_table(name):
+        return write_table(frame, name)
+    if frame.empty:
+        return
+
+    dataset = ds.dataset(table_dir(name), format="parquet", partitioning=PARTITIONING)
+    partitioned = "date" in dataset.schema.names
+    stored = pa.schema([f for f in dataset.schema if f.name != PARTITION])
+    frame = schema.widen(frame)
+    table = _to_arrow(frame[stored.names]).cast(stored)
+    if partitioned:
+        months = pd.to_datetime(frame["date"]).dt.strftime("%Y-%m").to_numpy()
+        table = table.append_column(PARTITION, pa.array(months, pa.string()))
+
+    tmp = STORE_DIR / f".{name}.{uuid.uuid4().hex}"
+    ds.write_dataset(table, tmp, format="parquet",
+                     partitioning=PARTITIONING if partitioned else None,
+                     basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet")
+    for path in sorted(p for p in tmp.rglob("*.parquet")):
+        target = table_dir(name) / path.relative_to(tmp)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        path.rename(target)
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _month_filter(months=None, start=None, end=None):
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if months is not None:
+        expr = both(expr, ds.field(PARTITION).isin([str(m)[:7] for m in months]))
+    if start is not None:
+        expr = both(expr, ds.field(PARTITION) >= str(start)[:7])
+    if end is not None:
+        expr = both(expr, ds.field(PARTITION) <= str(end)[:7])
+    return expr
+
+
+def read_table(name, columns=None, months=None, start=None, end=None, filter=None):
+    """
+    Read a table, pushing column projection and month-partition pruning down to
+    the Parquet scan. months/start/end take 'YYYY-MM' strings (or dates);
+    `filter` is an extra pyarrow.dataset expression. Partitioned tables come
+    back in month order.
+    """
+    if not has_table(name):
+        return schema.apply(_read_legacy_csv(name, columns, months, start, end), name)
+
+    dataset = ds.dataset(table_dir(name), format="parquet", partitioning=PARTITIONING)
+    expr = _month_filter(months, start, end)
+    if filter is not None:
+        expr = filter if expr is None else expr & filter
+    if columns is None:
+        columns = [c for c in dataset.schema.names if c != PARTITION]
+
+    return schema.apply(dataset.to_table(columns=list(columns), filter=expr).to_pandas(), name)
+
+
+def schema_of(name, columns=None):
+    """Arrow schema of a table (or of the given columns) without reading its rows."""
+    if has_table(name):
+        dataset = ds.dataset(table_dir(name), format="parquet", partitioning=PARTITIONING)
+        arrow = pa.schema([f for f in dataset.schema if f.name != PARTITION])
+    else:
+        path = OUTPUT_DIR / f"{name}.csv"
+        if not path.exists():
+            raise FileNotFoundError(f"Table '{name}' not found in {STORE_DIR} or as {path}")
+        arrow = pa.Schema.from_pandas(pd.read_csv(path, nrows=0), preserve_index=False)
+    return arrow if columns is None else pa.schema([arrow.field(c) for c in columns])
+
+
+def columns_of(name):
+    """Column names of a table without reading its rows."""
+    return schema_of(name).names
+
+
+def scan_batches(name, columns=None, months=None, start=None, end=None, filter=None,
+                 batch_rows=BATCH_ROWS):
+    """
+    Like read_table, but yields pyarrow RecordBatches of at most `batch_rows`
+    rows so a caller can stream a table of any size in constant memory.
+    """
+    if not has_table(name):
+        path = OUTPUT_DIR / f"{name}.csv"
+        if not path.exists():
+            raise FileNotFoundError(f"Table '{name}' not found in {STORE_DIR} or as {path}")
+        # Filters may use columns outside the projection, so project last
+        for chunk in pd.read_csv(path, chunksize=batch_rows):
+            table = pa.Table.from_pandas(_legacy_months(chunk, months, start, end), preserve_index=False)
+            if filter is not None:
+                table = table.filter(filter)
+            if columns is not None:
+                table = table.select(list(columns))
+            yield from (batch for batch in table.to_batches() if batch.num_rows)
+        return
+
+    dataset = ds.dataset(table_dir(name), format="parquet", partitioning=PARTITIONING)
+    expr = _month_filter(months, start, end)
+    if filter is not None:
+        expr = filter if expr is None else expr & filter
+    if columns is None:
+        columns = [c for c in dataset.schema.names if c != PARTITION]
+
+    # One file at a time, read synchronously, so a slow consumer never lets
+    # batches pile up; small batches (filters, small row groups) are coalesced
+    pending, rows = [], 0
+    for fragment in dataset.get_fragments(filter=expr):
+        for batch in fragment.to_batches(schema=dataset.schema, columns=list(columns), filter=expr,
+                                         batch_size=batch_rows, batch_readahead=0,
+                                         fragment_readahead=0, use_threads=False):
+            if batch.num_rows:
+                pending.append(batch)
+                rows += batch.num_rows
+            if rows >= batch_rows:
+                yield from pa.Table.from_batches(pending).combine_chunks().to_batches()
+                pending, rows = [], 0
+    if pending:
+        yield from pa.Table.from_batches(pending).combine_chunks().to_batches()
+
+
+def _read_legacy_csv(name, columns, months, start, end):
+    path = OUTPUT_DIR / f"{name}.csv"
+    if not path.exists():
+        raise FileNotFoundError(f"Table '{name}' not found in {STORE_DIR} or as {path}")
+    return _legacy_months(pd.read_csv(path, usecols=columns), months, start, end)
+
+
+def _legacy_months(frame, months, start, end):
+    """Parse dates of a legacy CSV frame and keep the requested months."""
+    if "date" in frame.columns:
+        frame["date"] = pd.to_datetime(frame["date"])
+        month = frame["date"].dt.strftime("%Y-%m")
+        keep = pd.Series(True, index=frame.index)
+        if months is not None:
+            keep &= month.isin([str(m)[:7] for m in months])
+        if start is not None:
+            keep &= month >= str(start)[:7]
+        if end is not None:
+            keep &= month <= str(end)[:7]
+        frame = frame[keep].reset_index(drop=True)
+    return frame
+
+
+def export_csv(name, path=None, **read_kwargs):
+    """Export a table as CSV (default: output/<table>.csv)."""
+    path = Path(path) if path else OUTPUT_DIR / f"{name}.csv"
+    frame = read_table(name, **read_kwargs)
+    frame.to_csv(path, index=False)
+    return path
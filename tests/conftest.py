@@ -0,0 +1,11 @@
+import pytest
+
+from src import store
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    """An empty columnar store under tmp_path."""
+    monkeypatch.setattr(store, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(store, "STORE_DIR", tmp_path / "store")
+    return tmp_path / "store"
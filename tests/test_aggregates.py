@@ -0,0 +1,60 @@
+import json
+
+import pandas as pd
+import pytest
+
+from backend.aggregates import AggregateIndex
+from backend.indexes import QueryError
+from src import cube
+
+
+@pytest.fixture(scope="module")
+def index():
+    keys = pd.DataFrame({
+        "state": ["Kerala", "Kerala", "Kerala", "Goa"],
+        "district": ["Kollam", "Kollam", "Idukki", "North Goa"],
+        "date": pd.to_datetime(["2025-01-31", "2025-02-28", "2025-02-28", "2025-02-28"]),
+    })
+    enrol = keys.assign(age_0_5=[1, 2, 3, 4], age_5_17=[10, 20, 30, 40], age_18_greater=[5, 5, 5, 5])
+    demo = keys.assign(demo_age_5_17=[2, 4, 6, 8], demo_age_17_=[1, 1, 1, 1])
+    bio = keys.assign(bio_age_5_17=[3, 3, 3, 3], bio_age_17_=[0, 1, 0, 1])
+    forecast = keys.assign(forecast_next_month=[100.0, 200.0, 300.0, 400.0])
+    return AggregateIndex(cube.build(enrol, demo, bio, forecast))
+
+
+def query(index, **params):
+    rows, rollup = index.query(**params)
+    return json.loads(rows), rollup
+
+
+@pytest.mark.parametrize("metric, expected", [
+    ("forecast", {"2025-01-31": 100.0, "2025-02-28": 900.0}),
+    ("demo_updates", {"2025-01-31": 3, "2025-02-28": 21}),
+])
+def test_measure_only_queries(index, metric, expected):
+    rows, _ = query(index, group_by="date", metrics=metric)
+    assert {row["date"]: row[metric] for row in rows} == expected
+    assert all(set(row) == {"date", metric} for row in rows)
+
+
+def test_ratios_are_derived_from_summed_counts(index):
+    rows, _ = query(index, group_by="state", metrics="udr", filters={"state": "Goa"})
+    assert [row["state"] for row in rows] == ["Goa"]
+    assert rows[0]["udr"] == pytest.approx((9 + 4) / 49)
+
+
+def test_age_group_defaults_to_measures_only(index):
+    rows, _ = query(index, group_by="age_group")
+    assert {row["age_group"] for row in rows} == {"0-5", "5-17", "18+", "all"}
+    assert all("udr" not in row and "lfi" not in row for row in rows)
+    with pytest.raises(QueryError):
+        index.query(group_by="age_group", metrics="udr")
+
+
+def test_forecast_only_adds_up_within_a_month(index):
+    rows, _ = query(index, group_by="state")
+    assert all("forecast" not in row for row in rows)
+    with pytest.raises(QueryError):
+        index.query(group_by="state", metrics="forecast")
+    rows, _ = query(index, group_by="state,date", metrics="forecast", filters={"state": "Kerala"})
+    assert [row["forecast"] for row in rows] == [100.0, 500.0]
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import backtest
+
+
+def series(values_by_district, start="2025-01-31"):
+    rows = []
+    for district, values in values_by_district.items():
+        dates = pd.date_range(start, periods=len(values), freq="ME")
+        rows += [{"state": "Kerala", "district": district, "date": d, "total_updates": v}
+                 for d, v in zip(dates, values)]
+    return pd.DataFrame(rows)
+
+
+def test_constant_series_have_no_error():
+    updates = series({"Kollam": [800] * 10, "Idukki": [2500] * 10})
+    sums = backtest.backtest_chunk(updates)
+    assert set(sums["candidate"]) == set(backtest.CANDIDATES)
+    np.testing.assert_allclose(sums["abs_error"], 0, atol=1e-6)
+    assert (sums["level_hits"] == sums["points"]).all()
+
+
+@pytest.mark.parametrize("months, horizons, min_train", [(10, 3, 3), (6, 2, 4), (5, 1, 3)])
+def test_points_are_origins_times_horizons(months, horizons, min_train):
+    updates = series({"Kollam": np.arange(months) * 10.0, "Idukki": np.ones(months)})
+    sums = backtest.backtest_chunk(updates, horizons=horizons, min_train=min_train)
+    for h in range(1, horizons + 1):
+        # Origins whose h-month-ahead target is still inside the history
+        origins = max(0, months - min_train - h + 1)
+        points = sums.loc[sums["horizon"] == h, "points"]
+        assert (points == 2 * origins).all()
+
+
+def test_leaderboard_is_ordered_by_error_within_each_horizon():
+    rng = np.random.default_rng(0)
+    updates = series({f"District {i}": rng.poisson(1000, 12) + np.arange(12) * 50 for i in range(5)})
+    board = backtest.leaderboard(updates, horizons=2, workers=1)
+    assert len(board) == 2 * len(backtest.CANDIDATES)
+    assert board["horizon"].is_monotonic_increasing
+    for _, part in board.groupby("horizon"):
+        assert part["mae"].is_monotonic_increasing
+    assert board["level_accuracy"].between(0, 1).all()
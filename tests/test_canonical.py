@@ -0,0 +1,15 @@
+import pytest
+
+from src.canonical import CANONICAL_STATES, canonical_states
+
+
+@pytest.mark.parametrize("raw, name", [
+    ("Chhatisgarh", "Chhattisgarh"),
+    ("Uttaranchal", "Uttarakhand"),
+    ("West Bengli", "West Bengal"),
+    ("  west  BENGAL ", "West Bengal"),
+    ("Orissa", "Odisha"),
+])
+def test_misspelt_states_map_to_a_known_state(raw, name):
+    assert canonical_states([raw]).tolist() == [name]
+    assert name in CANONICAL_STATES.values()
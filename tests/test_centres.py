@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.centres import CentreIndex, haversine_km
+
+
+@pytest.fixture(scope="module")
+def index():
+    rng = np.random.default_rng(0)
+    n = 500
+    return CentreIndex(pd.DataFrame({
+        "id": range(n),
+        "name": [f"Centre {i}" for i in range(n)],
+        # Roughly India's extent
+        "lat": rng.uniform(8, 35, n),
+        "lon": rng.uniform(68, 97, n),
+    }))
+
+
+@pytest.mark.parametrize("lat, lon", [(28.6, 77.2), (8.5, 96.9), (-60, -120), (-89, -179), (89, 179), (0, 0)])
+def test_nearest_matches_brute_force(index, lat, lon):
+    found = [r["distance"] for r in index.nearest(lat, lon, k=5)]
+    expected = np.sort(haversine_km(lat, lon, index.lat, index.lon))[:5].round(2)
+    assert found == expected.tolist()
+
+
+def test_nearest_outside_the_data_skips_empty_rings(index, monkeypatch):
+    lookups = []
+    cell_points = index._cell_points
+    monkeypatch.setattr(index, "_cell_points", lambda row, col: lookups.append(1) or cell_points(row, col))
+
+    index.nearest(-89, -179, k=5)
+
+    rows = index.row_range[1] - index.row_range[0] + 1
+    cols = index.col_range[1] - index.col_range[0] + 1
+    # At most every cell of the occupied bounding box once
+    assert len(lookups) <= rows * cols
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from backend.geometry import state_aggregates
+from src import rules
+
+
+def test_state_aggregates_drop_junk_states_and_grade_with_the_rules():
+    frame = pd.DataFrame({
+        "state": ["Kerala", "Kerala", "Orissa", "100000", ""],
+        "Next_Month_Demand": ["High Demand", "Medium Demand", "Low Demand", "High Demand", "High Demand"],
+        "Lifecycle_Friction": ["High", "Low", "Low", "High", "High"],
+        "forecast_next_month": [2500.0, 900.0, 100.0, 5000.0, 5000.0],
+    })
+    demand = rules.RULES["demand"]
+    states = state_aggregates(frame, np.arange(len(frame)), demand, rules.RULES["state_demand"])
+    assert sorted(states) == ["Kerala", "Odisha"]
+    assert states["Kerala"]["demand_level"] == "High Demand"  # mean level 2.5
+    assert states["Kerala"]["forecast_next_month"] == 3400.0
+    assert states["Odisha"]["demand_level"] == "Low Demand"
+
+    lenient = {**rules.RULES["state_demand"], "bands": [(">", 2.6), (">", 2.8)]}
+    assert state_aggregates(frame, np.arange(len(frame)), demand, lenient)["Kerala"]["demand_level"] == "Low Demand"
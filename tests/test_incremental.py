@@ -0,0 +1,70 @@
+"""An incremental run over new shards ends with the same tables as a full run."""
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from src import store
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def pipeline(data, output, *args):
+    env = {**os.environ, "AADHAAR_DATA_DIR": str(data), "AADHAAR_OUTPUT_DIR": str(output),
+           "AADHAAR_INGEST_WORKERS": "2"}
+    env.pop("AADHAAR_LOW_MEMORY", None)
+    return subprocess.run([sys.executable, "-m", "src.pipeline", *args], cwd=ROOT, env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def table(output, name):
+    frame = ds.dataset(output / "store" / name, format="parquet",
+                       partitioning=store.PARTITIONING).to_table().to_pandas()
+    frame = frame.drop(columns=store.PARTITION, errors="ignore")
+    text = [c for c in frame.columns if not pd.api.types.is_numeric_dtype(frame[c])
+            and not pd.api.types.is_datetime64_any_dtype(frame[c])]
+    frame[text] = frame[text].astype(str)
+    return frame.sort_values(list(frame.columns)).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def runs(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("incremental")
+    everything, data = tmp / "all", tmp / "data"
+    subprocess.run([sys.executable, "scripts/generate_synthetic_data.py", "--out", str(everything),
+                    "--scale", "0.05", "--shard-rows", "2000"], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL)
+    # The last shard of each dataset arrives later
+    shards = sorted(everything.glob("api_data_aadhar_*.csv"), key=lambda p: int(p.stem.split("_")[-1]))
+    late = {p.stem.split("_")[3]: p for p in shards}.values()
+
+    data.mkdir()
+    for path in set(shards) - set(late):
+        shutil.copy(path, data)
+    pipeline(data, tmp / "incremental", "--force")
+    for path in late:
+        shutil.copy(path, data)
+    assert "Incremental ingest: 3 shard(s)" in pipeline(data, tmp / "incremental", "--incremental")
+    pipeline(everything, tmp / "full", "--force")
+    return tmp / "full", tmp / "incremental"
+
+
+def test_incremental_matches_full_run(runs):
+    full, incremental = runs
+    names = sorted(p.name for p in (full / "store").iterdir() if not p.name.startswith("."))
+    assert names == sorted(p.name for p in (incremental / "store").iterdir() if not p.name.startswith("."))
+    for name in names:
+        expected, got = table(full, name), table(incremental, name)
+        assert list(got.columns) == list(expected.columns), name
+        assert len(got) == len(expected), name
+        for column in expected.columns:
+            if pd.api.types.is_float_dtype(expected[column]):
+                np.testing.assert_allclose(got[column], expected[column], rtol=1e-9, err_msg=name)
+            else:
+                assert got[column].tolist() == expected[column].tolist(), (name, column)
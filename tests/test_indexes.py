@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.indexes import DistrictQueryIndex, QueryError, StaleCursor, encode_cursor
+
+
+@pytest.fixture
+def index():
+    rng = np.random.default_rng(0)
+    n = 50
+    frame = pd.DataFrame({
+        "state": rng.choice(["Kerala", "Goa", "Bihar"], n),
+        "district": [f"District {i % 17}" for i in range(n)],
+        "date": pd.to_datetime("2025-01-01") + pd.to_timedelta(rng.integers(0, 90, n), unit="D"),
+        # Ties, so paging has to keep the stable order
+        "udr": rng.integers(0, 5, n).astype(float),
+    })
+    return DistrictQueryIndex(frame, version="v1")
+
+
+def pages(index, **params):
+    rows, cursor = [], None
+    while True:
+        body, cursor, total = index.query(cursor=cursor, limit=7, **params)
+        rows += json.loads(body)
+        if cursor is None:
+            return rows, total
+
+
+@pytest.mark.parametrize("sort", ["udr", "-udr", "district", "-date"])
+def test_cursor_pages_cover_every_row_once_in_order(index, sort):
+    rows, total = pages(index, sort=sort, columns="state,district,udr")
+    column = sort.lstrip("-")
+    expected = index.frame.sort_values(column, kind="stable", ascending=True)
+    if sort.startswith("-"):
+        expected = expected.iloc[::-1]
+    assert total == len(rows) == len(index.frame)
+    assert [r["district"] for r in rows] == expected["district"].tolist()
+    assert [r["udr"] for r in rows] == expected["udr"].tolist()
+
+
+def test_cursor_pages_with_filters_and_search(index):
+    rows, total = pages(index, sort="udr", filters={"state": "kerala"}, q="district 1")
+    expected = index.frame[(index.frame["state"] == "Kerala")
+                           & index.frame["district"].str.lower().str.contains("district 1")]
+    assert total == len(rows) == len(expected)
+    assert {r["district"] for r in rows} == set(expected["district"])
+
+
+def test_date_to_covers_the_whole_month(index):
+    _, _, total = index.query(date_from="2025-02", date_to="2025-02")
+    dates = index.frame["date"]
+    assert total == ((dates >= "2025-02-01") & (dates <= "2025-02-28")).sum() > 0
+
+
+def test_cursor_of_another_version_or_sort_is_rejected(index):
+    _, cursor, _ = index.query(sort="udr", limit=5)
+    with pytest.raises(QueryError):
+        index.query(sort="-udr", cursor=cursor)
+    with pytest.raises(StaleCursor):
+        index.query(sort="udr", cursor=encode_cursor("udr", 4, "v0"))
+
+
+@pytest.mark.parametrize("sort", ["udr", "-udr", "friction_level", "-friction_level"])
+def test_missing_values_sort_last_both_ways(sort):
+    frame = pd.DataFrame({
+        "state": ["Kerala"] * 6,
+        "district": [f"District {i}" for i in range(6)],
+        "udr": [0.5, np.nan, 2.0, None, 1.0, 0.5],
+        "friction_level": ["Low", None, "High", np.nan, "Medium", "Low"],
+    }).astype({"friction_level": "category"})
+    index = DistrictQueryIndex(frame, version="v1")
+    rows, total = pages(index, sort=sort, columns="district,udr,friction_level")
+    column = sort.lstrip("-")
+    assert total == 6
+    assert [r[column] is None for r in rows] == [False] * 4 + [True] * 2
+    values = [r[column] if column == "udr" else r[column].lower() for r in rows[:4]]
+    assert values == sorted(values, reverse=sort.startswith("-"))
@@ -0,0 +1,18 @@
+from src import manifest
+
+
+def run(run_id, **stages):
+    return {"run_id": run_id, "stages": {
+        name: {"status": status, "wall_seconds": seconds} for name, (status, seconds) in stages.items()}}
+
+
+def test_diff_skips_cached_runs():
+    runs = [
+        run("r1", ingest=("ran", 10.0), cube=("ran", 4.0)),
+        run("r2", ingest=("ran", 8.0), cube=("cached", None)),
+        run("r3", ingest=("cached", None), cube=("cached", None), export=("ran", 1.0)),
+    ]
+    lines = manifest.diff_executed(runs)
+    assert lines[lines.index("[ingest] ran r1 -> r2") + 1].split()[:4] == ["wall_seconds", "10.0", "->", "8.0"]
+    assert "[cube] no earlier executed run to compare (ran only in r1)" in lines
+    assert "[export] no earlier executed run to compare (ran only in r3)" in lines
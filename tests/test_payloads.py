@@ -0,0 +1,22 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from backend.payloads import records_json
+
+
+def test_float32_keeps_its_own_digits():
+    frame = pd.DataFrame({
+        "district": pd.Categorical(["Kollam", None]),
+        "udr": np.array([107.333336, np.inf], dtype=np.float32),
+        "forecast": np.array([0.1, np.nan], dtype=np.float32),
+        "enrolments": np.array([7, 8], dtype=np.int32),
+        "date": pd.to_datetime(["2025-01-31", None]),
+    })
+    body = records_json(frame).decode()
+    assert '"udr":107.333336,' in body and '"forecast":0.1,' in body
+    assert json.loads(body) == [
+        {"district": "Kollam", "udr": 107.333336, "forecast": 0.1, "enrolments": 7, "date": "2025-01-31"},
+        {"district": None, "udr": None, "forecast": None, "enrolments": 8, "date": None},
+    ]
@@ -0,0 +1,14 @@
+import pytest
+
+from src import pipeline
+
+
+@pytest.mark.parametrize("helper", pipeline.SHARED)
+def test_shared_helpers_are_part_of_every_stage_key(helper, tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "DATA_DIR", tmp_path)
+    before = pipeline.stage_keys({})
+    digest = pipeline.file_digest
+    monkeypatch.setattr(pipeline, "file_digest", lambda path, fingerprints: (
+        "edited" if path.stem == helper else digest(path, fingerprints)))
+    after = pipeline.stage_keys({})
+    assert all(after[name] != key for name, key in before.items())
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from src import store
+
+KEYS = ["state", "district", "date"]
+
+
+def monthly(rows):
+    frame = pd.DataFrame(rows, columns=[*KEYS, "count"])
+    return frame.assign(date=pd.to_datetime(frame["date"]))
+
+
+def read(name):
+    frame = store.read_table(name)
+    frame = frame.assign(state=frame["state"].astype(str), district=frame["district"].astype(str))
+    return frame.sort_values(KEYS).reset_index(drop=True)
+
+
+def records(rows):
+    return monthly(rows).sort_values(KEYS).reset_index(drop=True).to_dict("records")
+
+
+def partition_files(name):
+    return {p.parent.name: p.stat().st_mtime_ns for p in store.table_dir(name).rglob("*.parquet")}
+
+
+def test_upsert_replaces_rows_and_rewrites_only_their_months(store_dir):
+    store.write_table(monthly([
+        ("Kerala", "Kollam", "2025-01-31", 1),
+        ("Kerala", "Kollam", "2025-02-28", 2),
+        ("Kerala", "Idukki", "2025-02-28", 3),
+        ("Kerala", "Kollam", "2025-03-31", 4),
+    ]), "t")
+    before = partition_files("t")
+
+    store.upsert(monthly([
+        ("Kerala", "Kollam", "2025-02-28", 20),
+        ("Kerala", "Wayanad", "2025-02-28", 5),
+    ]), "t", KEYS)
+
+    assert read("t").to_dict("records") == records([
+        ("Kerala", "Idukki", "2025-02-28", 3),
+        ("Kerala", "Kollam", "2025-01-31", 1),
+        ("Kerala", "Kollam", "2025-02-28", 20),
+        ("Kerala", "Kollam", "2025-03-31", 4),
+        ("Kerala", "Wayanad", "2025-02-28", 5),
+    ])
+    after = partition_files("t")
+    assert after["month=2025-01"] == before["month=2025-01"]
+    assert after["month=2025-03"] == before["month=2025-03"]
+    assert after["month=2025-02"] != before["month=2025-02"]
+
+
+def test_upsert_delete_removes_rows_and_emptied_months(store_dir):
+    store.write_table(monthly([
+        ("Kerala", "Kollam", "2025-01-31", 1),
+        ("Kerala", "Kollam", "2025-02-28", 2),
+    ]), "t")
+
+    store.upsert(monthly([]), "t", KEYS, delete=monthly([("Kerala", "Kollam", "2025-02-28", 0)]))
+
+    assert read("t").to_dict("records") == records([("Kerala", "Kollam", "2025-01-31", 1)])
+    assert not (store.table_dir("t") / "month=2025-02").exists()
+
+
+def test_append_adds_files_next_to_existing_ones(store_dir):
+    rows = pd.DataFrame({"reason": ["bad_date"], "line": [2]})
+    store.write_table(rows, "q")
+    first = set(store.table_dir("q").rglob("*.parquet"))
+
+    store.append(pd.DataFrame({"reason": ["junk_state"], "line": [7]}), "q")
+
+    assert first < set(store.table_dir("q").rglob("*.parquet"))
+    assert store.read_table("q").sort_values("line")["reason"].tolist() == ["bad_date", "junk_state"]